@@ -1,74 +1,117 @@
 from XPPython3 import xp #import XPPython for communicating with xplane
 import math #for the calculations
 import configparser #for reading the ini file
-from utilities import * 
+import os #for the paths of the log files
+import operator #for reading the widget values from the state records
 from XPPython3.utils.widgetMsgHelper import WidgetMsgHelper #for the widget
-import csv #for writing to CSV
+from flight_loop_scheduler import FlightLoopScheduler #runs all the per frame work in a fixed order
+from dataref_snapshot import SnapshotReader #reads all the datarefs of a frame at once
+from scenario_queue import load_scenarios, check_settings #attacks run one after another from a scenario file
+from attack_state import AttackerState, GhostState, TargetState #state records of the attacker, lead ghost and target
+#the geometry, logging, telemetry and profiling modules (and with them NumPy) are imported when an attack is
+#launched, so loading the plugin with X-Plane does no more than read the config file and build the widget
 
 class PythonInterface:
 
+    #widget field, attribute it shows and display format
+    WIDGET_FIELDS = [
+        ('att_lat', 'attacker.lat', '.6f'), ('att_lon', 'attacker.lon', '.6f'),
+        ('att_elevation', 'attacker.elevation', '.1f'), ('att_slant', 'attacker.slant', '.0f'),
+        ('ghost_lat', 'ghost.lat', '.6f'), ('ghost_lon', 'ghost.lon', '.6f'),
+        ('ghost_elevation', 'ghost.elevation', '.1f'), ('ghost_speed', 'ghost.speed', '.1f'),
+        ('ghost_heading', 'ghost.heading', '.1f'), ('ghost_slant', 'ghost.slant', '.0f'),
+        ('ghost_rbearing', 'ghost.rbearing', '.1f'), ('ghost_raltitude', 'ghost.raltitude', '.0f'),
+        ('ghost_rdistance', 'ghost.rdistance', '.0f'),
+        ('target_lat', 'target.lat', '.6f'), ('target_lon', 'target.lon', '.6f'),
+        ('target_elevation', 'target.elevation', '.1f'), ('target_speed', 'target.speed', '.1f'),
+        ('target_heading', 'target.track', '.1f'), ('effective_angle', 'target.effective_angle', '.2f'),
+        ('closing_speed', 'ghost.closing_speed', '.1f'), ('attack_valid', 'attack_valid', ''), ('RA', 'RA_triggered', ''),
+        ('window', 'window_remaining', '.1f'), ('tau', 'ghost.tau', '.1f'), ('ra_latency', 'ra_latency', '.3f'),
+        ('closing_1s', 'smoothed_closing_speed', '.1f'), ('slant_rate', 'slant_rate', '.1f'),
+        ('timing', 'timing_text', ''),
+    ]
+    #attribute getters of the widget fields, built once so a refresh does not parse the dotted names
+    WIDGET_GETTERS = [operator.attrgetter(attribute) for _, attribute, _ in WIDGET_FIELDS]
+    HISTORY_RATE = 120 #frames per second the history is first sized for, it grows for faster frame rates
+    #columns of the event log, one row per advisory onset, advisory end or RA button press
+    EVENT_COLUMNS = ["Event", "Source", "Sim Time", "Since Launch", "Advisory", "Attacker Slant", "Ghost Slant",
+                     "Ghost Latitude", "Ghost Longitude", "Ghost Elevation", "Ghost Heading", "Target Lat", "Target Lon",
+                     "Target Elevation", "Target Speed", "Target Heading", "Closing Speed", "Effective Angle",
+                     "Ghost Bearing", "Ghost Alt", "Ghost Dist"]
+
     def __init__(self):
         self.Name = "ACAS experiment v1.0"
         self.Sig = "iason.rigas.thesis"
         self.Desc = "Plugin for ACAS attack testing"
         self.myWidgetWindow = None
+        self.menu = None #plugins menu entry that brings the widget back after it is closed
+        self.widget_text = {} #last text shown in each widget field
         self.plugin_owns_tcas = False #variable to store whether we own TCAS in the sim
-        self.setup_csv_logging()  # Setup CSV logging of data
+        self.config_path = 'config.ini' #ini file with the attack settings
+        self.binary_log = False #also write a binary copy of every log, set from the config file
         self.initialize_variables()
+        self.setup_scheduler()
 
     def initialize_variables(self):
             self.fttomtr = 0.3048
             self.nmtomtr = 1852.0
-            self.TARGET = 1 #number of targets we will be using in the sim
+            self.TARGET = 1 #number of targets we will be using in the sim, updated from the config file
             self.ids = [0xA41B14]  # Assign a 24bit ICAO address to the ghost aircraft.
             self.tailnum = [b"D-EHNR"]  # Assign a flight id to the ghost.
+            self.swarm = None #all the ghosts, created when the config file is loaded
+            self.ghost_table = None #precomputed ghost paths, only when ghost_table is switched on in the config file
+            self.config_errors = [] #problems of the config file found when it was read, no attack is launched while there are any
             #Initialise all variables
-            self.attacker_slant = 0
-            self.ghost_lat = 0
-            self.ghost_lon = 0
-            self.ghost_elevation = 950
-            self.ghost_slant = 0
-            self.effective_angle = 0
-
-            self.target_lat = None
-            self.target_lon = None
-            self.target_elevation = None
-            self.target_speed = 0
-            self.target_trk = 0
-            self.ghost_rbearing = 0
-            self.ghost_raltitude = 0
-            self.ghost_rdistance = 0
-            self.closing_speed = 0
-
-            self.ghost_heading = 0
-            self.ghost_bearing=0
+            self.attacker = AttackerState()
+            self.ghost = GhostState() #the first ghost, the one logged and shown in the widget
+            self.target = TargetState()
+            self.history = None #the last frames of the attack, created at launch and dumped when an RA occurs
+            self.history_seconds = 60.0 #seconds of frames the history holds, from the config file
+            self.smoothed_closing_speed = None #closing speed averaged over the last second in knots
+            self.slant_rate = None #rate of change of the ghost slant range in meters per second
+            self.frame = None #local frame anchored at the attacker, created when the attack starts
+            self.target_point = None #cached trig terms of the target position
+            self.target_track_trig = None #cached sin and cos of the target track
+            self.lead_ghost_time = None #sim time the lead ghost lat/lon/heading were last worked out
 
             self.attack_valid = True
             self.RA_triggered=False
-            self.elevation_angle=0
-            self.effective_angle=0
-            self.target_theta=0
-            self.ghost_rbearing=0
-            self.ghost_raltitude=0 
-            self.ghost_rdistance=0
-            self.closing_speed=0
+            self.advisory_dataref = "sim/cockpit2/tcas/indicators/tcas_alert" #TCAS advisory state, from the config file
+            #advisory values at or above this count as an RA, tcas_alert is 1 for a traffic advisory (TA) and 2 for a
+            #resolution advisory, so a TA alone is not taken for an RA. ra_level = 1 in the config file counts TAs too
+            self.advisory_level = 2
+            self.advisory_active = False
+            self.launch_time = None #sim time the attack was launched
+            self.ra_time = None #sim time of the first advisory onset of the attack
+            self.ra_latency = None #seconds from launch to the first advisory onset
             self.current_time=0
+            self.window_remaining=None #predicted seconds until the geometry breaks
+            self.predicted_end_time=None #sim time at which the geometry is predicted to break
+            self.fade_time = 0.0 #seconds before the predicted break the ghosts are withdrawn, 0 lets the geometry break
+            self.attack_faded = False #the ghosts were withdrawn ahead of the predicted break
+            self.scenarios = [] #scenario queue from the scenario file, empty for single attacks
+            self.scenario_index = 0
+            self.queue_state = None #None, 'launching', 'running' or 'pause'
+            self.resume_time = None #sim time the next scenario is launched at
+            self.settings = None #settings of the next attack, the [Settings] of config.ini or those of a scenario
+            self.profiling = False #time the hot path, from the config file
+            self.profiler = None #only created when profiling is switched on
+            self.timing_text = "off"
+            self.telemetry_address = None #host and port of the live telemetry, when a port is set in the config file
+            self.telemetry = None #only created while an attack runs with a telemetry address
+            #log files of the current attack, created when it is launched
+            self.log_name = None
+            self.log_writer = None
+            self.event_writer = None
+            self.start_time = None #sim time the run relative log times count from, the launch of the attack
 
             # Initialize xplane datarefs
             self.initialize_datarefs()
 
     def initialize_datarefs(self):
-            self.ref_target_trk = xp.findDataRef("sim/flightmodel/position/true_psi")
-            self.ref_target_elevation = xp.findDataRef("sim/flightmodel/position/elevation")
-            self.ref_vx = xp.findDataRef("sim/flightmodel/position/local_vx")
-            self.ref_vy = xp.findDataRef("sim/flightmodel/position/local_vy")
-            self.ref_target_latitude = xp.findDataRef("sim/flightmodel/position/latitude")
-            self.ref_target_longitude = xp.findDataRef("sim/flightmodel/position/longitude")
-            self.ref_target_gs = xp.findDataRef("sim/flightmodel/position/groundspeed")
-            self.ref_target_theta = xp.findDataRef("sim/flightmodel/position/theta")
-            self.ref_ghost_rbrg = xp.findDataRef("sim/cockpit2/tcas/indicators/relative_bearing_degs")
-            self.ref_ghost_rdis = xp.findDataRef("sim/cockpit2/tcas/indicators/relative_distance_mtrs")
-            self.ref_ghost_ralt = xp.findDataRef("sim/cockpit2/tcas/indicators/relative_altitude_mtrs")
+            #the datarefs we read every frame are in the snapshot reader, created when the attack starts
+            self.snapshot_reader = None
+            self.snapshot = None
             self.ref_modeS_id = xp.findDataRef("sim/cockpit2/tcas/targets/modeS_id")  
             self.ref_flt_id = xp.findDataRef("sim/cockpit2/tcas/targets/flight_id")  
             self.ref_override = xp.findDataRef("sim/operation/override/override_TCAS")
@@ -77,87 +120,197 @@ class PythonInterface:
             self.gele = xp.findDataRef("sim/cockpit2/tcas/targets/position/z")
 
     def initialise_attack(self):
+        from local_frame import LocalFrame, TrackedPoint, IncrementalTrig #Cartesian frame anchored at the attacker for all the attack geometry
         # Setting the initial target data by reading the xplane datarefs for the aircraft we are flying
-        self.target_lat = xp.getDatad(self.ref_target_latitude)
-        self.target_lon = xp.getDatad(self.ref_target_longitude)
-        self.target_elevation = xp.getDatad(self.ref_target_elevation) #the target altitude is displayed as elevation in meters
-
-        # Calculate the bearing from the attacker to the target, this is used to correctly plot a convincing ghost
-        self.ghost_heading = calculate_required_heading(self.attacker_lat, self.attacker_lon, self.target_lat, self.target_lon)
-        ghost_initial_bearing = (self.ghost_heading + 180) % 360  # Ghost initial bearing is the opposite direction
-        # Calculate initial position for the ghost using the start distance and ghost bearing
+        self.snapshot_reader = SnapshotReader(xp, self.TARGET, self.advisory_dataref)
+        self.frame = LocalFrame(self.attacker.lat, self.attacker.lon, self.attacker.elevation)
+        self.target_point = TrackedPoint(self.frame)
+        if self.profiler:
+            self.profile_frame()
+        self.frame.fit_local(xp.worldToLocal)
+        self.target_track_trig = IncrementalTrig()
+        self.lead_ghost_time = None
+        self.read_target_state(0)
+        self.launch_time = self.snapshot.time
+        self.start_time = self.launch_time #the log times count from the launch
+        #an advisory that is already showing at launch is not caused by the attack
+        self.advisory_active = self.snapshot.advisory >= self.advisory_level
+        self.ra_time = None
+        self.ra_latency = None
+        self.history.clear()
+        self.smoothed_closing_speed = None
+        self.slant_rate = None
+
+        # Place the ghosts opposite the direction from the attacker to the target, this is used to correctly plot a convincing ghost
         # The start distance is an arbitrary value which ensures that the ghost will be displayed on the target TCAS for a few seconds before the attack
-        self.ghost_lat, self.ghost_lon = calculate_initial_ghost_position(self.attacker_lat, self.attacker_lon, self.start_distance, ghost_initial_bearing)
+        self.swarm.launch(self.frame, self.target.east, self.target.north)
+        if self.ghost_table:
+            self.ghost_table.builds = 0
+            self.ghost_table.build(self.snapshot.time, self.target.lat, self.target.lon, self.target.elevation,
+                                   self.target.speed, self.target.track)
+        self.swarm.set_elevation(self.target.elevation + self.swarm.altitude_offset)
+        self.sync_lead_ghost()
+        self.predict_window(0)
+        xp.debugString(f"ACAS attack launched, geometry predicted to stay valid for {self.window_remaining:.1f} s\n")
+
+    """copy the state of the first ghost to the single ghost variables used by the log and the widget"""
+    def sync_lead_ghost(self):
+        swarm = self.swarm
+        self.ghost.elevation = float(swarm.elevation[0])
+        self.ghost.slant = float(swarm.slant[0])
+        self.ghost.closing_speed = float(swarm.closing_speed[0])
+
+    """work out the lat/lon and heading of the first ghost, only on the frames that log or show them"""
+    def locate_lead_ghost(self):
+        if self.frame is None or self.lead_ghost_time == self.snapshot.time:
+            return
+        swarm = self.swarm
+        self.ghost.lat, self.ghost.lon, _ = self.frame.to_geodetic(float(swarm.east[0]), float(swarm.north[0]), float(swarm.up[0]))
+        self.ghost.heading = math.degrees(math.atan2(swarm.direction_east[0], swarm.direction_north[0])) % 360
+        self.lead_ghost_time = self.snapshot.time
     
-    """Updates in each simulator frame the new position of the ghost and calculates some parameters"""
-    def update_dists_callback(self, elapsed1, elapsed2, counter, refcon):
-        speed_mps = 0.514444 * self.ghost_speed #calculations are based on meters per second but operationally knots are used
-        distance_per_frame = speed_mps * elapsed1 #calculate the distance moved in this frame
-        heading_radians = math.radians(self.ghost_heading) #convert to radians for the calculations
-        delta_lat = (distance_per_frame * math.cos(heading_radians)) / 111139 #calculate difference in latitude
-        delta_lon = (distance_per_frame * math.sin(heading_radians)) / (111139 * math.cos(math.radians(self.ghost_lat))) #calculate difference in longitude
-        self.ghost_lat= self.ghost_lat + delta_lat
-        self.ghost_lon= self.ghost_lon + delta_lon
-        self.check_proximity() #check if the attack geometry is still valid
-        #read target position and data
-        self.target_lat=xp.getDatad(self.ref_target_latitude)
-        self.target_lon=xp.getDatad(self.ref_target_longitude)
-        self.target_elevation=xp.getDatad(self.ref_target_elevation)
-        self.target_speed = xp.getDataf(self.ref_target_gs)* 1.94384
-        self.target_trk = xp.getDataf(self.ref_target_trk)      
-        #update the elevation angle , effective angle (considers aircraft pitch theta), and new ghost heading 
-        self.elevation_angle = calculate_elevation_angle(self.attacker_lat, self.attacker_lon, self.attacker_elevation, self.target_lat, self.target_lon, self.target_elevation)
-        self.target_theta = xp.getDataf(self.ref_target_theta)
-        self.effective_angle=self.target_theta+self.elevation_angle
-        self.ghost_heading = calculate_required_heading(self.ghost_lat, self.ghost_lon, self.target_lat, self.target_lon)
-
-        return -1  # callback to run again in the next frame
+    """the per frame pipeline, every stage runs after the one before it in the same frame"""
+    def setup_scheduler(self):
+        self.scheduler = FlightLoopScheduler()
+        self.scheduler.add_stage('read', self.read_target_state, group='attack')
+        self.scheduler.add_stage('propagate', self.update_ghosts, group='attack')
+        self.scheduler.add_stage('validate', self.validate_attack, group='attack')
+        self.scheduler.add_stage('history', self.record_history, group='attack')
+        self.scheduler.add_stage('advisory', self.detect_advisory, group='attack')
+        self.scheduler.add_stage('predict', self.predict_window, divisor=30, group='attack')
+        self.scheduler.add_stage('fade', self.fade_attack, group='attack')
+        self.scheduler.add_stage('stats', self.update_stats, divisor=6, group='attack')
+        self.scheduler.add_stage('tcas', self.update_tcas, group='attack')
+        self.scheduler.add_stage('log', self.log_data_to_csv, divisor=6, group='attack')
+        self.scheduler.add_stage('telemetry', self.publish_telemetry, group='attack')
+        self.scheduler.add_stage('end', self.end_attack, group='attack')
+        self.scheduler.add_stage('queue', self.run_queue)
+        self.scheduler.add_stage('ui', self.update_widget_fields, divisor=6)
+
+    """read the target position and data from the simulator, every later stage of the frame uses this snapshot"""
+    def read_target_state(self, elapsed):
+        snapshot = self.snapshot = self.snapshot_reader.read()
+        self.target.lat = snapshot.target_lat
+        self.target.lon = snapshot.target_lon
+        self.target.elevation = snapshot.target_elevation #the target altitude is displayed as elevation in meters
+        self.target.speed = snapshot.target_speed
+        self.target.track = snapshot.target_trk
+        self.target.theta = snapshot.target_theta
+        self.target.east, self.target.north, self.target.up = self.target_point.to_enu(self.target.lat, self.target.lon, self.target.elevation)
+
+    """Updates the position of the ghosts, each one flies towards the target for the time since the last update"""
+    def update_ghosts(self, elapsed):
+        swarm = self.swarm
+        if self.ghost_table:
+            self.ghost_table.update(self.snapshot.time, self.target) #look the ghosts up in the precomputed paths
+        else:
+            swarm.advance(elapsed, self.target.east, self.target.north) #turn every ghost towards the target and move it
+        swarm.set_elevation(self.target.elevation + swarm.altitude_offset) #the ghosts fly at the target altitude plus their own offset
+
+    """check the attack geometry and update the elevation angle and effective angle (considers aircraft pitch theta)"""
+    def validate_attack(self, elapsed):
+        self.check_proximity()
+        #the attacker is the origin of the frame, so the angle of the target above the attacker horizon is direct
+        self.target.elevation_angle = math.degrees(math.atan2(self.target.up, math.hypot(self.target.east, self.target.north)))
+        self.target.effective_angle=self.target.theta+self.target.elevation_angle
+        self.sync_lead_ghost()
+        #once the geometry is broken the rest of this frame (TCAS write and log) runs one last time and the attack stops
+        if self.attack_valid==False:
+            self.scheduler.finish('attack')
+
+    """keep this frame in the history of the attack"""
+    def record_history(self, elapsed):
+        self.history.record(self.snapshot.time, self.attacker, self.ghost, self.target, self.swarm,
+                            self.snapshot.advisory, self.attack_valid)
+
+    """rolling closing speed and slant rate of the first ghost over the last second of the history"""
+    def update_stats(self, elapsed):
+        self.smoothed_closing_speed = self.history.smoothed_closing_speed()
+        self.slant_rate = self.history.slant_rate()
+
+    """watch the TCAS advisory dataref every frame, an onset marks the RA at the time of this frame"""
+    def detect_advisory(self, elapsed):
+        active = self.snapshot.advisory >= self.advisory_level
+        if active == self.advisory_active:
+            return
+        self.advisory_active = active
+        if active:
+            if self.ra_time is None:
+                self.ra_time = self.snapshot.time
+                self.ra_latency = self.ra_time - self.launch_time
+            self.RA_triggered = True
+            self.dump_history()
+        self.record_event("advisory" if active else "clear", "dataref", self.snapshot.time)
+
+    """write the geometry of this instant to the event log"""
+    def record_event(self, event, source, time):
+        if self.event_writer is None or self.event_writer.closed:
+            return #the attack is over and its logs are written out
+        snapshot = self.snapshot
+        self.locate_lead_ghost()
+        try:
+            self.event_writer.append((
+                event, source, time, time - self.launch_time, snapshot.advisory, self.attacker.slant, self.ghost.slant,
+                self.ghost.lat, self.ghost.lon, self.ghost.elevation, self.ghost.heading, self.target.lat, self.target.lon,
+                self.target.elevation, self.target.speed, self.target.track, self.ghost.closing_speed,
+                self.target.effective_angle, snapshot.ghost_rbearing, snapshot.ghost_raltitude, snapshot.ghost_rdistance,
+            ))
+        except OSError:
+            self.close_log(self.event_writer)
+
+    """write the frames leading up to an advisory to their own file next to the data log, from a background thread"""
+    def dump_history(self):
+        directory, name = os.path.split(self.log_name)
+        self.history_dumps += 1
+        self.history.dump(os.path.join(directory, f"{name.replace('Data', 'History', 1)}_{self.history_dumps}.csv"))
+
+    """predict, for the current target state, when the first ghost will be as close to the target as the attacker"""
+    def predict_window(self, elapsed):
+        from attack_window import predict_attack_window #how long the attack geometry will stay valid
+        swarm = self.swarm
+        ghost_lat, ghost_lon, _ = swarm.geodetic()
+        window = predict_attack_window(self.attacker.lat, self.attacker.lon, self.attacker.elevation,
+                                       self.target.lat, self.target.lon, self.target.elevation, self.target.speed,
+                                       self.target.track, self.snapshot.target_vy, ghost_lat, ghost_lon, swarm.speed,
+                                       swarm.altitude_offset)
+        self.window_remaining = float(window.time_to_invalid.min())
+        self.predicted_end_time = self.snapshot.time + self.window_remaining
+        self.ghost.tau = float(window.tau[0])
+
+    """withdraw the ghosts fade_time seconds before the predicted break, instead of dropping them once it has happened"""
+    def fade_attack(self, elapsed):
+        if not self.fade_time or self.snapshot.time < self.predicted_end_time - self.fade_time:
+            return
+        self.attack_faded = True
+        self.record_event("fade", "prediction", self.snapshot.time)
+        #the rest of this frame runs one last time, then end_attack hands the TCAS back
+        self.scheduler.finish('attack')
 
     """check if the attack geometry is still via slant range comparisons, and calculate some additional variables"""
     def check_proximity(self):
-        #calculate slant range between attacker and target
-        self.attacker_slant = haversine(self.attacker_lat, self.attacker_lon, self.target_lat, self.target_lon,self.attacker_elevation,self.target_elevation)
-        #calculate slant range between ghost and target
-        self.ghost_slant = haversine(self.ghost_lat, self.ghost_lon, self.target_lat, self.target_lon, self.ghost_elevation, self.target_elevation)
-        #if the ghost slant range becomes equal to the attacker slant range the ghost is too close to the target and the 
+        #calculate slant range between attacker (the origin of the local frame) and target
+        self.attacker.slant = math.sqrt(self.target.east**2 + self.target.north**2 + self.target.up**2)
+        #calculate slant range and closing speed in knots between every ghost and the target
+        #if a ghost slant range becomes equal to the attacker slant range the ghost is too close to the target and the 
         #attack geometry is not valid anymore.
-        if self.ghost_slant <= self.attacker_slant:
+        sin_track, cos_track = self.target_track_trig.update(self.target.track)
+        if not self.swarm.check(self.attacker.slant, self.target.east, self.target.north, self.target.up,
+                                self.target.speed * sin_track, self.target.speed * cos_track):
             self.attack_valid = False
-        #Read the relative bearing, altitude and distance between the ghost and the target from the simulator
-        values_rbearing=[]
-        values_raltitude=[]
-        values_rdistance=[]
-        xp.getDatavf(self.ref_ghost_rbrg,values_rbearing)
-        xp.getDatavf(self.ref_ghost_ralt,values_raltitude)
-        xp.getDatavf(self.ref_ghost_rdis,values_rdistance)
-        self.ghost_rbearing=values_rbearing[1]
-        self.ghost_raltitude=values_raltitude[1]   
-        self.ghost_rdistance=values_rdistance[1]
-        #calculate the closing speed between ghost and target in knots
-        self.closing_speed=calculate_relative_speed_in_knots(self.ghost_speed,self.ghost_heading,self.target_speed,self.target_trk)
+        #The relative bearing, altitude and distance between the first ghost and the target as seen by the simulator
+        self.ghost.rbearing=self.snapshot.ghost_rbearing
+        self.ghost.raltitude=self.snapshot.ghost_raltitude
+        self.ghost.rdistance=self.snapshot.ghost_rdistance
 
     """update the position of the ghost aircraft on the TCAS on each frame"""
-    def update_tcas(self, elapsed1, elapsed2, counter, refcon):
-
-        for i in range(self.TARGET):   
-            self.ghost_elevation=xp.getDatad(self.ref_target_elevation)
-            llat=[self.ghost_lat]
-            llon=[self.ghost_lon]
-            lalt=[self.ghost_elevation]  
-            #we need to convert the lat,lon,and altitude from the normal world coordinate system to the local simulator system (OpenGL system)
-            x, y, z = xp.worldToLocal(llat[i], llon[i], lalt[i])   
-            gx=[x]
-            gy=[y]
-            gz=[z]
-        #if our plugin owns the tcas and no other process is involved then we set the coordinates
+    def update_tcas(self, elapsed):
+        #we need to convert the ghost positions from the attack frame to the local simulator system (OpenGL system)
+        gx, gy, gz = self.swarm.to_local()
+        #if our plugin owns the tcas and no other process is involved then we set the coordinates of all ghosts at once
         if self.plugin_owns_tcas:
             xp.setDatavf(self.glat,gx,1,self.TARGET)    
             xp.setDatavf(self.glon,gy,1,self.TARGET)
             xp.setDatavf(self.gele,gz,1,self.TARGET)
-        #if the attack geometry is not valid the target must be removed from the TCAS display immediately
-        if self.attack_valid==False:
-            return 0 #drop the target
-        return -1  # run again in the next frame
     
     """the following functions are required for all xplane plugins"""
     def XPluginStart(self):
@@ -165,15 +318,27 @@ class PythonInterface:
     
     def XPluginEnable(self):
         self.myWidgetWindow = self.create_widget_window()
+        self.menu = xp.createMenu("ACAS Attack", None, 0, self.menuHandler, None)
+        xp.appendMenuItem(self.menu, "Show control window", 'show')
+        xp.appendMenuItem(self.menu, "Cancel scenario queue", 'cancel')
+        xp.registerFlightLoopCallback(self.scheduler.flight_loop, -1, None)
         return 1
 
     def XPluginDisable(self):
+        xp.unregisterFlightLoopCallback(self.scheduler.flight_loop, None)
+        if self.profiler:
+            for line in self.profiler.report():
+                xp.debugString(f"ACAS timing: {line}\n")
         if self.myWidgetWindow:
             xp.destroyWidget(self.myWidgetWindow['widgetID'], 1)
             self.myWidgetWindow = None
+        if self.menu:
+            xp.destroyMenu(self.menu)
+            self.menu = None
 
         if self.plugin_owns_tcas:
             self.not_our_planes()
+        self.end_session() #write out the rows still waiting in memory
 
     def retry_acquiring_planes(self, ignored):
         if not xp.acquirePlanes(None, self.retry_acquiring_planes, None):
@@ -182,11 +347,13 @@ class PythonInterface:
             self.my_tcas()
     
     def my_tcas(self):
+        #ensure that the number of aircraft we are writing to TCAS is less than the maximum, otherwise hand everything back
+        if not self.tcas_has_room():
+            self.not_our_planes()
+            self.cancel_queue("the ghosts do not fit the TCAS")
+            return
         #use the override to control the Xplane TCAS display
         xp.setDatai(self.ref_override, 1)
-        #ensure that the number of aircraft we are writint to TCAS is less than the maximum
-        max_targets = xp.getDatavi(self.ref_modeS_id, None, 0, 0)
-        assert self.TARGET < max_targets
         xp.setActiveAircraftCount(self.TARGET)
         self.plugin_owns_tcas = True
         #set our ghost details
@@ -195,80 +362,100 @@ class PythonInterface:
             xp.setDatab(self.ref_flt_id, self.tailnum[i - 1], i * 8, len(self.tailnum[i - 1]))
         #start the attack
         self.initialise_attack()
-        xp.registerFlightLoopCallback(self.update_tcas, 0.1, None)
-        xp.registerFlightLoopCallback(self.update_dists_callback, 0.1, None)
-        xp.registerFlightLoopCallback(self.log_data_to_csv, 0.1, None)
+        self.scheduler.start('attack')
+        if self.queue_state == 'launching':
+            self.queue_state = 'running'
+
+    """the TCAS slots hold our own aircraft and the ghosts, check the ghosts fit before we take over the TCAS"""
+    def tcas_has_room(self):
+        max_targets = xp.getDatavi(self.ref_modeS_id, None, 0, 0)
+        if self.TARGET < max_targets:
+            return True
+        xp.debugString(f"ACAS attack not launched: {self.TARGET} ghosts do not fit the {max_targets - 1} TCAS targets\n")
+        return False
 
     def not_our_planes(self):
-        #if we lose countrol of the planes unregister the callbacks remove the override and release the planes
-        xp.unregisterFlightLoopCallback(self.update_tcas, None)
-        xp.unregisterFlightLoopCallback(self.update_dists_callback, None)
-        xp.unregisterFlightLoopCallback(self.log_data_to_csv, None)
+        #if we lose countrol of the planes stop the attack stages remove the override and release the planes
+        self.scheduler.stop('attack')
         xp.setDatai(self.ref_override, 0)
         xp.releasePlanes()
         self.plugin_owns_tcas = False
+        self.end_session()
 
     """Prepare the csv logging , initialise file and headers"""
     def setup_csv_logging(self):
-     
-        self.csv_file = open('TCAS_Data_Log.csv', 'w', newline='', encoding='utf-8')
-        self.csv_writer = csv.writer(self.csv_file)
-        headers = ["Time", "Attacker Latitude", "Attacker Longitude", "Attacker Elevation","Attacker Slant",
-                   "Ghost Latitude", "Ghost Longitude", "Ghost Elevation","Ghost Speed","Ghost Heading","Ghost Slant",
-                   "Ghost Bearing","Ghost Alt","Ghost Dist","Target Lat","Target Lon","Target Elevation","Target Speed",
-                   "Target Heading","Effective Angle","Closing Speed","Attack Valid","RA Triggered"]
-        self.csv_writer.writerow(headers)
-        self.start_time = xp.getElapsedTime()
+        from telemetry_writer import BufferedLogWriter, unique_log_name #for writing to CSV away from the sim thread
+        from binary_log import LOG_COLUMNS #the columns of the log file
+        self.log_name = unique_log_name() #every run gets its own files, named after the time it started
+        self.log_writer = BufferedLogWriter(self.log_name + '.csv', LOG_COLUMNS)
+        #advisory onsets and RA button presses of the run, with the geometry at that instant
+        directory, name = os.path.split(self.log_name)
+        self.event_writer = BufferedLogWriter(os.path.join(directory, name.replace('Data', 'Event', 1) + '.csv'), self.EVENT_COLUMNS)
+        if self.binary_log:
+            self.log_writer.add_binary_output(self.log_name + '.bin')
+        self.history_dumps = 0 #history files written for this log
 
     """This is used to write our sim data to the csv file for later analysis"""
-    def log_data_to_csv(self, elapsed1, elapsed2, counter, refcon):
-        if self.csv_file.closed:
-            return 0  # Stop this callback if the file is closed
-    
-        self.current_time = xp.getElapsedTime() - self.start_time
-        #write the following fields
-        data = [
+    def log_data_to_csv(self, elapsed):
+        if self.log_writer.closed:
+            return  # nothing to do once the file is closed
+        #queue the row, the writer thread formats it and writes it to the file system
+        try:
+            self.log_writer.append(self.frame_record())
+        except OSError:
+            self.close_log(self.log_writer) #the writer thread failed, logging stops for this run
+
+    """the last stage of the frame, once the attack geometry is not valid anymore or the ghosts faded the run is torn down"""
+    def end_attack(self, elapsed):
+        if self.attack_faded:
+            self.not_our_planes() #the ghosts leave the TCAS before their geometry breaks
+        elif self.attack_valid is False:
+            self.end_session()
+
+    """send the state of this frame to the live telemetry stream, when there is one"""
+    def publish_telemetry(self, elapsed):
+        if self.telemetry:
+            self.telemetry.publish(self.frame_record())
+
+    """the state of this frame in the order of the log columns, for the log file and the telemetry stream"""
+    def frame_record(self):
+        self.current_time = self.snapshot.time - self.start_time
+        self.locate_lead_ghost()
+        return (
             self.current_time,
-            self.attacker_lat,
-            self.attacker_lon,
-            self.attacker_elevation,
-            self.attacker_slant,
-            self.ghost_lat,
-            self.ghost_lon,
-            self.ghost_elevation,
-            self.ghost_speed,
-            self.ghost_heading,
-            self.ghost_slant,
-            self.ghost_rbearing,
-            self.ghost_raltitude,
-            self.ghost_rdistance,
-            self.target_lat,
-            self.target_lon,
-            self.target_elevation,
-            self.target_speed,
-            self.target_trk,
-            self.effective_angle,
-            self.closing_speed,
+            self.attacker.lat,
+            self.attacker.lon,
+            self.attacker.elevation,
+            self.attacker.slant,
+            self.ghost.lat,
+            self.ghost.lon,
+            self.ghost.elevation,
+            self.ghost.speed,
+            self.ghost.heading,
+            self.ghost.slant,
+            self.ghost.rbearing,
+            self.ghost.raltitude,
+            self.ghost.rdistance,
+            self.target.lat,
+            self.target.lon,
+            self.target.elevation,
+            self.target.speed,
+            self.target.track,
+            self.target.effective_angle,
+            self.ghost.closing_speed,
             self.attack_valid,
             self.RA_triggered
-        ]
-        #write the row
-        self.csv_writer.writerow(data)
-        self.csv_file.flush()  # Ensure data is written to the file system
-        #if the attack geometry is not valid anymore stop writing data and close th file
-        if self.attack_valid is False:
-            try:
-                self.csv_file.close()
-            except Exception as e:
-                xp.debugString(f"Error closing file: {str(e)}\n")
-            return 0
-           
-        return 0.1  # Call this function again in 0.1 seconds
+        )
 
 
 
     def XPluginReceiveMessage(self, msg_from, msg, param):
-        if msg == MSG_RELEASE_PLANES:
+        if msg == xp.MSG_SCENERY_LOADED:
+            #X-Plane moved the origin of its local frame, the ghosts are written there so the transform is fitted again
+            if self.frame:
+                self.frame.fit_local(xp.worldToLocal)
+            return
+        if msg == xp.MSG_RELEASE_PLANES:
             # if another plugin needs to take control of our tcas planes release them
             self.not_our_planes()
             who = xp.getPluginInfo(msg_from)
@@ -279,13 +466,15 @@ class PythonInterface:
                             'widgets': {}      # dict() of all child widgets we care about
             }
         
-        top = 700
+        self.widget_text = {} #the new text fields are empty, so every field is written at the next refresh
+        top = 810
         left = 100
         right = 400
         bottom = 1
 
         widgetWindow['widgetID'] = xp.createWidget(left, top, right, bottom, 1, "TCAS Attack Control",
                                                    1, 0, xp.WidgetClass_MainWindow)
+        xp.setWidgetProperty(widgetWindow['widgetID'], xp.Property_MainWindowHasCloseBoxes, 1)
         xp.addWidgetCallback(widgetWindow['widgetID'], self.widgetCallback)
 
         # Define initial positions for labels and text fields
@@ -296,7 +485,8 @@ class PythonInterface:
             "Ghost lat", "Ghost lon", "Ghost elevation", "Ghost speed", "Ghost heading", "Ghost slant",
             "Ghost rel.bearing", "Ghost rel.alt", "Ghost rel.dist", "Target lat", "Target lon",
             "Target elevation", "Target speed", "Target heading", "Elevation angle", "Closing speed (kt):",
-            "Attack Valid:", "RA:"
+            "Attack Valid:", "RA:", "Window left (s)", "Tau (s)", "RA latency (s)",
+            "Closing 1s (kt)", "Slant rate (m/s)", "Frame p50/p99/max"
         ]
         text_fields = []
 
@@ -329,6 +519,12 @@ class PythonInterface:
             "closing_speed": text_fields[19],
             "attack_valid": text_fields[20],
             "RA": text_fields[21],
+            "window": text_fields[22],
+            "tau": text_fields[23],
+            "ra_latency": text_fields[24],
+            "closing_1s": text_fields[25],
+            "slant_rate": text_fields[26],
+            "timing": text_fields[27],
          }  
 
         # Create buttons
@@ -348,23 +544,159 @@ class PythonInterface:
         xp.setWidgetProperty(self.RA_button, xp.Property_ButtonType, xp.PushButton) 
         #load data from the config file
         self.loadConfig()
-        #start updating the widget
-        xp.registerFlightLoopCallback(self.update_widget_fields, 0.1, None)
+        return widgetWindow
     
     """load our ini data"""
     def loadConfig(self):
         self.config = configparser.ConfigParser()
-        self.config.read('config.ini')
+        self.config.read(self.config_path)
         self.load_initial_settings()
 
     """read the file and set the variables"""
     def load_initial_settings(self):
         settings = self.config['Settings']
-        self.attacker_lat = float(settings['attacker_lat'])
-        self.attacker_lon = float(settings['attacker_lon'])
-        self.attacker_elevation = float(settings['attacker_elevation'])
+        #the ghosts are built at launch and [Settings] gets the checks of a scenario, so a bad value is reported now
+        self.config_errors = self.check_ghost_sections()
+        try:
+            check_settings('Settings', settings)
+        except ValueError as e:
+            self.config_errors.append(str(e))
+            settings = None
+        for error in self.config_errors:
+            xp.debugString(f"ACAS config file: {error}\n")
+        if settings is None:
+            return #no attack can be set up from these settings
+        self.apply_settings(settings)
+        #optional rate divisors of the pipeline stages, e.g. log = 6 writes a log row every 6th frame
+        if self.config.has_section('Scheduler'):
+            self.apply_divisors(self.config['Scheduler'])
+        #optional binary copy of the log, for fast analysis of long or high rate runs
+        self.binary_log = settings.getboolean('binary_log', False)
+        #optional queue of scenarios, all checked now so that a bad one does not stop the queue halfway
+        if settings.get('scenario_file'):
+            path = os.path.join(os.path.dirname(self.config_path), settings['scenario_file'])
+            try:
+                self.scenarios = load_scenarios(path, settings)
+            except ValueError as e:
+                self.scenarios = []
+                xp.debugString(f"ACAS scenario file not used: {e}\n")
+        #optional live telemetry of every frame of the attack to another process on this machine
+        if settings.get('telemetry_port'):
+            self.telemetry_address = (settings.get('telemetry_host', '127.0.0.1'), settings.getint('telemetry_port'))
+        #seconds of frames kept in the history that is written out when an RA occurs
+        self.history_seconds = settings.getfloat('history_seconds', 60.0)
+        self.profiling = settings.getboolean('profiling', False)
+
+    """set the rate divisors of the [Scheduler] section, a bad entry is reported and the stage keeps its divisor"""
+    def apply_divisors(self, section):
+        stages = [stage.name for stage in self.scheduler.stages]
+        for name, value in section.items():
+            if name not in stages:
+                xp.debugString(f"ACAS scheduler setting not used: [Scheduler] {name} is not one of {', '.join(stages)}\n")
+                continue
+            try:
+                divisor = int(value)
+            except ValueError:
+                divisor = 0
+            if divisor < 1:
+                xp.debugString(f"ACAS scheduler setting not used: [Scheduler] {name} = {value} is not a whole number of at least 1\n")
+                continue
+            self.scheduler.set_divisor(name, divisor)
+
+    """check the icao and tailnum of every [Ghost ...] section and that the ghosts fit the TCAS, returns the problems found"""
+    def check_ghost_sections(self):
+        errors = []
+        sections = [name for name in self.config.sections() if name.startswith('Ghost')]
+        max_targets = xp.getDatavi(self.ref_modeS_id, None, 0, 0)
+        if len(sections) >= max_targets:
+            errors.append(f"{len(sections)} ghosts do not fit the {max_targets - 1} TCAS targets")
+        for name in sections:
+            ghost = self.config[name]
+            try:
+                icao = int(ghost.get('icao', ''), 16)
+                if not 0 < icao <= 0xFFFFFF:
+                    errors.append(f"[{name}] icao = {ghost['icao']} is not a 24 bit address")
+            except ValueError:
+                errors.append(f"[{name}] icao must be a hexadecimal address, not {ghost.get('icao')!r}")
+            tailnum = ghost.get('tailnum', '')
+            if not tailnum or not tailnum.isascii() or len(tailnum) > 8:
+                errors.append(f"[{name}] tailnum must be 1 to 8 ASCII characters, not {tailnum!r}")
+        return errors
+
+    """set up the attack from a settings section, the [Settings] of config.ini or those of a scenario"""
+    def apply_settings(self, settings):
+        self.attacker.lat = float(settings['attacker_lat'])
+        self.attacker.lon = float(settings['attacker_lon'])
+        self.attacker.elevation = float(settings['attacker_elevation'])
         self.start_distance = float(settings['start_distance'])
-        self.ghost_speed = float(settings['ghost_speed'])
+        self.ghost.speed = float(settings['ghost_speed'])
+        #the TCAS dataref watched for advisories, an empty value leaves only the RA button
+        self.advisory_dataref = settings.get('ra_dataref', self.advisory_dataref)
+        self.advisory_level = settings.getint('ra_level', self.advisory_level)
+        self.fade_time = settings.getfloat('fade_time', 0.0)
+        self.settings = settings #the ghosts are built from these when the attack is launched
+
+    """time every pipeline stage, the whole frame and the geometry helpers"""
+    def start_profiling(self):
+        if self.profiler:
+            return
+        from instrumentation import Profiler #optional timing of the hot path
+        self.profiler = Profiler()
+        self.profiler.instrument_scheduler(self.scheduler)
+        #the flight loop is registered when the plugin is enabled, the timed one takes its place
+        xp.unregisterFlightLoopCallback(self.scheduler.flight_loop, None)
+        self.scheduler.flight_loop = self.profiler.wrap('frame', self.scheduler.flight_loop)
+        xp.registerFlightLoopCallback(self.scheduler.flight_loop, -1, None)
+        self.check_proximity = self.profiler.wrap('check_proximity', self.check_proximity)
+        self.profile_swarm()
+        self.scheduler.add_stage('profile', self.update_timing, divisor=60)
+
+    """time the per frame work of the swarm, again every time the swarm is rebuilt"""
+    def profile_swarm(self):
+        for name in ('advance', 'check', 'to_local'):
+            setattr(self.swarm, name, self.profiler.wrap(f"swarm.{name}", getattr(self.swarm, name)))
+
+    """time the geometry helpers of the local frame, again every time the frame is created for a new attack"""
+    def profile_frame(self):
+        for name in ('to_enu', 'to_enu_batch', 'fit_local', 'to_geodetic', 'to_geodetic_batch', 'to_local_batch'):
+            setattr(self.frame, name, self.profiler.wrap(f"frame.{name}", getattr(self.frame, name)))
+        self.target_point.to_enu = self.profiler.wrap('target_point.to_enu', self.target_point.to_enu)
+
+    """refresh the frame timing shown in the widget"""
+    def update_timing(self, elapsed):
+        self.timing_text = self.profiler.summary('frame')
+
+    """read the optional [Ghost ...] sections, one per ghost, without any of them a single ghost is built from [Settings]"""
+    def load_ghost_settings(self, settings):
+        from ghost_swarm import GhostSwarm #state of all the ghosts we inject
+        from ghost_table import GhostTrajectoryTable #optional precomputed ghost paths for predictable targets
+        sections = [name for name in self.config.sections() if name.startswith('Ghost')]
+        step = settings.getfloat('ghost_step', 0.05) #seconds of one ghost integration step
+        if not sections:
+            self.swarm = GhostSwarm(self.ids[:1], self.tailnum[:1], [self.ghost.speed], [self.start_distance], step=step)
+        else:
+            ids, tailnums, speeds, distances, bearing_offsets, altitude_offsets = [], [], [], [], [], []
+            for name in sections:
+                ghost = self.config[name]
+                ids.append(int(ghost['icao'], 16))
+                tailnums.append(ghost['tailnum'].encode('ascii'))
+                speeds.append(ghost.getfloat('ghost_speed', self.ghost.speed))
+                distances.append(ghost.getfloat('start_distance', self.start_distance))
+                bearing_offsets.append(ghost.getfloat('bearing_offset', 0.0))
+                altitude_offsets.append(ghost.getfloat('altitude_offset', 0.0))
+            self.swarm = GhostSwarm(ids, tailnums, speeds, distances, bearing_offsets, altitude_offsets, step)
+        self.TARGET = self.swarm.count
+        self.ids = self.swarm.ids
+        self.tailnum = self.swarm.tailnum
+        self.ghost.speed = float(self.swarm.speed[0]) #the first ghost is the one shown in the widget and the log
+        #optional precomputed ghost paths, for scripted or otherwise predictable target paths
+        if settings.getboolean('ghost_table', False):
+            self.ghost_table = GhostTrajectoryTable(self.swarm, settings.getfloat('table_horizon', 120.0),
+                                                    settings.getfloat('table_drift', 100.0))
+        else:
+            self.ghost_table = None
+        if self.profiler:
+            self.profile_swarm()
 
     """parse the float"""
     def parse_float(self, value):
@@ -375,47 +707,159 @@ class PythonInterface:
         
     """callback for handling widget actions and detecting if one of the interface buttons is pressed"""
     def widgetCallback(self, inMessage, inWidget, inParam1, inParam2):  
+        if (inMessage == xp.Msg_MainWindowCloseButtonPushed):
+            xp.hideWidget(self.myWidgetWindow['widgetID']) #the widget stops refreshing while it is hidden
+            return 1
         if (inMessage == xp.Msg_PushButtonPressed):
              if (inParam1 == self.launch_button):  
                 self.startAttack()
                 return 1
         if (inMessage == xp.Msg_PushButtonPressed):
              if (inParam1 == self.RA_button):  
+                #manual mark of the RA, kept next to the automatic detection in the event log
                 self.RA_triggered=True
+                if self.snapshot is not None and self.history is not None:
+                    self.dump_history()
+                    self.record_event("advisory", "button", xp.getElapsedTime())
                 return 1
         return 0
     
-    """if a the start button is pressed start the attack"""
+    """callback of the plugins menu entry, the close box only hides the widget so it is shown again from here"""
+    def menuHandler(self, menuRef, itemRef):
+        if itemRef == 'show' and self.myWidgetWindow:
+            xp.showWidget(self.myWidgetWindow['widgetID'])
+        elif itemRef == 'cancel':
+            self.cancel_queue("cancelled from the menu")
+
+    """if a the start button is pressed start the attack, or the scenario queue when there is one"""
     def startAttack(self):
-        if not xp.acquirePlanes(None, self.retry_acquiring_planes, None):
+        if self.config_errors:
+            xp.debugString("ACAS attack not launched, the config file has errors\n")
+        elif self.queue_state is not None:
+            xp.debugString("ACAS scenario queue is already running, it can be cancelled from the plugins menu\n")
+        elif self.scenarios:
+            self.scenario_index = 0
+            self.start_scenario()
+        else:
+            self.launch_run()
+
+    """clear what the last attack left behind, set up the new one and take over the TCAS"""
+    def launch_run(self):
+        self.reset_run()
+        self.start_session()
+        if not self.tcas_has_room():
+            self.end_session()
+            self.cancel_queue("the ghosts do not fit the TCAS")
+        elif not xp.acquirePlanes(None, self.retry_acquiring_planes, None):
             (total, active, controller) = xp.countAircraft()
             who = xp.getPluginInfo(controller)
             xp.debugString("The plugin could acquire the TCAS because it is used by another plugin")
+            self.cancel_queue("the TCAS is used by another plugin")
         else:
             self.my_tcas()
 
-    def update_widget_fields(self, elapsed1, elapsed2, counter, refcon):
-        # Update widget fields based on the latest data
-        xp.setWidgetDescriptor(self.widget_dict['att_lat'], str(self.attacker_lat))
-        xp.setWidgetDescriptor(self.widget_dict['att_lon'], str(self.attacker_lon))
-        xp.setWidgetDescriptor(self.widget_dict['att_elevation'], str(self.attacker_elevation))
-        xp.setWidgetDescriptor(self.widget_dict['att_slant'], str(self.attacker_slant))
-        xp.setWidgetDescriptor(self.widget_dict['ghost_lat'], str(self.ghost_lat))
-        xp.setWidgetDescriptor(self.widget_dict['ghost_lon'], str(self.ghost_lon))
-        xp.setWidgetDescriptor(self.widget_dict['ghost_elevation'], str(self.ghost_elevation))
-        xp.setWidgetDescriptor(self.widget_dict['ghost_speed'], str(self.ghost_speed))
-        xp.setWidgetDescriptor(self.widget_dict['ghost_heading'], str(self.ghost_heading))
-        xp.setWidgetDescriptor(self.widget_dict['ghost_slant'], str(self.ghost_slant))
-        xp.setWidgetDescriptor(self.widget_dict['ghost_rbearing'], str(self.ghost_rbearing))
-        xp.setWidgetDescriptor(self.widget_dict['ghost_raltitude'], str(self.ghost_raltitude))
-        xp.setWidgetDescriptor(self.widget_dict['ghost_rdistance'], str(self.ghost_rdistance))
-        xp.setWidgetDescriptor(self.widget_dict['target_lat'], str(self.target_lat))
-        xp.setWidgetDescriptor(self.widget_dict['target_lon'], str(self.target_lon))
-        xp.setWidgetDescriptor(self.widget_dict['target_elevation'], str(self.target_elevation))
-        xp.setWidgetDescriptor(self.widget_dict['target_speed'], str(self.target_speed))
-        xp.setWidgetDescriptor(self.widget_dict['target_heading'], str(self.target_trk))
-        xp.setWidgetDescriptor(self.widget_dict['effective_angle'], str(self.effective_angle))
-        xp.setWidgetDescriptor(self.widget_dict['closing_speed'], str(self.closing_speed))
-        xp.setWidgetDescriptor(self.widget_dict['attack_valid'], str(self.attack_valid))
-        xp.setWidgetDescriptor(self.widget_dict['RA'], str(self.RA_triggered))
-        return 0.1  # Call this function again after 0.1 seconds
\ No newline at end of file
+    """everything an attack changes goes back to its starting value, the logs of a finished attack are kept"""
+    def reset_run(self):
+        self.end_session()
+        self.attack_valid = True
+        self.RA_triggered = False
+        self.advisory_active = False
+        self.ra_time = None
+        self.ra_latency = None
+        self.window_remaining = None
+        self.predicted_end_time = None
+        self.attack_faded = False
+        self.ghost.tau = None
+
+    """create what an attack needs: the ghosts, the history, new log files and the optional telemetry and profiling"""
+    def start_session(self):
+        from frame_history import FrameHistory #the last frames of the attack
+        self.load_ghost_settings(self.settings)
+        #a history that grew for a faster frame rate is kept as long as it covers the same seconds
+        if self.history is None or self.history.seconds != self.history_seconds:
+            self.history = FrameHistory(int(self.history_seconds * self.HISTORY_RATE), self.history_seconds)
+        self.setup_csv_logging()
+        if self.telemetry_address:
+            from telemetry_stream import TelemetryPublisher #optional live stream of every frame over UDP
+            self.telemetry = TelemetryPublisher(*self.telemetry_address)
+        if self.profiling:
+            self.start_profiling()
+
+    """write out and close the logs and the telemetry of the attack, safe to call more than once"""
+    def end_session(self):
+        if self.log_writer:
+            self.close_log(self.log_writer)
+            self.close_log(self.event_writer)
+        if self.telemetry:
+            self.telemetry.close()
+            self.telemetry = None
+
+    """close a log writer, a write that failed in its thread or rows it had to drop are reported here"""
+    def close_log(self, writer):
+        try:
+            writer.close()
+        except OSError as e:
+            xp.debugString(f"ACAS log incomplete: {e}\n")
+        if writer.dropped:
+            xp.debugString(f"ACAS log {writer.path}: {writer.dropped} rows dropped, the disk could not keep up\n")
+            writer.dropped = 0
+
+    """set up and launch the current scenario of the queue"""
+    def start_scenario(self):
+        scenario = self.scenarios[self.scenario_index]
+        settings = configparser.ConfigParser()
+        settings.read_dict({'Settings': scenario.settings})
+        self.apply_settings(settings['Settings'])
+        xp.debugString(f"ACAS scenario {self.scenario_index + 1}/{len(self.scenarios)}: {scenario.name}\n")
+        self.queue_state = 'launching'
+        try:
+            self.launch_run()
+        except Exception:
+            self.cancel_queue("the launch failed")
+            raise
+
+    """stop the scenario queue, the attack of the current scenario is ended and its logs are written out"""
+    def cancel_queue(self, reason):
+        if self.queue_state is None:
+            return
+        self.queue_state = None
+        self.scheduler.stop('attack')
+        if self.plugin_owns_tcas:
+            self.not_our_planes()
+        self.end_session()
+        xp.debugString(f"ACAS scenario queue stopped at scenario {self.scenario_index + 1}/{len(self.scenarios)}: {reason}\n")
+
+    """end the attack of the queue that is over, wait for the pause and launch the next scenario"""
+    def run_queue(self, elapsed):
+        if self.queue_state == 'running':
+            scenario = self.scenarios[self.scenario_index]
+            timed_out = scenario.max_duration is not None and xp.getElapsedTime() - self.launch_time >= scenario.max_duration
+            if self.scheduler.is_running('attack') and not timed_out:
+                return
+            #hand the TCAS back and write out the logs of this run before the next one
+            self.scheduler.stop('attack')
+            if self.plugin_owns_tcas:
+                self.not_our_planes()
+            self.end_session()
+            self.queue_state = 'pause'
+            self.resume_time = xp.getElapsedTime() + scenario.pause
+        elif self.queue_state == 'pause' and xp.getElapsedTime() >= self.resume_time:
+            self.scenario_index += 1
+            if self.scenario_index < len(self.scenarios):
+                self.start_scenario()
+            else:
+                self.queue_state = None
+                xp.debugString(f"ACAS scenario queue finished, {len(self.scenarios)} attacks run\n")
+
+    """push the values that changed since the last refresh to the widget, nothing is done while the window is hidden"""
+    def update_widget_fields(self, elapsed):
+        if not self.myWidgetWindow or not xp.isWidgetVisible(self.myWidgetWindow['widgetID']):
+            return
+        self.locate_lead_ghost()
+        last_text = self.widget_text
+        for (key, _, display_format), getter in zip(self.WIDGET_FIELDS, self.WIDGET_GETTERS):
+            value = getter(self)
+            text = "" if value is None else format(value, display_format)
+            if last_text.get(key) != text:
+                last_text[key] = text
+                xp.setWidgetDescriptor(self.widget_dict[key], text)
\ No newline at end of file
@@ -0,0 +1,112 @@
+#Offline model of a whole attack run, used to evaluate many attack geometries at once with NumPy
+#It follows the same stages as the plugin does every frame: the target flies on (read), the ghost is turned
+#towards the target and moves along its heading (propagate) and the slant ranges are compared (validate). Each
+#argument can be a scalar or an array, one entry per configuration.
+#The target can also turn, climb and change speed, and the values the plugin would read from the datarefs can be
+#given gaussian noise, for the Monte Carlo runs of monte_carlo.py.
+import numpy as np
+from batch_utilities import (calculate_future_position_batch, calculate_initial_ghost_position_batch,
+                             calculate_relative_speed_in_knots_batch, calculate_required_heading_batch,
+                             haversine_batch)
+
+KNOTS_TO_MPS = 0.514444
+METERS_PER_DEGREE = 111139  # flat earth step for the ghost movement
+EARTH_RADIUS_M = 6371000  # for the position noise, same value as in batch_utilities.py
+
+
+def simulate_attacks(attacker_lat, attacker_lon, attacker_elevation, start_distance, ghost_speed,
+                     target_lat, target_lon, target_elevation, target_speed, target_trk,
+                     duration=600.0, dt=0.1, target_turn_rate=0.0, target_climb_rate=0.0, target_acceleration=0.0,
+                     position_noise=0.0, altitude_noise=0.0, track_noise=0.0, rng=None):
+    """Fly every configuration for up to duration seconds with a step of dt seconds.
+
+    The target turns at target_turn_rate (degrees per second, positive to the right), climbs at target_climb_rate
+    (m/s) and changes its speed (knots) by target_acceleration knots per second, never below zero. With all three
+    at zero it keeps its track and speed. The ghost flies at the target elevation, as in update_tcas.
+    position_noise (m, horizontal), altitude_noise (m) and track_noise (degrees) are the standard deviations of
+    gaussian errors added every step to the target values the ghost steers by and the slant ranges and closing
+    speed are worked out from, drawn from rng (a numpy Generator).
+    Returns a dict of arrays: valid_duration (s), min_slant (m) and peak_closing_speed (kt), all measured while
+    the ghost was still further from the target than the attacker.
+    """
+    arrays = np.broadcast_arrays(*(np.asarray(v, dtype=float) for v in (
+        attacker_lat, attacker_lon, attacker_elevation, start_distance, ghost_speed,
+        target_lat, target_lon, target_elevation, target_speed, target_trk,
+        target_turn_rate, target_climb_rate, target_acceleration)))
+    (attacker_lat, attacker_lon, attacker_elevation, start_distance, ghost_speed,
+     target_lat0, target_lon0, target_elevation0, target_speed0, target_trk0,
+     turn_rate, climb_rate, acceleration) = (a.ravel() for a in arrays)
+    shape = arrays[0].shape
+    #a target that turns or changes speed is flown step by step, a steady one from its launch position in one go
+    manoeuvring = bool(turn_rate.any() or acceleration.any())
+    noisy = position_noise > 0 or altitude_noise > 0 or track_noise > 0
+    if noisy and rng is None:
+        rng = np.random.default_rng()
+
+    #launch, as initialise_attack does
+    target_lat, target_lon = target_lat0, target_lon0
+    heading = calculate_required_heading_batch(attacker_lat, attacker_lon, target_lat0, target_lon0)
+    ghost_lat, ghost_lon = calculate_initial_ghost_position_batch(attacker_lat, attacker_lon, start_distance, (heading + 180) % 360)
+    speed_mps = ghost_speed * KNOTS_TO_MPS
+
+    count = ghost_lat.size
+    valid_duration = np.full(count, float(duration))
+    min_slant = np.full(count, np.inf)
+    peak_closing_speed = np.zeros(count)
+    #configurations that are still valid, the others are dropped from the arrays as soon as they break
+    active = np.arange(count)
+
+    steps = int(round(duration / dt))
+    for step in range(1, steps + 1):
+        t = step * dt
+        #fly the target on, a manoeuvring one with its track and speed at the middle of the step
+        if manoeuvring:
+            middle = t - dt / 2
+            target_lat, target_lon = calculate_future_position_batch(
+                target_lat, target_lon, np.maximum(target_speed0 + acceleration * middle, 0.0),
+                target_trk0 + turn_rate * middle, dt / 3600)
+        else:
+            target_lat, target_lon = calculate_future_position_batch(target_lat0, target_lon0, target_speed0, target_trk0, t / 3600)
+        target_elevation = target_elevation0 + climb_rate * t
+        target_speed = np.maximum(target_speed0 + acceleration * t, 0.0)
+        target_trk = (target_trk0 + turn_rate * t) % 360
+        #the values the plugin reads, with the dataref noise on top
+        read_lat, read_lon, read_elevation, read_trk = target_lat, target_lon, target_elevation, target_trk
+        if noisy:
+            size = target_lat.size
+            read_lat = target_lat + np.degrees(rng.normal(0.0, position_noise, size) / EARTH_RADIUS_M)
+            read_lon = target_lon + np.degrees(rng.normal(0.0, position_noise, size) / (EARTH_RADIUS_M * np.cos(np.radians(target_lat))))
+            read_elevation = target_elevation + rng.normal(0.0, altitude_noise, size)
+            read_trk = target_trk + rng.normal(0.0, track_noise, size)
+        #turn the ghost towards the target it reads and move the ghost along its heading
+        heading = calculate_required_heading_batch(ghost_lat, ghost_lon, read_lat, read_lon)
+        heading_radians = np.radians(heading)
+        distance = speed_mps * dt
+        delta_lat = distance * np.cos(heading_radians) / METERS_PER_DEGREE
+        delta_lon = distance * np.sin(heading_radians) / (METERS_PER_DEGREE * np.cos(np.radians(ghost_lat)))
+        ghost_lat = ghost_lat + delta_lat
+        ghost_lon = ghost_lon + delta_lon
+        #compare the slant ranges
+        attacker_slant = haversine_batch(attacker_lat, attacker_lon, read_lat, read_lon, attacker_elevation, read_elevation)
+        ghost_slant = haversine_batch(ghost_lat, ghost_lon, read_lat, read_lon, read_elevation, read_elevation)
+        closing_speed = calculate_relative_speed_in_knots_batch(ghost_speed, heading, target_speed, read_trk)
+        valid = ghost_slant > attacker_slant
+        min_slant[active[valid]] = np.minimum(min_slant[active[valid]], ghost_slant[valid])
+        peak_closing_speed[active[valid]] = np.maximum(peak_closing_speed[active[valid]], closing_speed[valid])
+        if not valid.all():
+            valid_duration[active[~valid]] = t
+            active = active[valid]
+            if active.size == 0:
+                break
+            (attacker_lat, attacker_lon, attacker_elevation, ghost_speed, speed_mps, ghost_lat, ghost_lon,
+             target_lat0, target_lon0, target_elevation0, target_speed0, target_trk0, turn_rate, climb_rate, acceleration,
+             target_lat, target_lon) = (
+                a[valid] for a in (attacker_lat, attacker_lon, attacker_elevation, ghost_speed, speed_mps, ghost_lat, ghost_lon,
+                                   target_lat0, target_lon0, target_elevation0, target_speed0, target_trk0,
+                                   turn_rate, climb_rate, acceleration, target_lat, target_lon))
+
+    return {
+        'valid_duration': valid_duration.reshape(shape),
+        'min_slant': min_slant.reshape(shape),
+        'peak_closing_speed': peak_closing_speed.reshape(shape),
+    }
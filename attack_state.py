@@ -0,0 +1,49 @@
+#State of an attack: one small record each for the attacker, the lead ghost and the target
+#The records use __slots__, so they hold only their fields. The history of the last frames is in frame_history.py.
+
+
+class AttackerState:
+    __slots__ = ('lat', 'lon', 'elevation', 'slant')
+
+    def __init__(self):
+        self.lat = 0.0
+        self.lon = 0.0
+        self.elevation = 0.0  # meters
+        self.slant = 0.0  # meters to the target
+
+
+class GhostState:
+    """The first ghost of the swarm, the one that is logged and shown in the widget"""
+    __slots__ = ('lat', 'lon', 'elevation', 'speed', 'heading', 'slant', 'rbearing', 'raltitude', 'rdistance',
+                 'closing_speed', 'tau')
+
+    def __init__(self):
+        self.lat = 0.0
+        self.lon = 0.0
+        self.elevation = 950.0  # meters
+        self.speed = 0.0  # knots
+        self.heading = 0.0
+        self.slant = 0.0  # meters to the target
+        self.rbearing = 0.0  # TCAS indicators as seen by the simulator
+        self.raltitude = 0.0
+        self.rdistance = 0.0
+        self.closing_speed = 0.0  # knots
+        self.tau = None  # TCAS tau in seconds, from the attack window prediction
+
+
+class TargetState:
+    __slots__ = ('lat', 'lon', 'elevation', 'speed', 'track', 'theta', 'east', 'north', 'up', 'elevation_angle',
+                 'effective_angle')
+
+    def __init__(self):
+        self.lat = None
+        self.lon = None
+        self.elevation = None  # meters
+        self.speed = 0.0  # knots
+        self.track = 0.0
+        self.theta = 0.0  # pitch in degrees
+        self.east = 0.0  # position in the local frame of the attack, meters
+        self.north = 0.0
+        self.up = 0.0
+        self.elevation_angle = 0.0  # degrees above the attacker horizon
+        self.effective_angle = 0.0  # elevation angle plus the target pitch
@@ -0,0 +1,112 @@
+#Predicts, from the current state, how long the attack geometry stays valid
+#The ghost flies a pure pursuit (it always heads straight for the target, as update_ghosts does) at constant speed,
+#and the target keeps its ground speed, track and vertical speed. In a flat frame around the attacker the pursuit
+#has a closed form in the angle phi between the target velocity and the line of sight from ghost to target:
+#    r(phi) = r0 * (sin phi / sin phi0)^(k-1) * ((1 + cos phi0) / (1 + cos phi))^k      with k = ghost / target speed
+#    t(phi) = (Q0 - Q(phi)) / (vg^2 - vt^2)                                             with Q = r (vg + vt cos phi)
+#so the time the ghost slant range meets the attacker slant range is found with a fixed size scan and bisection
+#over phi. The cost is the same for every call, no matter how far ahead the answer is.
+#The ghosts fly at the target altitude plus their own offset, so a ghost stays that far above the target and its
+#slant range to the target is the pursuit range combined with the offset.
+import collections
+import math
+
+import numpy as np
+
+EARTH_RADIUS_M = 6371000  # same sphere as haversine
+KNOTS_TO_MPS = 0.514444
+
+AttackWindow = collections.namedtuple('AttackWindow', [
+    'time_to_invalid',  # seconds until the ghost is as close to the target as the attacker (inf beyond the horizon)
+    'time_to_closest_approach',  # seconds until the ghost is closest to the target
+    'min_range',  # slant meters between ghost and target at closest approach
+    'tau',  # TCAS tau now: slant range divided by its closure rate in seconds (inf when not closing)
+])
+
+
+def _local(lat, lon, lat0, lon0):
+    """East and north meters from (lat0, lon0), flat around the attacker."""
+    scale = math.pi / 180 * EARTH_RADIUS_M
+    return ((np.asarray(lon, dtype=float) - lon0) * scale * math.cos(math.radians(lat0)),
+            (np.asarray(lat, dtype=float) - lat0) * scale)
+
+
+def predict_attack_window(attacker_lat, attacker_lon, attacker_elevation,
+                          target_lat, target_lon, target_elevation, target_speed, target_trk, target_vertical_speed,
+                          ghost_lat, ghost_lon, ghost_speed, ghost_altitude_offset=0.0, horizon=3600.0, samples=64,
+                          iterations=24):
+    """Attack window of every ghost (the ghost arguments may be arrays). Speeds in knots, vertical speed in m/s and
+    the altitude offset of the ghosts above the target in meters.
+
+    Returns an AttackWindow of arrays with one entry per ghost.
+    """
+    #every per ghost value is a column (ghosts, 1) so it broadcasts along the scan grid
+    ghost_values = (ghost_lat, ghost_lon, ghost_speed, ghost_altitude_offset)
+    ghost_lat, ghost_lon, ghost_speed, offset = (a.reshape(-1, 1) for a in np.broadcast_arrays(
+        *(np.atleast_1d(np.asarray(v, dtype=float)) for v in ghost_values)))
+    target_x, target_y = _local(target_lat, target_lon, attacker_lat, attacker_lon)
+    ghost_x, ghost_y = _local(ghost_lat, ghost_lon, attacker_lat, attacker_lon)
+    vt = target_speed * KNOTS_TO_MPS
+    vx, vy = vt * math.sin(math.radians(target_trk)), vt * math.cos(math.radians(target_trk))
+    vg = ghost_speed * KNOTS_TO_MPS
+    dz0 = target_elevation - attacker_elevation
+
+    #line of sight from ghost to target and its angle phi0 to the target velocity
+    dx, dy = target_x - ghost_x, target_y - ghost_y
+    r0 = np.hypot(dx, dy)
+    phi0 = np.arctan2(np.abs(vx * dy - vy * dx), vx * dx + vy * dy) if vt > 0 else np.zeros_like(r0)
+    closure = vg - vt * np.cos(phi0)  # closing speed along the line of sight right now
+    #the slant range closes at the horizontal closure scaled by r / slant, so tau is slant^2 / (r * closure)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        tau = np.where(closure > 0, (r0**2 + offset**2) / (r0 * closure), np.inf)
+    #a target that stands still or flies along the line of sight gives a straight chase
+    straight = (vt < 1e-6) | (np.sin(phi0) < 1e-6)
+    vg = np.where(np.abs(vg - vt) < 1e-6, vt + 1e-6, vg)  # the closed form needs ghost and target speeds to differ
+    k = vg / max(vt, 1e-9)
+    q0 = r0 * (vg + vt * np.cos(phi0))
+
+    def attacker_slant(t):
+        return np.hypot(np.hypot(target_x + vx * t, target_y + vy * t), dz0 + target_vertical_speed * t)
+
+    def pursuit(p):
+        """Time and ghost range at parameter p: phi for a curved pursuit, time for a straight chase."""
+        with np.errstate(all='ignore'):
+            log_r = (np.log(r0) + (k - 1) * (np.log(np.sin(p)) - np.log(np.sin(phi0)))
+                     + k * (np.log1p(np.cos(phi0)) - np.log1p(np.cos(p))))
+            r_curve = np.exp(log_r)
+            t_curve = (q0 - r_curve * (vg + vt * np.cos(p))) / (vg**2 - vt**2)
+        r_straight = np.maximum(r0 - closure * p, 0.0)
+        return np.where(straight, p, t_curve), np.where(straight, r_straight, r_curve)
+
+    def broken(p):
+        t, r = pursuit(p)
+        return (np.hypot(r, offset) <= attacker_slant(t)) & (t <= horizon) & np.isfinite(t)
+
+    #scan phi from phi0 down towards 0 (curved) or time from 0 to the horizon (straight)
+    p_start = np.where(straight, 0.0, phi0)
+    p_end = np.where(straight, horizon, 1e-9)
+    p_grid = p_start + (p_end - p_start) * np.linspace(0.0, 1.0, samples + 1)
+    invalid = broken(p_grid)
+    found = invalid.any(axis=-1, keepdims=True)
+    first = np.argmax(invalid, axis=-1)[:, None]
+
+    #bisection between the last valid sample and the first invalid one
+    low = np.take_along_axis(p_grid, np.maximum(first - 1, 0), axis=-1)
+    high = np.take_along_axis(p_grid, first, axis=-1)
+    for _ in range(iterations):
+        middle = (low + high) / 2
+        middle_broken = broken(middle)
+        low = np.where(middle_broken, low, middle)
+        high = np.where(middle_broken, middle, high)
+    time_to_invalid = np.where(found, np.where(first == 0, 0.0, pursuit(high)[0]), np.inf)
+
+    #closest approach: capture for a faster ghost, otherwise where cos phi = k
+    phi_min = np.arccos(np.clip(k, -1.0, 1.0))
+    with np.errstate(divide='ignore'):
+        t_min, r_min = pursuit(np.where(straight, np.where(closure > 0, r0 / closure, 0.0), phi_min))
+    capture = np.where(straight, closure > 0, k > 1)
+    turning_closer = ~straight & (phi0 > phi_min)
+    time_to_closest_approach = np.where(capture, np.where(straight, t_min, q0 / (vg**2 - vt**2)),
+                                        np.where(turning_closer, t_min, 0.0))
+    min_range = np.hypot(np.where(capture, 0.0, np.where(turning_closer, r_min, r0)), offset)
+    return AttackWindow(*(a[:, 0] for a in (time_to_invalid, time_to_closest_approach, min_range, tau)))
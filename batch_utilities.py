@@ -0,0 +1,91 @@
+#Array versions of the geometry functions in utilities.py, used for offline analysis and for many ghosts at once
+#Every function takes scalars or NumPy arrays, broadcasts its arguments against each other and returns arrays.
+#The formulas are the same as the scalar versions so the results agree with utilities.py to within
+#1e-9 (relative) for distances and speeds and 1e-9 degrees for angles and positions.
+import numpy as np
+
+EARTH_RADIUS_KM = 6371  # Radius of Earth in kilometers, same value as in utilities.py
+KNOTS_TO_KMH = 1.852
+
+
+def calculate_relative_speed_in_knots_batch(speed1_knots, bearing1, speed2_knots, bearing2):
+    """Relative speed in knots between two sets of aircraft (speeds in knots, bearings in degrees)."""
+    bearing1_rad = np.radians(bearing1)
+    bearing2_rad = np.radians(bearing2)
+    speed1_kmh = np.asarray(speed1_knots, dtype=float) * KNOTS_TO_KMH
+    speed2_kmh = np.asarray(speed2_knots, dtype=float) * KNOTS_TO_KMH
+    #components of the relative velocity vector in km/h
+    relative_v_x = speed1_kmh * np.sin(bearing1_rad) - speed2_kmh * np.sin(bearing2_rad)
+    relative_v_y = speed1_kmh * np.cos(bearing1_rad) - speed2_kmh * np.cos(bearing2_rad)
+    return np.hypot(relative_v_x, relative_v_y) / KNOTS_TO_KMH
+
+
+def simple_haversine_batch(lat1, lon1, lat2, lon2):
+    """Great circle distance in kilometers between two sets of points (decimal degrees)."""
+    lat1, lon1, lat2, lon2 = (np.radians(v) for v in (lat1, lon1, lat2, lon2))
+    dlat = lat2 - lat1
+    dlon = lon2 - lon1
+    a = np.sin(dlat / 2)**2 + np.cos(lat1) * np.cos(lat2) * np.sin(dlon / 2)**2
+    #clip protects the sqrt from values a hair above 1 caused by rounding
+    c = 2 * np.arcsin(np.sqrt(np.clip(a, 0.0, 1.0)))
+    return c * EARTH_RADIUS_KM
+
+
+def haversine_batch(lat1, lon1, lat2, lon2, elev1, elev2):
+    """Slant range in meters between two sets of points given in decimal degrees and meters of elevation."""
+    lat1, lon1, lat2, lon2 = (np.radians(v) for v in (lat1, lon1, lat2, lon2))
+    dlat = lat2 - lat1
+    dlon = lon2 - lon1
+    a = np.clip(np.sin(dlat / 2)**2 + np.cos(lat1) * np.cos(lat2) * np.sin(dlon / 2)**2, 0.0, 1.0)
+    c = 2 * np.arctan2(np.sqrt(a), np.sqrt(1 - a))
+    horizontal_distance = c * EARTH_RADIUS_KM * 1000
+    elevation_difference = np.asarray(elev2, dtype=float) - np.asarray(elev1, dtype=float)
+    return np.hypot(horizontal_distance, elevation_difference)
+
+
+def calculate_time_to_cover_distance_batch(distance, speed):
+    """Time needed to cover each distance at the matching speed (km and km/h)."""
+    return np.asarray(distance, dtype=float) / np.asarray(speed, dtype=float)
+
+
+def _destination(lat_rad, lon_rad, angular_distance, bearing_rad):
+    """Destination point on the sphere, shared by the two position functions. Returns degrees."""
+    sin_lat = np.sin(lat_rad)
+    cos_lat = np.cos(lat_rad)
+    sin_d = np.sin(angular_distance)
+    cos_d = np.cos(angular_distance)
+    new_lat = np.arcsin(np.clip(sin_lat * cos_d + cos_lat * sin_d * np.cos(bearing_rad), -1.0, 1.0))
+    new_lon = lon_rad + np.arctan2(np.sin(bearing_rad) * sin_d * cos_lat,
+                                   cos_d - sin_lat * np.sin(new_lat))
+    return np.degrees(new_lat), np.degrees(new_lon)
+
+
+def calculate_future_position_batch(lat, lon, speed, heading, t):
+    """Future positions given speed (knots), heading (degrees) and time (hours). Returns (lat, lon) arrays."""
+    distance = np.asarray(speed, dtype=float) * KNOTS_TO_KMH * np.asarray(t, dtype=float)
+    return _destination(np.radians(lat), np.radians(lon), distance / EARTH_RADIUS_KM, np.radians(heading))
+
+
+def calculate_initial_ghost_position_batch(lat, lon, distance, bearing):
+    """Positions at the given distance (km) and bearing (degrees) from each start point. Returns (lat, lon) arrays."""
+    distance = np.asarray(distance, dtype=float)
+    return _destination(np.radians(lat), np.radians(lon), distance / EARTH_RADIUS_KM, np.radians(bearing))
+
+
+def calculate_required_heading_batch(lat1, lon1, lat2, lon2):
+    """Initial heading in degrees [0, 360) from each point 1 to the matching point 2."""
+    lat1, lon1, lat2, lon2 = (np.radians(v) for v in (lat1, lon1, lat2, lon2))
+    dlon = lon2 - lon1
+    cos_lat2 = np.cos(lat2)
+    x = np.sin(dlon) * cos_lat2
+    y = np.cos(lat1) * np.sin(lat2) - np.sin(lat1) * cos_lat2 * np.cos(dlon)
+    return (np.degrees(np.arctan2(x, y)) + 360) % 360
+
+
+def calculate_elevation_angle_batch(lat1, lon1, alt1, lat2, lon2, alt2):
+    """Elevation angle in degrees from each object 1 to the matching object 2 (flat earth, as in utilities.py)."""
+    lat_distance_m = (np.asarray(lat2, dtype=float) - lat1) * 110574
+    lon_distance_m = (np.asarray(lon2, dtype=float) - lon1) * (111320 * np.cos(np.radians(lat1)))
+    horizontal_distance_m = np.hypot(lat_distance_m, lon_distance_m)
+    altitude_difference_m = np.asarray(alt2, dtype=float) - alt1
+    return np.degrees(np.arctan2(altitude_difference_m, horizontal_distance_m))
@@ -0,0 +1,183 @@
+#Accuracy of the spherical geometry kernels against the WGS84 geodesic reference, per latitude band
+#The bands include the poles and a set of points either side of the antimeridian. Errors are reported as the
+#largest and median absolute error in each band, and the batch versions are checked against the scalar ones.
+#The local frame geometry the flight loop runs (local_frame.py: east/north/up from the attacker, the incremental
+#trig of the target and the fitted transform to the X-Plane local frame) is checked the same way.
+import math
+import os
+import sys
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import utilities  # noqa: E402
+import batch_utilities  # noqa: E402
+import local_frame  # noqa: E402
+import geodesic_reference as reference  # noqa: E402
+
+LATITUDE_BANDS = {
+    'south_pole': (-89.99, -85.0),
+    'south_high': (-85.0, -60.0),
+    'south_mid': (-60.0, -20.0),
+    'equator': (-20.0, 20.0),
+    'north_mid': (20.0, 60.0),
+    'north_high': (60.0, 85.0),
+    'north_pole': (85.0, 89.99),
+}
+
+
+def _samples(low, high, count, antimeridian, rng):
+    lat = rng.uniform(low, high, count)
+    lon = rng.uniform(179.5, 180.0, count) if antimeridian else rng.uniform(-179.0, 179.0, count)
+    bearing = rng.uniform(0, 360, count)
+    distance_m = rng.uniform(1000, 100000, count)  # attack geometries are within 100 km
+    elev1 = rng.uniform(0, 3000, count)
+    elev2 = rng.uniform(0, 12000, count)
+    return lat, lon, bearing, distance_m, elev1, elev2
+
+
+def _angle_error(a, b):
+    return abs((a - b + 180) % 360 - 180)
+
+
+def _stats(errors):
+    return {'max': float(np.max(errors)), 'median': float(np.median(errors))}
+
+
+def evaluate_band(low, high, count=200, antimeridian=False, seed=7):
+    rng = np.random.default_rng(seed)
+    lat, lon, bearing, distance_m, elev1, elev2 = _samples(low, high, count, antimeridian, rng)
+    errors = {name: [] for name in ('haversine_m', 'simple_haversine_m', 'required_heading_deg',
+                                    'initial_ghost_position_m', 'future_position_m', 'elevation_angle_deg')}
+    for i in range(count):
+        lat2, lon2 = reference.direct(lat[i], lon[i], bearing[i], distance_m[i])
+        true_distance, true_azimuth = reference.inverse(lat[i], lon[i], lat2, lon2)
+        true_slant = math.hypot(true_distance, elev2[i] - elev1[i])
+        errors['haversine_m'].append(abs(utilities.haversine(lat[i], lon[i], lat2, lon2, elev1[i], elev2[i]) - true_slant))
+        errors['simple_haversine_m'].append(abs(utilities.simple_haversine(lat[i], lon[i], lat2, lon2) * 1000 - true_distance))
+        errors['required_heading_deg'].append(_angle_error(utilities.calculate_required_heading(lat[i], lon[i], lat2, lon2), true_azimuth))
+        ghost = utilities.calculate_initial_ghost_position(lat[i], lon[i], distance_m[i] / 1000, bearing[i])
+        errors['initial_ghost_position_m'].append(reference.inverse(lat2, lon2, ghost[0], ghost[1])[0])
+        #fly the same distance at 250 kt
+        hours = distance_m[i] / 1852 / 250
+        future = utilities.calculate_future_position(lat[i], lon[i], 250, bearing[i], hours)
+        errors['future_position_m'].append(reference.inverse(lat2, lon2, future[0], future[1])[0])
+        errors['elevation_angle_deg'].append(abs(
+            utilities.calculate_elevation_angle(lat[i], lon[i], elev1[i], lat2, lon2, elev2[i])
+            - reference.elevation_angle(lat[i], lon[i], elev1[i], lat2, lon2, elev2[i])))
+    return {name: _stats(np.array(values)) for name, values in errors.items()}
+
+
+def evaluate_local_frame_band(low, high, count=200, antimeridian=False, seed=7):
+    rng = np.random.default_rng(seed)
+    lat, lon, bearing, distance_m, elev1, elev2 = _samples(low, high, count, antimeridian, rng)
+    errors = {name: [] for name in ('enu_slant_m', 'enu_elevation_angle_deg', 'enu_azimuth_deg', 'geodetic_roundtrip_m',
+                                    'up_at_m', 'tracked_point_m', 'local_transform_m')}
+    for i in range(count):
+        frame = local_frame.LocalFrame(lat[i], lon[i], elev1[i])
+        lat2, lon2 = reference.direct(lat[i], lon[i], bearing[i], distance_m[i])
+        east, north, up = frame.to_enu(lat2, lon2, elev2[i])
+        x1, y1, z1 = reference.geodetic_to_ecef(lat[i], lon[i], elev1[i])
+        x2, y2, z2 = reference.geodetic_to_ecef(lat2, lon2, elev2[i])
+        errors['enu_slant_m'].append(abs(math.sqrt(east**2 + north**2 + up**2) - math.dist((x1, y1, z1), (x2, y2, z2))))
+        errors['enu_elevation_angle_deg'].append(abs(math.degrees(math.atan2(up, math.hypot(east, north)))
+                                                     - reference.elevation_angle(lat[i], lon[i], elev1[i], lat2, lon2, elev2[i])))
+        errors['enu_azimuth_deg'].append(_angle_error(math.degrees(math.atan2(east, north)),
+                                                      reference.inverse(lat[i], lon[i], lat2, lon2)[1]))
+        back_lat, back_lon, back_elevation = frame.to_geodetic(east, north, up)
+        errors['geodetic_roundtrip_m'].append(math.hypot(reference.inverse(lat2, lon2, back_lat, back_lon)[0],
+                                                         back_elevation - elev2[i]))
+        errors['up_at_m'].append(abs(frame.up_at(east, north, elev2[i]) - up))
+        #the target flown at 250 kt for 3 s at 60 frames per second (past two resyncs), converted with incremental trig
+        point = local_frame.TrackedPoint(frame)
+        worst = 0.0
+        for step in range(180):
+            step_lat, step_lon = reference.direct(lat2, lon2, bearing[i], 250 * 0.514444 * step / 60)
+            tracked = point.to_enu(step_lat, step_lon, elev2[i])
+            worst = max(worst, math.dist(tracked, frame.to_enu(step_lat, step_lon, elev2[i])))
+        errors['tracked_point_m'].append(worst)
+        #X-Plane's local frame is Cartesian too, here the east/up/south axes of a frame 30 km away
+        reference_frame = local_frame.LocalFrame(*reference.direct(lat[i], lon[i], bearing[i] + 90, 30000), 0.0)
+
+        def world_to_local(point_lat, point_lon, point_elevation):
+            local_east, local_north, local_up = reference_frame.to_enu(point_lat, point_lon, point_elevation)
+            return local_east, local_up, -local_north
+
+        frame.fit_local(world_to_local)
+        x, y, z = frame.to_local_batch(np.array([east]), np.array([north]), np.array([up]))
+        errors['local_transform_m'].append(math.dist((x[0], y[0], z[0]), world_to_local(lat2, lon2, elev2[i])))
+    return {name: _stats(np.array(values)) for name, values in errors.items()}
+
+
+def local_frame_agreement(count=5000, seed=13):
+    """Largest difference in meters between the batch conversions of LocalFrame and the scalar ones."""
+    rng = np.random.default_rng(seed)
+    frame = local_frame.LocalFrame(50.1, 8.0, 100.0)
+    lat, lon = rng.uniform(49.2, 51.0, count), rng.uniform(6.6, 9.4, count)
+    elevation = rng.uniform(0, 1e4, count)
+    east, north, up = frame.to_enu_batch(lat, lon, elevation)
+    expected = np.array([frame.to_enu(float(lat[i]), float(lon[i]), float(elevation[i])) for i in range(count)])
+    enu = float(np.max(np.abs(np.array([east, north, up]).T - expected)))
+    back_lat, back_lon, back_elevation = frame.to_geodetic_batch(east, north, up)
+    expected = np.array([frame.to_geodetic(float(east[i]), float(north[i]), float(up[i])) for i in range(count)])
+    geodetic = float(np.max(np.hypot(np.hypot((back_lat - expected[:, 0]) * 111320,
+                                              (back_lon - expected[:, 1]) * 111320 * np.cos(np.radians(lat))),
+                                     back_elevation - expected[:, 2])))
+    return {'to_enu_batch_m': enu, 'to_geodetic_batch_m': geodetic}
+
+
+def batch_agreement(count=5000, seed=11):
+    """Largest difference between each batch function and its scalar version."""
+    rng = np.random.default_rng(seed)
+    lat1, lat2 = rng.uniform(-89, 89, count), rng.uniform(-89, 89, count)
+    lon1, lon2 = rng.uniform(-180, 180, count), rng.uniform(-180, 180, count)
+    elev1, elev2 = rng.uniform(0, 1e4, count), rng.uniform(0, 1e4, count)
+    speed, angle = rng.uniform(80, 500, count), rng.uniform(0, 360, count)
+    distance = rng.uniform(1, 100, count)
+    cases = {
+        'haversine': (lat1, lon1, lat2, lon2, elev1, elev2),
+        'simple_haversine': (lat1, lon1, lat2, lon2),
+        'calculate_required_heading': (lat1, lon1, lat2, lon2),
+        'calculate_future_position': (lat1, lon1, speed, angle, distance / 500),
+        'calculate_initial_ghost_position': (lat1, lon1, distance, angle),
+        'calculate_relative_speed_in_knots': (speed, angle, speed[::-1], angle[::-1]),
+        'calculate_elevation_angle': (lat1, lon1, elev1, lat2, lon2, elev2),
+    }
+    agreement = {}
+    for name, arrays in cases.items():
+        scalar = getattr(utilities, name)
+        batch = np.array(getattr(batch_utilities, name + '_batch')(*arrays))
+        expected = np.array([scalar(*(float(a[i]) for a in arrays)) for i in range(count)])
+        if batch.ndim == 2:
+            batch = batch.T
+        difference = np.abs(batch - expected)
+        if name == 'calculate_required_heading':
+            difference = np.minimum(difference, 360 - difference)
+        agreement[name] = float(np.max(difference / np.maximum(1.0, np.abs(expected))))
+    return agreement
+
+
+def run(count=200):
+    results = {'bands': {}}
+    for band, (low, high) in LATITUDE_BANDS.items():
+        results['bands'][band] = evaluate_band(low, high, count)
+        results['bands'][band + '_antimeridian'] = evaluate_band(low, high, count, antimeridian=True)
+        results['bands'][band].update(evaluate_local_frame_band(low, high, count))
+        results['bands'][band + '_antimeridian'].update(evaluate_local_frame_band(low, high, count, antimeridian=True))
+    results['batch_vs_scalar_max_relative_difference'] = batch_agreement()
+    results['local_frame_batch_vs_scalar_m'] = local_frame_agreement()
+    return results
+
+
+if __name__ == '__main__':
+    results = run()
+    for band, errors in results['bands'].items():
+        print(band)
+        for name, stats in errors.items():
+            print(f"    {name:<28} max {stats['max']:>14.6g}  median {stats['median']:>14.6g}")
+    print("batch vs scalar")
+    for name, difference in results['batch_vs_scalar_max_relative_difference'].items():
+        print(f"    {name:<36} {difference:.3g}")
+    print("local frame batch vs scalar")
+    for name, difference in results['local_frame_batch_vs_scalar_m'].items():
+        print(f"    {name:<36} {difference:.3g}")
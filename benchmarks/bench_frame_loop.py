@@ -0,0 +1,64 @@
+#End to end benchmark of the plugin frame loop, driven headless by headless_sim.py with a stand-in xp module
+#Times every frame of an attack run against a constant track target, for a single ghost and for a swarm.
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import headless_sim  # noqa: E402
+
+CONFIG = """[Settings]
+attacker_lat = 50.1
+attacker_lon = 8.0
+attacker_elevation = 100
+start_distance = 10
+ghost_speed = 250
+"""
+
+
+def _config(ghosts):
+    text = CONFIG
+    if ghosts > 1:
+        for i in range(ghosts):
+            text += f"\n[Ghost {i + 1}]\nicao = {0xA41B14 + i:06X}\ntailnum = G{i:05d}\nbearing_offset = {(i % 7) - 3}\n"
+    return text
+
+
+def time_frames(ghosts=1, frames=3000, frame_time=1 / 60):
+    """Per frame wall time in microseconds (p50, p99, max) and frames per second of the whole loop."""
+    with tempfile.TemporaryDirectory() as workdir:
+        config_path = os.path.join(workdir, 'config.ini')
+        with open(config_path, 'w') as config_file:
+            config_file.write(_config(ghosts))
+        target = headless_sim.constant_track(50.0, 8.2, 3000, 120, 90)
+        sim = headless_sim.HeadlessSimulation(target, config_path=config_path, frame_time=frame_time, workdir=workdir)
+        sim.launch()
+        timings = np.empty(frames)
+        clock = time.perf_counter
+        for frame in range(frames):
+            start = clock()
+            sim.step()
+            timings[frame] = clock() - start
+        sim.disable()
+    timings *= 1e6
+    return {
+        'ghosts': ghosts,
+        'frames': frames,
+        'p50_us': float(np.percentile(timings, 50)),
+        'p99_us': float(np.percentile(timings, 99)),
+        'max_us': float(timings.max()),
+        'frames_per_second': float(frames / (timings.sum() / 1e6)),
+    }
+
+
+def run(frames=3000):
+    return {f"ghosts_{ghosts}": time_frames(ghosts, frames) for ghosts in (1, 10, 30)}
+
+
+if __name__ == '__main__':
+    for name, result in run().items():
+        print(f"{name:<10} p50 {result['p50_us']:8.1f} us  p99 {result['p99_us']:8.1f} us  "
+              f"max {result['max_us']:8.1f} us  {result['frames_per_second']:10.0f} frames/s")
@@ -0,0 +1,55 @@
+#Microbenchmarks of the geometry kernels: every function of utilities.py per call and of batch_utilities.py per element
+import os
+import sys
+import timeit
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import utilities  # noqa: E402
+import batch_utilities  # noqa: E402
+
+
+def _cases(size, seed=1):
+    """Arguments for each function: one scalar set and one array set of the given size."""
+    rng = np.random.default_rng(seed)
+    lat1, lat2 = rng.uniform(-80, 80, size), rng.uniform(-80, 80, size)
+    lon1, lon2 = rng.uniform(-180, 180, size), rng.uniform(-180, 180, size)
+    elev1, elev2 = rng.uniform(0, 10000, size), rng.uniform(0, 10000, size)
+    speed1, speed2 = rng.uniform(80, 500, size), rng.uniform(80, 500, size)
+    angle1, angle2 = rng.uniform(0, 360, size), rng.uniform(0, 360, size)
+    distance = rng.uniform(1, 50, size)
+    hours = distance / 500
+    return {
+        'haversine': (lat1, lon1, lat2, lon2, elev1, elev2),
+        'simple_haversine': (lat1, lon1, lat2, lon2),
+        'calculate_required_heading': (lat1, lon1, lat2, lon2),
+        'calculate_future_position': (lat1, lon1, speed1, angle1, hours),
+        'calculate_initial_ghost_position': (lat1, lon1, distance, angle1),
+        'calculate_relative_speed_in_knots': (speed1, angle1, speed2, angle2),
+        'calculate_elevation_angle': (lat1, lon1, elev1, lat2, lon2, elev2),
+        'calculate_time_to_cover_distance': (distance, speed1),
+    }
+
+
+def _best_ns(statement, number, repeat):
+    return min(timeit.repeat(statement, number=number, repeat=repeat)) / number * 1e9
+
+
+def run(batch_size=10000, scalar_calls=20000, repeat=5):
+    """Nanoseconds per scalar call and per batch element for every geometry function."""
+    results = {'scalar_ns_per_call': {}, 'batch_ns_per_element': {}, 'batch_size': batch_size}
+    for name, arrays in _cases(batch_size).items():
+        scalar = getattr(utilities, name)
+        batch = getattr(batch_utilities, name + '_batch')
+        values = tuple(float(a[0]) for a in arrays)
+        results['scalar_ns_per_call'][name] = _best_ns(lambda: scalar(*values), scalar_calls, repeat)
+        results['batch_ns_per_element'][name] = _best_ns(lambda: batch(*arrays), 10, repeat) / batch_size
+    return results
+
+
+if __name__ == '__main__':
+    results = run()
+    print(f"{'function':<36}{'scalar ns/call':>16}{'batch ns/elem':>16}")
+    for name, scalar_ns in results['scalar_ns_per_call'].items():
+        print(f"{name:<36}{scalar_ns:>16.1f}{results['batch_ns_per_element'][name]:>16.2f}")
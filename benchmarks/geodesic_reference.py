@@ -0,0 +1,108 @@
+#High precision reference geometry on the WGS84 ellipsoid for the accuracy benchmark
+#Uses geographiclib when it is installed, otherwise Vincenty's formulae iterated to 1e-13 rad, which are
+#accurate to well below a millimetre for the distances the attack uses.
+import math
+
+WGS84_A = 6378137.0
+WGS84_F = 1 / 298.257223563
+WGS84_B = WGS84_A * (1 - WGS84_F)
+
+try:
+    from geographiclib.geodesic import Geodesic
+    _GEODESIC = Geodesic.WGS84
+except ImportError:
+    _GEODESIC = None
+
+
+def inverse(lat1, lon1, lat2, lon2):
+    """Distance in meters and initial azimuth in degrees [0, 360) from point 1 to point 2."""
+    if _GEODESIC is not None:
+        result = _GEODESIC.Inverse(lat1, lon1, lat2, lon2)
+        return result['s12'], result['azi1'] % 360
+    a, b, f = WGS84_A, WGS84_B, WGS84_F
+    L = math.radians(lon2 - lon1)
+    U1 = math.atan((1 - f) * math.tan(math.radians(lat1)))
+    U2 = math.atan((1 - f) * math.tan(math.radians(lat2)))
+    sinU1, cosU1 = math.sin(U1), math.cos(U1)
+    sinU2, cosU2 = math.sin(U2), math.cos(U2)
+    lam = L
+    for _ in range(200):
+        sin_lam, cos_lam = math.sin(lam), math.cos(lam)
+        sin_sigma = math.hypot(cosU2 * sin_lam, cosU1 * sinU2 - sinU1 * cosU2 * cos_lam)
+        if sin_sigma == 0:
+            return 0.0, 0.0
+        cos_sigma = sinU1 * sinU2 + cosU1 * cosU2 * cos_lam
+        sigma = math.atan2(sin_sigma, cos_sigma)
+        sin_alpha = cosU1 * cosU2 * sin_lam / sin_sigma
+        cos2_alpha = 1 - sin_alpha**2
+        cos_2sigma_m = cos_sigma - 2 * sinU1 * sinU2 / cos2_alpha if cos2_alpha else 0.0
+        C = f / 16 * cos2_alpha * (4 + f * (4 - 3 * cos2_alpha))
+        lam_previous = lam
+        lam = L + (1 - C) * f * sin_alpha * (sigma + C * sin_sigma * (cos_2sigma_m + C * cos_sigma * (-1 + 2 * cos_2sigma_m**2)))
+        if abs(lam - lam_previous) < 1e-13:
+            break
+    u2 = cos2_alpha * (a**2 - b**2) / b**2
+    A = 1 + u2 / 16384 * (4096 + u2 * (-768 + u2 * (320 - 175 * u2)))
+    B = u2 / 1024 * (256 + u2 * (-128 + u2 * (74 - 47 * u2)))
+    delta_sigma = B * sin_sigma * (cos_2sigma_m + B / 4 * (cos_sigma * (-1 + 2 * cos_2sigma_m**2)
+                  - B / 6 * cos_2sigma_m * (-3 + 4 * sin_sigma**2) * (-3 + 4 * cos_2sigma_m**2)))
+    distance = b * A * (sigma - delta_sigma)
+    azimuth = math.degrees(math.atan2(cosU2 * sin_lam, cosU1 * sinU2 - sinU1 * cosU2 * cos_lam))
+    return distance, azimuth % 360
+
+
+def direct(lat1, lon1, azimuth, distance):
+    """Point reached from point 1 after distance meters along the geodesic with the given initial azimuth."""
+    if _GEODESIC is not None:
+        result = _GEODESIC.Direct(lat1, lon1, azimuth, distance)
+        return result['lat2'], result['lon2']
+    a, b, f = WGS84_A, WGS84_B, WGS84_F
+    alpha1 = math.radians(azimuth)
+    sin_alpha1, cos_alpha1 = math.sin(alpha1), math.cos(alpha1)
+    tanU1 = (1 - f) * math.tan(math.radians(lat1))
+    cosU1 = 1 / math.sqrt(1 + tanU1**2)
+    sinU1 = tanU1 * cosU1
+    sigma1 = math.atan2(tanU1, cos_alpha1)
+    sin_alpha = cosU1 * sin_alpha1
+    cos2_alpha = 1 - sin_alpha**2
+    u2 = cos2_alpha * (a**2 - b**2) / b**2
+    A = 1 + u2 / 16384 * (4096 + u2 * (-768 + u2 * (320 - 175 * u2)))
+    B = u2 / 1024 * (256 + u2 * (-128 + u2 * (74 - 47 * u2)))
+    sigma = distance / (b * A)
+    for _ in range(200):
+        cos_2sigma_m = math.cos(2 * sigma1 + sigma)
+        sin_sigma, cos_sigma = math.sin(sigma), math.cos(sigma)
+        delta_sigma = B * sin_sigma * (cos_2sigma_m + B / 4 * (cos_sigma * (-1 + 2 * cos_2sigma_m**2)
+                      - B / 6 * cos_2sigma_m * (-3 + 4 * sin_sigma**2) * (-3 + 4 * cos_2sigma_m**2)))
+        sigma_previous = sigma
+        sigma = distance / (b * A) + delta_sigma
+        if abs(sigma - sigma_previous) < 1e-13:
+            break
+    sin_sigma, cos_sigma = math.sin(sigma), math.cos(sigma)
+    cos_2sigma_m = math.cos(2 * sigma1 + sigma)
+    x = sinU1 * sin_sigma - cosU1 * cos_sigma * cos_alpha1
+    lat2 = math.atan2(sinU1 * cos_sigma + cosU1 * sin_sigma * cos_alpha1, (1 - f) * math.hypot(sin_alpha, x))
+    lam = math.atan2(sin_sigma * sin_alpha1, cosU1 * cos_sigma - sinU1 * sin_sigma * cos_alpha1)
+    C = f / 16 * cos2_alpha * (4 + f * (4 - 3 * cos2_alpha))
+    L = lam - (1 - C) * f * sin_alpha * (sigma + C * sin_sigma * (cos_2sigma_m + C * cos_sigma * (-1 + 2 * cos_2sigma_m**2)))
+    lon2 = (lon1 + math.degrees(L) + 540) % 360 - 180
+    return math.degrees(lat2), lon2
+
+
+def geodetic_to_ecef(lat, lon, alt):
+    lat, lon = math.radians(lat), math.radians(lon)
+    e2 = WGS84_F * (2 - WGS84_F)
+    n = WGS84_A / math.sqrt(1 - e2 * math.sin(lat)**2)
+    return ((n + alt) * math.cos(lat) * math.cos(lon),
+            (n + alt) * math.cos(lat) * math.sin(lon),
+            (n * (1 - e2) + alt) * math.sin(lat))
+
+
+def elevation_angle(lat1, lon1, alt1, lat2, lon2, alt2):
+    """Elevation angle in degrees of point 2 above the local horizon of point 1."""
+    x1, y1, z1 = geodetic_to_ecef(lat1, lon1, alt1)
+    x2, y2, z2 = geodetic_to_ecef(lat2, lon2, alt2)
+    dx, dy, dz = x2 - x1, y2 - y1, z2 - z1
+    lat, lon = math.radians(lat1), math.radians(lon1)
+    up = math.cos(lat) * math.cos(lon) * dx + math.cos(lat) * math.sin(lon) * dy + math.sin(lat) * dz
+    return math.degrees(math.asin(up / math.sqrt(dx * dx + dy * dy + dz * dz)))
@@ -0,0 +1,88 @@
+#Runs the geometry microbenchmarks, the accuracy harness and the frame loop benchmark, and saves or checks baselines
+#
+#    python benchmarks/run_benchmarks.py --save      write benchmarks/baselines/*.json
+#    python benchmarks/run_benchmarks.py             compare against the saved baselines, exit 1 on a regression
+#
+#Timings are flagged when they are slower than the baseline by more than --time-tolerance (a ratio, timings
+#depend on the machine the baseline was saved on) and by more than --time-floor nanoseconds, so the jitter of
+#calls that take about 100 ns is not taken for a regression. Accuracy errors are flagged when they grow by more than
+#--accuracy-tolerance (relative) plus a tiny absolute slack, so any drift in the kernels shows up.
+import argparse
+import json
+import os
+import platform
+import sys
+
+import accuracy
+import bench_frame_loop
+import bench_geometry
+
+BASELINE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'baselines')
+SUITES = {'geometry': bench_geometry.run, 'accuracy': accuracy.run, 'frame_loop': bench_frame_loop.run}
+#timings that are checked (lower is better, compared as a ratio), the p99 and max are reported but too noisy to check
+TIMING_KEYS = ('scalar_ns_per_call', 'batch_ns_per_element', 'p50_us')
+#nanoseconds in one unit of each timing
+TIMING_UNITS = {'scalar_ns_per_call': 1, 'batch_ns_per_element': 1, 'p50_us': 1000}
+
+
+def _flatten(results, prefix=''):
+    for key, value in results.items():
+        name = f"{prefix}{key}"
+        if isinstance(value, dict):
+            yield from _flatten(value, name + '.')
+        elif isinstance(value, (int, float)) and not isinstance(value, bool):
+            yield name, float(value)
+
+
+def compare(suite, results, baseline, time_tolerance, accuracy_tolerance, time_floor=100.0):
+    """Lines describing every value that got worse than the baseline allows."""
+    problems = []
+    current = dict(_flatten(results))
+    for name, old in _flatten(baseline):
+        new = current.get(name)
+        if new is None:
+            problems.append(f"{suite}: {name} is missing")
+        elif suite == 'accuracy':
+            if new > old * (1 + accuracy_tolerance) + 1e-12:
+                problems.append(f"{suite}: {name} error grew from {old:.6g} to {new:.6g}")
+        elif any(marker in name for marker in TIMING_KEYS):
+            unit = next(TIMING_UNITS[marker] for marker in TIMING_KEYS if marker in name)
+            if new > old * time_tolerance and (new - old) * unit > time_floor:
+                problems.append(f"{suite}: {name} slowed from {old:.4g} to {new:.4g}")
+    return problems
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark and accuracy suite for the geometry kernels and frame loop")
+    parser.add_argument('--save', action='store_true', help="save the results as the new baselines")
+    parser.add_argument('--suite', choices=sorted(SUITES), action='append', help="run only these suites")
+    parser.add_argument('--time-tolerance', type=float, default=1.5, help="allowed slowdown ratio")
+    parser.add_argument('--time-floor', type=float, default=100.0, help="slowdowns below this many ns are ignored")
+    parser.add_argument('--accuracy-tolerance', type=float, default=1e-6, help="allowed relative error growth")
+    args = parser.parse_args(argv)
+
+    problems = []
+    for suite in args.suite or sorted(SUITES):
+        results = SUITES[suite]()
+        results_path = os.path.join(BASELINE_DIR, f"{suite}.json")
+        if args.save:
+            os.makedirs(BASELINE_DIR, exist_ok=True)
+            with open(results_path, 'w') as baseline_file:
+                json.dump({'machine': platform.platform(), 'python': platform.python_version(), 'results': results},
+                          baseline_file, indent=2, sort_keys=True)
+            print(f"{suite}: baseline saved to {results_path}")
+        elif os.path.exists(results_path):
+            with open(results_path) as baseline_file:
+                baseline = json.load(baseline_file)['results']
+            suite_problems = compare(suite, results, baseline, args.time_tolerance, args.accuracy_tolerance, args.time_floor)
+            problems.extend(suite_problems)
+            print(f"{suite}: {'OK' if not suite_problems else f'{len(suite_problems)} regressions'}")
+        else:
+            print(f"{suite}: no baseline at {results_path}, run with --save first")
+    for problem in problems:
+        print(problem)
+    return 1 if problems else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,101 @@
+#Binary version of TCAS_Data_Log.csv: the same 23 columns as fixed size little endian records appended to a file
+#The reader memory-maps the file as a NumPy record array, so columns can be sliced without parsing or copying.
+#
+#Layout: a 16 byte header (b'ACASLOG1', record size and column count as uint32) followed by the records,
+#21 float64 values and the two flags Attack Valid and RA Triggered as one byte booleans.
+#
+#Convert between the two forms with:
+#    python binary_log.py to-bin TCAS_Data_Log.csv TCAS_Data_Log.bin
+#    python binary_log.py to-csv TCAS_Data_Log.bin TCAS_Data_Log.csv
+import argparse
+import csv
+import struct
+
+import numpy as np
+
+LOG_COLUMNS = ["Time", "Attacker Latitude", "Attacker Longitude", "Attacker Elevation", "Attacker Slant",
+               "Ghost Latitude", "Ghost Longitude", "Ghost Elevation", "Ghost Speed", "Ghost Heading", "Ghost Slant",
+               "Ghost Bearing", "Ghost Alt", "Ghost Dist", "Target Lat", "Target Lon", "Target Elevation", "Target Speed",
+               "Target Heading", "Effective Angle", "Closing Speed", "Attack Valid", "RA Triggered"]
+FLAG_COLUMNS = ("Attack Valid", "RA Triggered")
+
+RECORD_STRUCT = struct.Struct('<' + 'd' * (len(LOG_COLUMNS) - len(FLAG_COLUMNS)) + '?' * len(FLAG_COLUMNS))
+RECORD_DTYPE = np.dtype([(name, '?' if name in FLAG_COLUMNS else '<f8') for name in LOG_COLUMNS])
+MAGIC = b'ACASLOG1'
+HEADER_STRUCT = struct.Struct('<8sII')
+
+
+def write_header(binary_file):
+    binary_file.write(HEADER_STRUCT.pack(MAGIC, RECORD_STRUCT.size, len(LOG_COLUMNS)))
+
+
+def pack_rows(rows):
+    """Pack log rows (tuples in LOG_COLUMNS order) into one block of bytes ready to append."""
+    pack = RECORD_STRUCT.pack
+    return b''.join([pack(*row) for row in rows])
+
+
+def read_binary_log(path):
+    """Memory-map a binary log as a read only record array, one field per log column."""
+    with open(path, 'rb') as binary_file:
+        magic, record_size, columns = HEADER_STRUCT.unpack(binary_file.read(HEADER_STRUCT.size))
+        binary_file.seek(0, 2)
+        size = binary_file.tell()
+    if magic != MAGIC or record_size != RECORD_DTYPE.itemsize or columns != len(LOG_COLUMNS):
+        raise ValueError(f"{path} is not a binary TCAS data log with the current layout")
+    #a record cut short by a crash while writing is ignored
+    count = (size - HEADER_STRUCT.size) // record_size
+    if count == 0:
+        return np.empty(0, dtype=RECORD_DTYPE)
+    return np.memmap(path, dtype=RECORD_DTYPE, mode='r', offset=HEADER_STRUCT.size, shape=(count,))
+
+
+def csv_to_binary(csv_path, binary_path, chunk_rows=65536):
+    """Convert a CSV log to the binary form, chunk by chunk. Returns the number of records."""
+    flags = [LOG_COLUMNS.index(name) for name in FLAG_COLUMNS]
+    count = 0
+    with open(csv_path, newline='', encoding='utf-8') as csv_file, open(binary_path, 'wb') as binary_file:
+        reader = csv.reader(csv_file)
+        if next(reader) != LOG_COLUMNS:
+            raise ValueError(f"{csv_path} does not have the TCAS data log columns")
+        write_header(binary_file)
+        rows = []
+        for row in reader:
+            values = [float(value) for value in row[:flags[0]]]
+            values.extend(row[i] == 'True' for i in flags)
+            rows.append(values)
+            if len(rows) == chunk_rows:
+                binary_file.write(pack_rows(rows))
+                count += len(rows)
+                rows = []
+        binary_file.write(pack_rows(rows))
+        count += len(rows)
+    return count
+
+
+def binary_to_csv(binary_path, csv_path, chunk_rows=65536):
+    """Convert a binary log back to CSV. Returns the number of records."""
+    records = read_binary_log(binary_path)
+    with open(csv_path, 'w', newline='', encoding='utf-8') as csv_file:
+        writer = csv.writer(csv_file)
+        writer.writerow(LOG_COLUMNS)
+        for start in range(0, len(records), chunk_rows):
+            writer.writerows(records[start:start + chunk_rows].tolist())
+    return len(records)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Convert TCAS data logs between CSV and binary form")
+    parser.add_argument('direction', choices=['to-bin', 'to-csv'])
+    parser.add_argument('source')
+    parser.add_argument('destination')
+    args = parser.parse_args(argv)
+    if args.direction == 'to-bin':
+        count = csv_to_binary(args.source, args.destination)
+    else:
+        count = binary_to_csv(args.source, args.destination)
+    print(f"{count} records written to {args.destination}")
+
+
+if __name__ == '__main__':
+    main()
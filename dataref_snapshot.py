@@ -0,0 +1,59 @@
+#Reads every dataref the attack needs exactly once per frame into an immutable snapshot
+#The TCAS indicator arrays are read with ranged reads (only the ghost slots) into lists that are allocated
+#once, so a frame costs one call per dataref and no new lists. All stages of a frame then see the same instant.
+import collections
+
+KNOTS_PER_MPS = 1.94384
+
+Snapshot = collections.namedtuple('Snapshot', [
+    'time',  # sim elapsed time in seconds
+    'target_lat', 'target_lon', 'target_elevation',  # degrees, degrees, meters
+    'target_speed', 'target_trk', 'target_theta',  # knots, degrees true, degrees
+    'target_vy',  # local (OpenGL) up velocity in meters per second, the vertical speed of the attack window
+    'ghost_rbearing', 'ghost_raltitude', 'ghost_rdistance',  # TCAS indicators of the first ghost
+    'advisory',  # value of the TCAS advisory dataref, 0 when there is none (or the dataref does not exist)
+])
+
+
+class SnapshotReader:
+
+    def __init__(self, xp, ghost_count, advisory_dataref="sim/cockpit2/tcas/indicators/tcas_alert"):
+        self.xp = xp
+        self.ghost_count = ghost_count
+        self.ref_target_latitude = xp.findDataRef("sim/flightmodel/position/latitude")
+        self.ref_target_longitude = xp.findDataRef("sim/flightmodel/position/longitude")
+        self.ref_target_elevation = xp.findDataRef("sim/flightmodel/position/elevation")
+        self.ref_target_gs = xp.findDataRef("sim/flightmodel/position/groundspeed")
+        self.ref_target_trk = xp.findDataRef("sim/flightmodel/position/true_psi")
+        self.ref_target_theta = xp.findDataRef("sim/flightmodel/position/theta")
+        self.ref_vy = xp.findDataRef("sim/flightmodel/position/local_vy")
+        self.ref_ghost_rbrg = xp.findDataRef("sim/cockpit2/tcas/indicators/relative_bearing_degs")
+        self.ref_ghost_ralt = xp.findDataRef("sim/cockpit2/tcas/indicators/relative_altitude_mtrs")
+        self.ref_ghost_rdis = xp.findDataRef("sim/cockpit2/tcas/indicators/relative_distance_mtrs")
+        self.ref_advisory = xp.findDataRef(advisory_dataref) if advisory_dataref else None
+        #one slot per ghost, starting at TCAS slot 1 (slot 0 is our own aircraft)
+        self.rbearing = [0.0] * ghost_count
+        self.raltitude = [0.0] * ghost_count
+        self.rdistance = [0.0] * ghost_count
+
+    """read all datarefs for this frame"""
+    def read(self):
+        xp = self.xp
+        count = self.ghost_count
+        xp.getDatavf(self.ref_ghost_rbrg, self.rbearing, 1, count)
+        xp.getDatavf(self.ref_ghost_ralt, self.raltitude, 1, count)
+        xp.getDatavf(self.ref_ghost_rdis, self.rdistance, 1, count)
+        return Snapshot(
+            xp.getElapsedTime(),
+            xp.getDatad(self.ref_target_latitude),
+            xp.getDatad(self.ref_target_longitude),
+            xp.getDatad(self.ref_target_elevation),
+            xp.getDataf(self.ref_target_gs) * KNOTS_PER_MPS,
+            xp.getDataf(self.ref_target_trk),
+            xp.getDataf(self.ref_target_theta),
+            xp.getDataf(self.ref_vy),
+            self.rbearing[0],
+            self.raltitude[0],
+            self.rdistance[0],
+            xp.getDatai(self.ref_advisory) if self.ref_advisory else 0,
+        )
@@ -0,0 +1,75 @@
+#One flight loop callback that runs all the per frame work of the plugin as a fixed pipeline
+#Stages run in the order they were added. Each stage has a rate divisor (it runs on every n-th frame) and gets the
+#time that passed since it last ran. Stages can belong to a group that is started and stopped together.
+
+
+class Stage:
+
+    def __init__(self, name, function, divisor=1, group=None):
+        if divisor < 1:
+            raise ValueError(f"The rate divisor of stage {name} must be at least 1")
+        self.name = name
+        self.function = function  # called with the elapsed time since the stage last ran
+        self.divisor = int(divisor)
+        self.group = group
+        self.enabled = group is None  # stages in a group wait for the group to be started
+        self.elapsed = 0.0
+
+
+class FlightLoopScheduler:
+
+    def __init__(self):
+        self.stages = []
+        self.frame = 0
+        self._finishing = set()
+
+    def add_stage(self, name, function, divisor=1, group=None):
+        stage = Stage(name, function, divisor, group)
+        self.stages.append(stage)
+        return stage
+
+    def set_divisor(self, name, divisor):
+        for stage in self.stages:
+            if stage.name == name:
+                if divisor < 1:
+                    raise ValueError(f"The rate divisor of stage {name} must be at least 1")
+                stage.divisor = int(divisor)
+
+    """start every stage of the group from the next frame"""
+    def start(self, group):
+        self._finishing.discard(group)
+        for stage in self.stages:
+            if stage.group == group:
+                stage.enabled = True
+                stage.elapsed = 0.0
+
+    """stop every stage of the group straight away"""
+    def stop(self, group):
+        self._finishing.discard(group)
+        for stage in self.stages:
+            if stage.group == group:
+                stage.enabled = False
+
+    """run the remaining stages of the group once more in this frame, whatever their divisor, then stop the group"""
+    def finish(self, group):
+        self._finishing.add(group)
+
+    def is_running(self, group):
+        return any(stage.enabled for stage in self.stages if stage.group == group)
+
+    """the flight loop callback registered with X-Plane, runs every frame"""
+    def flight_loop(self, elapsed1, elapsed2, counter, refcon):
+        frame = self.frame
+        self.frame += 1
+        for stage in self.stages:
+            if not stage.enabled:
+                continue
+            stage.elapsed += elapsed1
+            if frame % stage.divisor and stage.group not in self._finishing:
+                continue
+            elapsed = stage.elapsed
+            stage.elapsed = 0.0
+            stage.function(elapsed)
+        for group in list(self._finishing):
+            self.stop(group)
+        return -1  # run again in the next frame
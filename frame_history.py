@@ -0,0 +1,128 @@
+#History of the last frames of an attack in a ring buffer that is allocated up front, and only grown when the frame
+#rate outruns the rate it was sized for
+#Every frame the history copies the values it keeps from the state records (attack_state.py) into the next row of
+#one flat array of doubles, with no new objects. Rolling statistics and the dump written when an RA occurs read
+#that array through a NumPy view.
+import array
+import csv
+import threading
+
+import numpy as np
+
+HISTORY_COLUMNS = ("Time", "Attacker Slant", "Ghost Slant", "Closing Speed", "Effective Angle", "Target East",
+                   "Target North", "Target Up", "Target Speed", "Target Heading", "Ghost East", "Ghost North", "Ghost Up",
+                   "Attack Valid", "Advisory")
+_TIME, _GHOST_SLANT, _CLOSING_SPEED = 0, 2, 3  # columns read by the rolling statistics
+
+
+class FrameHistory:
+    """The last capacity frames of an attack, oldest first when read
+
+    With seconds given the buffer doubles, up to max_capacity frames, whenever it fills before holding that many
+    seconds, so a frame rate above the one it was sized for does not shorten the history.
+    """
+
+    def __init__(self, capacity, seconds=None, max_capacity=None):
+        if capacity < 2:
+            raise ValueError(f"The history must hold at least 2 frames, not {capacity}")
+        self.seconds = seconds
+        self.max_capacity = max_capacity if max_capacity is not None else 8 * capacity
+        self.width = len(HISTORY_COLUMNS)
+        self._allocate(capacity)
+        self.count = 0  # frames recorded since the last clear, the buffer holds the last capacity of them
+
+    def _allocate(self, capacity):
+        self.capacity = capacity
+        self._buffer = array.array('d', bytes(8 * capacity * self.width))
+        self._rows = np.frombuffer(self._buffer, dtype=float).reshape(capacity, self.width)
+
+    def clear(self):
+        self.count = 0
+
+    """double the buffer, called only when it is full with the head at row 0 so its rows are already oldest first"""
+    def _grow(self):
+        rows = self._rows
+        self._allocate(min(2 * self.capacity, self.max_capacity))
+        self._rows[:len(rows)] = rows
+        self.count = len(rows)
+
+    """copy this frame into the next row, overwriting the oldest frame once the buffer is full"""
+    def record(self, time, attacker, ghost, target, swarm, advisory, attack_valid):
+        buffer = self._buffer
+        base = (self.count % self.capacity) * self.width
+        buffer[base] = time
+        buffer[base + 1] = attacker.slant
+        buffer[base + 2] = ghost.slant
+        buffer[base + 3] = ghost.closing_speed
+        buffer[base + 4] = target.effective_angle
+        buffer[base + 5] = target.east
+        buffer[base + 6] = target.north
+        buffer[base + 7] = target.up
+        buffer[base + 8] = target.speed
+        buffer[base + 9] = target.track
+        buffer[base + 10] = swarm.east[0]
+        buffer[base + 11] = swarm.north[0]
+        buffer[base + 12] = swarm.up[0]
+        buffer[base + 13] = attack_valid
+        buffer[base + 14] = advisory
+        self.count += 1
+        if (self.seconds is not None and self.count % self.capacity == 0 and self.capacity < self.max_capacity
+                and time - self._rows[0, _TIME] < self.seconds):
+            self._grow()
+
+    def rows(self):
+        """All frames held, oldest first (a view while the buffer has not wrapped, a copy after)."""
+        if self.count <= self.capacity:
+            return self._rows[:self.count]
+        start = self.count % self.capacity
+        return np.concatenate((self._rows[start:], self._rows[:start]))
+
+    def last(self, seconds):
+        """The frames of the last seconds, oldest first.
+
+        Only those frames are copied, and only when they span the wrap of the buffer, otherwise this is a view.
+        """
+        head = self.count % self.capacity  # row the next frame goes to
+        if self.count <= self.capacity or head == 0:
+            rows = self._rows[:min(self.count, self.capacity)]
+            if len(rows) == 0:
+                return rows
+            return rows[np.searchsorted(rows[:, _TIME], rows[-1, _TIME] - seconds):]
+        #after the wrap the newest frames are the rows before the head and the older ones the rows from the head on
+        newer = self._rows[:head]
+        cutoff = newer[-1, _TIME] - seconds
+        if newer[0, _TIME] < cutoff:
+            return newer[np.searchsorted(newer[:, _TIME], cutoff):]
+        older = self._rows[head:]
+        return np.concatenate((older[np.searchsorted(older[:, _TIME], cutoff):], newer))
+
+    """mean closing speed of the first ghost over the last seconds, in knots"""
+    def smoothed_closing_speed(self, seconds=1.0):
+        rows = self.last(seconds)
+        return float(rows[:, _CLOSING_SPEED].mean()) if len(rows) else None
+
+    """rate of change of the ghost slant range over the last seconds (least squares slope), in meters per second"""
+    def slant_rate(self, seconds=1.0):
+        rows = self.last(seconds)
+        if len(rows) < 2:
+            return None
+        time = rows[:, _TIME] - rows[-1, _TIME]
+        time_spread = time - time.mean()
+        variance = float(np.dot(time_spread, time_spread))
+        if variance == 0:
+            return None
+        return float(np.dot(time_spread, rows[:, _GHOST_SLANT]) / variance)
+
+    """write all frames held to a CSV file from a background thread, the frames are copied first"""
+    def dump(self, path):
+        rows = np.array(self.rows())
+        thread = threading.Thread(target=_write_rows, args=(path, rows), name=f"history dump {path}", daemon=True)
+        thread.start()
+        return thread
+
+
+def _write_rows(path, rows):
+    with open(path, 'w', newline='', encoding='utf-8') as csv_file:
+        writer = csv.writer(csv_file)
+        writer.writerow(HISTORY_COLUMNS)
+        writer.writerows(rows.tolist())
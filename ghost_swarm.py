@@ -0,0 +1,138 @@
+#State and motion of all ghost aircraft injected into the TCAS, kept as one set of arrays (one entry per ghost)
+#so that every frame advances the whole swarm in a single vectorized step
+#The ghosts live in the local frame of the attack (east, north, up meters from the attacker, see local_frame.py)
+#and are only converted to lat/lon when that is asked for.
+#The ghosts are moved in fixed steps of time, whatever the frame rate, so the path they fly is the same when the
+#propagation stage runs every frame, every few frames or at a changing frame rate.
+import math
+
+import numpy as np
+
+KNOTS_TO_MPS = 0.514444
+FLIGHT_ID_LENGTH = 8  # each TCAS flight id slot is 8 bytes long
+
+
+def pursuit_direction(east, north, target_east, target_north):
+    """unit vectors (east, north) from every ghost position towards the target, the pursuit law of the ghosts"""
+    delta_east = target_east - east
+    delta_north = target_north - north
+    distance = np.hypot(delta_east, delta_north)
+    distance[distance == 0] = 1.0  # a ghost on top of the target keeps a zero direction
+    return delta_east / distance, delta_north / distance
+
+
+class GhostSwarm:
+
+    def __init__(self, ids, tailnums, speeds, start_distances, bearing_offsets=None, altitude_offsets=None, step=0.05):
+        self.count = len(ids)
+        if self.count == 0:
+            raise ValueError("At least one ghost is required")
+        for tailnum in tailnums:
+            if len(tailnum) > FLIGHT_ID_LENGTH:
+                raise ValueError(f"Tail number {tailnum!r} is longer than {FLIGHT_ID_LENGTH} characters")
+        #identity of each ghost, written once to the TCAS when the attack starts
+        self.ids = list(ids)
+        self.tailnum = list(tailnums)
+        #fixed parameters of each ghost
+        self.speed = np.asarray(speeds, dtype=float)  # knots
+        self.speed_mps = self.speed * KNOTS_TO_MPS
+        self.start_distance = np.asarray(start_distances, dtype=float)  # km from the attacker
+        self.bearing_offset = self._per_ghost(bearing_offsets)  # degrees added to the launch bearing
+        self.altitude_offset = self._per_ghost(altitude_offsets)  # meters above the target
+        if step <= 0:
+            raise ValueError(f"The integration step must be positive, not {step}")
+        self.step = step  # seconds of one integration step
+        #state of each ghost in the local frame, updated every frame
+        self.frame = None  # LocalFrame of the attack, set at launch
+        self.east = np.zeros(self.count)
+        self.north = np.zeros(self.count)
+        self.up = np.zeros(self.count)
+        self.elevation = np.zeros(self.count)
+        self.direction_east = np.zeros(self.count)  # unit vector along the heading
+        self.direction_north = np.zeros(self.count)
+        self.slant = np.zeros(self.count)
+        #integrator state: the positions at the end of the last whole step, the time flown since then and the
+        #target position at the last update, the positions above are these carried on to the current time
+        self.step_east = np.zeros(self.count)
+        self.step_north = np.zeros(self.count)
+        self.pending = 0.0
+        self.last_target = (0.0, 0.0)
+        self.closing_speed = np.zeros(self.count)
+        self.valid = np.ones(self.count, dtype=bool)
+        #preallocated local (OpenGL) coordinates, passed as they are to setDatavf
+        self.x = [0.0] * self.count
+        self.y = [0.0] * self.count
+        self.z = [0.0] * self.count
+
+    def _per_ghost(self, values):
+        if values is None:
+            return np.zeros(self.count)
+        return np.broadcast_to(np.asarray(values, dtype=float), (self.count,)).copy()
+
+    """place every ghost behind the attacker (the origin of the frame), opposite the direction of the target"""
+    def launch(self, frame, target_east, target_north):
+        self.frame = frame
+        bearing = np.radians(math.degrees(math.atan2(target_east, target_north)) + 180 + self.bearing_offset)
+        distance = self.start_distance * 1000
+        self.step_east = distance * np.sin(bearing)
+        self.step_north = distance * np.cos(bearing)
+        self.east = self.step_east.copy()
+        self.north = self.step_north.copy()
+        self.pending = 0.0
+        self.last_target = (target_east, target_north)
+        self.steer(target_east, target_north)
+        self.valid[:] = True
+
+    """fly every ghost towards the target for the elapsed time, in whole steps of self.step"""
+    def advance(self, elapsed, target_east, target_north):
+        if elapsed <= 0:
+            return
+        last_east, last_north = self.last_target
+        pending = self.pending + elapsed
+        steps = int(pending / self.step + 1e-9)
+        step_distance = self.speed_mps * self.step
+        for step in range(1, steps + 1):
+            #each step turns towards where the target is at the end of the step, between its last and current position
+            fraction = min(1.0, 1 - (pending - step * self.step) / elapsed)
+            self.steer(last_east + (target_east - last_east) * fraction, last_north + (target_north - last_north) * fraction)
+            self.step_east += step_distance * self.direction_east
+            self.step_north += step_distance * self.direction_north
+        self.pending = max(0.0, pending - steps * self.step)
+        self.last_target = (target_east, target_north)
+        #carry the positions on along the current heading for the part of a step flown since the last whole step
+        carried = self.speed_mps * self.pending
+        self.east = self.step_east + carried * self.direction_east
+        self.north = self.step_north + carried * self.direction_north
+
+    """point every ghost at the target"""
+    def steer(self, target_east, target_north):
+        self.direction_east, self.direction_north = pursuit_direction(self.step_east, self.step_north, target_east, target_north)
+
+    @property
+    def heading(self):
+        """heading of every ghost in degrees, the frame loop only needs the direction so this is worked out on demand"""
+        return np.degrees(np.arctan2(self.direction_east, self.direction_north)) % 360
+
+    """put every ghost at its elevation in meters, ghosts further away sit lower in the frame as the earth curves"""
+    def set_elevation(self, elevation):
+        self.elevation = np.broadcast_to(elevation, (self.count,)).astype(float)
+        self.up = self.frame.up_at(self.east, self.north, self.elevation)
+
+    """update the slant ranges and closing speeds, a ghost is invalid once it is closer to the target than the attacker"""
+    def check(self, attacker_slant, target_east, target_north, target_up, target_speed_east, target_speed_north):
+        self.slant = np.sqrt((target_east - self.east)**2 + (target_north - self.north)**2 + (target_up - self.up)**2)
+        self.valid &= self.slant > attacker_slant
+        #target speeds in knots along east and north
+        self.closing_speed = np.hypot(self.speed * self.direction_east - target_speed_east,
+                                      self.speed * self.direction_north - target_speed_north)
+        return bool(self.valid.all())
+
+    """latitude, longitude and elevation of every ghost"""
+    def geodetic(self):
+        return self.frame.to_geodetic_batch(self.east, self.north, self.up)
+
+    """convert every ghost position to the local simulator system, ready for the TCAS write"""
+    def to_local(self):
+        x, y, z = self.frame.to_local_batch(self.east, self.north, self.up)
+        self.x[:], self.y[:], self.z[:] = x.tolist(), y.tolist(), z.tolist()
+        return self.x, self.y, self.z
@@ -0,0 +1,194 @@
+#Precomputed ghost trajectories for targets that fly a predictable path
+#When the table is built, the target path is predicted with calculate_future_position (constant speed and track
+#from its current state) in one vectorized call, and the target velocity in the local frame is taken from the ends
+#of that prediction. Against a target flying a straight line at constant speed the pursuit law of the ghosts (head
+#for the target at all times) has a closed form solution, the classic pursuit curve, so every ghost position and
+#direction on the grid of integration steps is worked out at once on NumPy arrays instead of flown step by step.
+#A build therefore costs a handful of array operations, and every frame only interpolates the table at the sim
+#time, so a ghost path depends only on the state it was built from and not on the frame rate or the frame timing.
+#The live target is compared with the predicted one every frame. The table is built again from the current state
+#when the target has drifted more than drift meters off the prediction, or when the time runs past its end.
+import math
+
+import numpy as np
+
+from batch_utilities import calculate_future_position_batch
+
+CAPTURE_RANGE = 1e-3  # meters, a ghost this close to the target is taken to be on it
+
+
+def _log_cosh(u):
+    u = np.abs(u)
+    return u + np.log1p(np.exp(-2 * u)) - math.log(2)
+
+
+def pursuit_table(times, east, north, speeds, target_east, target_north, velocity_east, velocity_north):
+    """positions and directions of ghosts that always head for a target flying a straight line at constant speed
+
+    times is the grid in seconds from now (rows), east, north and speeds (m/s) are the ghosts now (columns) and the
+    target is at (target_east, target_north) now, moving at (velocity_east, velocity_north) m/s. Returns the arrays
+    east, north, direction_east and direction_north, one row per time and one column per ghost.
+
+    With r the range from ghost to target, phi the angle between the target velocity and the line of sight and
+    k the ratio of ghost to target speed, r = C tan(phi/2)^k / sin(phi) along the path and r (k + cos(phi)) changes
+    linearly with time. In u = ln tan(phi/2) both are smooth, and every time is solved for u with a safeguarded
+    Newton iteration on all the ghosts and times at once.
+    """
+    times = np.asarray(times, dtype=float)[:, None]
+    east = np.asarray(east, dtype=float)
+    north = np.asarray(north, dtype=float)
+    speeds = np.broadcast_to(np.asarray(speeds, dtype=float), east.shape)
+    target_speed = math.hypot(velocity_east, velocity_north)
+    #line of sight from every ghost to the target now
+    delta_east = target_east - east
+    delta_north = target_north - north
+    r0 = np.hypot(delta_east, delta_north)
+    sight_east = np.divide(delta_east, r0, out=np.zeros_like(r0), where=r0 > 0)
+    sight_north = np.divide(delta_north, r0, out=np.zeros_like(r0), where=r0 > 0)
+    #the target moves along (ue, un), (ne, nn) is that turned 90 degrees to the left
+    if target_speed > 0:
+        ue, un = velocity_east / target_speed, velocity_north / target_speed
+    else:
+        ue, un = 0.0, 1.0
+    ne, nn = -un, ue
+    cos0 = sight_east * ue + sight_north * un
+    side_sin0 = sight_east * ne + sight_north * nn
+    side = np.where(side_sin0 < 0, -1.0, 1.0)
+    sin0 = np.abs(side_sin0)
+    target_east_t = target_east + velocity_east * times
+    target_north_t = target_north + velocity_north * times
+
+    #a ghost on the line of the target track, or chasing a target that does not move, flies a straight line
+    straight = (sin0 < 1e-9) | (r0 == 0) | (target_speed == 0)
+    closing = target_speed * cos0 - speeds
+    r = np.maximum(r0 + closing * times, 0.0)
+    cos_phi = np.broadcast_to(cos0, r.shape).copy()
+    sin_phi = np.broadcast_to(side * sin0, r.shape).copy()
+    curved = np.flatnonzero(~straight)
+    if curved.size:
+        k = speeds[curved] / target_speed
+        rc0 = r0[curved]
+        u0 = np.log(sin0[curved] / (1 + cos0[curved]))  # ln tan(phi/2)
+        log_cosh0 = _log_cosh(u0)
+        equal = np.abs(k - 1) < 1e-6
+        k_safe = np.where(equal, 2.0, k)
+
+        def range_at(u):
+            return rc0 * np.exp(k * (u - u0) + _log_cosh(u) - log_cosh0)
+
+        def time_at(u, range_u):
+            time = (range_u * (k_safe - np.tanh(u)) - rc0 * (k_safe - np.tanh(u0))) / (target_speed * (1 - k_safe**2))
+            if equal.any():
+                #equal speeds, r (1 + cos(phi)) stays constant and the time has its own closed form
+                level = rc0 * (1 - np.tanh(u0)) / target_speed * (
+                    (u0 - u) / 2 + 1 / (2 * (1 - np.tanh(u0))) - 1 / (2 * (1 - np.tanh(u))))
+                time = np.where(equal, level, time)
+            return time
+
+        #lowest u needed: where the time passes the end of the grid or the ghost has caught the target
+        horizon = float(times[-1, 0])
+        low = u0 - 1.0
+        for _ in range(64):
+            range_low = range_at(low)
+            short = (time_at(low, range_low) < horizon) & (range_low > CAPTURE_RANGE)
+            if not short.any():
+                break
+            low = np.where(short, u0 - 2 * (u0 - low), low)
+        low_range = range_at(low)
+        low_time = time_at(low, low_range)
+        capture_time = np.where(low_range <= CAPTURE_RANGE, low_time, np.inf)
+        #time decreases with u, start from a coarse table of the time against u of every ghost and keep every
+        #solution bracketed between low and high while Newton closes in on it
+        wanted = np.broadcast_to(times, r.shape)[:, curved]
+        grid = u0 + (low - u0) * np.linspace(0.0, 1.0, 512)[:, None]
+        grid_time = time_at(grid, range_at(grid))
+        u = np.column_stack([np.interp(wanted[:, i], grid_time[:, i], grid[:, i]) for i in range(curved.size)])
+        low = np.broadcast_to(low, wanted.shape).copy()
+        high = np.broadcast_to(u0, wanted.shape).copy()
+        pending = wanted < capture_time
+        for _ in range(50):
+            range_u = range_at(u)
+            error = time_at(u, range_u) - wanted
+            if not (np.abs(error[pending]) > 1e-6).any():
+                break
+            high = np.where(error < 0, u, high)
+            low = np.where(error > 0, u, low)
+            u = u + error * target_speed / np.maximum(range_u, 1e-300)
+            outside = (u < low) | (u > high)
+            u = np.where(outside, (low + high) / 2, u)
+        range_u = range_at(u)
+        caught = (wanted >= capture_time) | (range_u <= CAPTURE_RANGE)
+        r[:, curved] = np.where(caught, 0.0, range_u)
+        cos_phi[:, curved] = np.where(caught, 1.0, -np.tanh(u))
+        sin_phi[:, curved] = np.where(caught, 0.0, side[curved] * np.exp(-_log_cosh(u)))
+    #the ghost heads along the line of sight, which is at phi from the target track on the side it started on
+    direction_east = np.where(straight, sight_east, cos_phi * ue + sin_phi * ne)
+    direction_north = np.where(straight, sight_north, cos_phi * un + sin_phi * nn)
+    return (target_east_t - r * direction_east, target_north_t - r * direction_north,
+            np.broadcast_to(direction_east, r.shape), np.broadcast_to(direction_north, r.shape))
+
+
+class GhostTrajectoryTable:
+
+    def __init__(self, swarm, horizon=120.0, drift=100.0):
+        if horizon <= 0:
+            raise ValueError(f"The table horizon must be positive, not {horizon}")
+        self.swarm = swarm
+        self.horizon = horizon  # seconds covered by one table
+        self.drift = drift  # meters the live target may be off the predicted path before the table is rebuilt
+        self.start_time = None  # sim time of the first row
+        self.builds = 0  # tables built since the attack started
+        #rows are the points of the time grid, one column per ghost
+        self.east = None
+        self.north = None
+        self.direction_east = None
+        self.direction_north = None
+        #predicted target position at every point of the grid
+        self.target_east = None
+        self.target_north = None
+
+    """predict the target path from its state now and work out the ghost paths from where the ghosts are now"""
+    def build(self, time, target_lat, target_lon, target_elevation, target_speed, target_track):
+        swarm = self.swarm
+        steps = int(math.ceil(self.horizon / swarm.step))
+        times = np.arange(steps + 1) * swarm.step
+        lat, lon = calculate_future_position_batch(target_lat, target_lon, target_speed, target_track, times / 3600)
+        self.target_east, self.target_north, _ = swarm.frame.to_enu_batch(lat, lon, np.full(steps + 1, float(target_elevation)))
+        velocity_east = (self.target_east[-1] - self.target_east[0]) / times[-1]
+        velocity_north = (self.target_north[-1] - self.target_north[0]) / times[-1]
+        self.east, self.north, self.direction_east, self.direction_north = pursuit_table(
+            times, swarm.east, swarm.north, swarm.speed_mps, self.target_east[0], self.target_north[0],
+            velocity_east, velocity_north)
+        self.start_time = time
+        self.builds += 1
+
+    """put the swarm at its place in the table at the sim time, building a new table when this one no longer fits"""
+    def update(self, time, target):
+        if not self.follow(time, target.east, target.north):
+            self.build(time, target.lat, target.lon, target.elevation, target.speed, target.track)
+            self.follow(time, target.east, target.north)
+
+    """interpolate the table at the sim time, False when the time is outside it or the target is off the prediction"""
+    def follow(self, time, target_east, target_north):
+        if self.start_time is None:
+            return False
+        swarm = self.swarm
+        position = (time - self.start_time) / swarm.step
+        row = int(position)
+        if position < 0 or row >= len(self.east) - 1:
+            return False
+        fraction = position - row
+        predicted_east = self.target_east[row] + (self.target_east[row + 1] - self.target_east[row]) * fraction
+        predicted_north = self.target_north[row] + (self.target_north[row + 1] - self.target_north[row]) * fraction
+        if math.hypot(target_east - predicted_east, target_north - predicted_north) > self.drift:
+            return False
+        swarm.east = self.east[row] + (self.east[row + 1] - self.east[row]) * fraction
+        swarm.north = self.north[row] + (self.north[row + 1] - self.north[row]) * fraction
+        swarm.direction_east = self.direction_east[row]
+        swarm.direction_north = self.direction_north[row]
+        #keep the integrator state in step, so a table built from here or a switch back to advance carries on smoothly
+        swarm.step_east = swarm.east
+        swarm.step_north = swarm.north
+        swarm.pending = 0.0
+        swarm.last_target = (target_east, target_north)
+        return True
@@ -0,0 +1,468 @@
+#Headless driver for ACASAttack.py: runs the plugin without X-Plane, faster than real time
+#A stand-in for the XPPython3.xp module keeps the datarefs in memory and a scripted target aircraft
+#moves through them, while the registered flight loop callbacks are called with synthetic elapsed times.
+#
+#Example:
+#    python headless_sim.py --config config.ini --target turn --duration 600
+import argparse
+import configparser
+import contextlib
+import math
+import os
+import sys
+import types
+
+EARTH_RADIUS_M = 6371000
+KNOTS_TO_MPS = 0.514444
+TCAS_SLOTS = 64  # size of the sim/cockpit2/tcas/targets arrays, slot 0 is our own aircraft
+FLIGHT_ID_LENGTH = 8
+
+
+class ScriptedTarget:
+    """Target aircraft flying a scripted path: constant track, a steady turn, a steady climb or a mix of them."""
+
+    def __init__(self, lat, lon, elevation, speed_kt, track, turn_rate=0.0, climb_rate=0.0):
+        self.lat = lat
+        self.lon = lon
+        self.elevation = elevation  # meters
+        self.speed_kt = speed_kt
+        self.track = track  # degrees true
+        self.turn_rate = turn_rate  # degrees per second, positive to the right
+        self.climb_rate = climb_rate  # meters per second
+
+    def step(self, dt):
+        #advance on the sphere along the current track, then turn and climb
+        speed_mps = self.speed_kt * KNOTS_TO_MPS
+        track_rad = math.radians(self.track)
+        self.lat += math.degrees(speed_mps * dt * math.cos(track_rad) / EARTH_RADIUS_M)
+        self.lon += math.degrees(speed_mps * dt * math.sin(track_rad) / (EARTH_RADIUS_M * math.cos(math.radians(self.lat))))
+        self.elevation += self.climb_rate * dt
+        self.track = (self.track + self.turn_rate * dt) % 360
+
+    @property
+    def pitch(self):
+        speed_mps = self.speed_kt * KNOTS_TO_MPS
+        return math.degrees(math.atan2(self.climb_rate, speed_mps)) if speed_mps else 0.0
+
+
+def constant_track(lat, lon, elevation, speed_kt, track):
+    return ScriptedTarget(lat, lon, elevation, speed_kt, track)
+
+
+def turn(lat, lon, elevation, speed_kt, track, turn_rate=3.0):
+    """Standard rate turn by default."""
+    return ScriptedTarget(lat, lon, elevation, speed_kt, track, turn_rate=turn_rate)
+
+
+def climb(lat, lon, elevation, speed_kt, track, climb_rate=5.0):
+    return ScriptedTarget(lat, lon, elevation, speed_kt, track, climb_rate=climb_rate)
+
+
+TARGET_PATHS = {'constant': constant_track, 'turn': turn, 'climb': climb}
+
+
+class FakeXP(types.ModuleType):
+    """Stand-in for XPPython3.xp with the calls used by the plugin. Datarefs are looked up by name."""
+
+    WidgetClass_MainWindow = 1
+    WidgetClass_Caption = 2
+    WidgetClass_TextField = 3
+    WidgetClass_Button = 4
+    Property_ButtonType = 1
+    Property_MainWindowHasCloseBoxes = 2
+    PushButton = 0
+    Msg_PushButtonPressed = 1
+    Msg_MainWindowCloseButtonPushed = 2
+    MSG_RELEASE_PLANES = 0x11
+    MSG_SCENERY_LOADED = 0x67
+
+    def __init__(self):
+        super().__init__('XPPython3.xp')
+        self.elapsed = 0.0
+        self.frame = 0
+        self.lat_ref = None
+        self.lon_ref = None
+        self.datarefs = {
+            'sim/flightmodel/position/latitude': 0.0,
+            'sim/flightmodel/position/longitude': 0.0,
+            'sim/flightmodel/position/elevation': 0.0,
+            'sim/flightmodel/position/groundspeed': 0.0,
+            'sim/flightmodel/position/true_psi': 0.0,
+            'sim/flightmodel/position/theta': 0.0,
+            'sim/flightmodel/position/local_x': 0.0,
+            'sim/flightmodel/position/local_y': 0.0,
+            'sim/flightmodel/position/local_z': 0.0,
+            'sim/flightmodel/position/local_vx': 0.0,
+            'sim/flightmodel/position/local_vy': 0.0,
+            'sim/flightmodel/position/local_vz': 0.0,
+            'sim/flightmodel/position/lat_ref': 0.0,
+            'sim/flightmodel/position/lon_ref': 0.0,
+            'sim/operation/override/override_TCAS': 0,
+            'sim/cockpit2/tcas/indicators/tcas_alert': 0,  # set by the driver to play an advisory
+            'sim/cockpit2/tcas/targets/modeS_id': [0] * TCAS_SLOTS,
+            'sim/cockpit2/tcas/targets/flight_id': bytearray(TCAS_SLOTS * FLIGHT_ID_LENGTH),
+            'sim/cockpit2/tcas/targets/position/x': [0.0] * TCAS_SLOTS,
+            'sim/cockpit2/tcas/targets/position/y': [0.0] * TCAS_SLOTS,
+            'sim/cockpit2/tcas/targets/position/z': [0.0] * TCAS_SLOTS,
+        }
+        #the TCAS indicators are worked out from the target positions when they are read, as X-Plane does
+        self.indicators = {
+            'sim/cockpit2/tcas/indicators/relative_bearing_degs': 0,
+            'sim/cockpit2/tcas/indicators/relative_distance_mtrs': 1,
+            'sim/cockpit2/tcas/indicators/relative_altitude_mtrs': 2,
+        }
+        self.active_aircraft = 0
+        self.planes_acquired = False
+        self.callbacks = {}  # callback -> [next call time or frame, last call time, refcon]
+        self.widgets = {}
+        self.widget_callbacks = {}
+        self.menus = {}
+        self.messages = []
+
+    #datarefs
+
+    def findDataRef(self, name):
+        if name in self.datarefs or name in self.indicators:
+            return name
+        return None
+
+    def getDatad(self, ref):
+        return float(self.datarefs[ref])
+
+    getDataf = getDatad
+
+    def getDatai(self, ref):
+        return int(self.datarefs[ref])
+
+    def setDatad(self, ref, value):
+        self.datarefs[ref] = float(value)
+
+    setDataf = setDatad
+
+    def setDatai(self, ref, value):
+        self.datarefs[ref] = int(value)
+
+    def _array(self, ref):
+        if ref in self.indicators:
+            return self._tcas_indicator(self.indicators[ref])
+        return self.datarefs[ref]
+
+    def _get_array(self, ref, values, offset, count):
+        data = self._array(ref)
+        if values is None:
+            return len(data)
+        if count < 0:
+            count = len(data) - offset
+        values[:] = data[offset:offset + count]
+        return len(values)
+
+    def getDatavf(self, ref, values=None, offset=0, count=-1):
+        return self._get_array(ref, values, offset, count)
+
+    getDatavi = getDatavf
+
+    def _set_array(self, ref, values, offset, count):
+        data = self.datarefs[ref]
+        if count < 0:
+            count = len(values)
+        data[offset:offset + count] = list(values)[:count]
+
+    def setDatavf(self, ref, values, offset=0, count=-1):
+        self._set_array(ref, values, offset, count)
+
+    setDatavi = setDatavf
+
+    def setDatab(self, ref, value, offset=0, count=-1):
+        data = self.datarefs[ref]
+        if count < 0:
+            count = len(value)
+        data[offset:offset + count] = bytes(value)[:count]
+
+    def _tcas_indicator(self, which):
+        #bearing, horizontal distance and altitude of every TCAS slot relative to our own aircraft
+        own_x = self.datarefs['sim/flightmodel/position/local_x']
+        own_y = self.datarefs['sim/flightmodel/position/local_y']
+        own_z = self.datarefs['sim/flightmodel/position/local_z']
+        heading = self.datarefs['sim/flightmodel/position/true_psi']
+        xs = self.datarefs['sim/cockpit2/tcas/targets/position/x']
+        ys = self.datarefs['sim/cockpit2/tcas/targets/position/y']
+        zs = self.datarefs['sim/cockpit2/tcas/targets/position/z']
+        values = [0.0] * TCAS_SLOTS
+        for i in range(1, self.active_aircraft + 1):
+            dx, dy, dz = xs[i] - own_x, ys[i] - own_y, zs[i] - own_z
+            if which == 0:
+                values[i] = (math.degrees(math.atan2(dx, -dz)) - heading + 180) % 360 - 180
+            elif which == 1:
+                values[i] = math.hypot(dx, dz)
+            else:
+                values[i] = dy
+        return values
+
+    #coordinates, a flat projection around a reference point as the OpenGL local system: x east, y up, z south
+
+    def _set_reference(self, lat, lon):
+        self.lat_ref, self.lon_ref = lat, lon
+        self.datarefs['sim/flightmodel/position/lat_ref'] = lat
+        self.datarefs['sim/flightmodel/position/lon_ref'] = lon
+
+    def worldToLocal(self, lat, lon, alt):
+        x = math.radians(lon - self.lon_ref) * EARTH_RADIUS_M * math.cos(math.radians(self.lat_ref))
+        z = -math.radians(lat - self.lat_ref) * EARTH_RADIUS_M
+        return x, alt, z
+
+    def localToWorld(self, x, y, z):
+        lat = self.lat_ref + math.degrees(-z / EARTH_RADIUS_M)
+        lon = self.lon_ref + math.degrees(x / (EARTH_RADIUS_M * math.cos(math.radians(self.lat_ref))))
+        return lat, lon, y
+
+    #time and flight loops
+
+    def getElapsedTime(self):
+        return self.elapsed
+
+    def getCycleNumber(self):
+        return self.frame
+
+    def registerFlightLoopCallback(self, callback, interval, refcon):
+        self.callbacks[callback] = [None, self.elapsed, refcon]
+        self.setFlightLoopCallbackInterval(callback, interval, 1, refcon)
+
+    def unregisterFlightLoopCallback(self, callback, refcon):
+        self.callbacks.pop(callback, None)
+
+    def setFlightLoopCallbackInterval(self, callback, interval, relative_to_now, refcon):
+        entry = self.callbacks.get(callback)
+        if entry is None:
+            return
+        if interval > 0:
+            entry[0] = ('time', self.elapsed + interval)
+        elif interval < 0:
+            entry[0] = ('frame', self.frame - int(interval))
+        else:
+            entry[0] = None
+
+    def run_flight_loops(self):
+        """Call every callback that is due in this frame, then reschedule it from its return value."""
+        for callback, entry in list(self.callbacks.items()):
+            due = entry[0]
+            if due is None or callback not in self.callbacks:
+                continue
+            if (due[0] == 'time' and self.elapsed + 1e-9 < due[1]) or (due[0] == 'frame' and self.frame < due[1]):
+                continue
+            since_last = self.elapsed - entry[1]
+            entry[1] = self.elapsed
+            interval = callback(since_last, since_last, self.frame, entry[2])
+            self.setFlightLoopCallbackInterval(callback, interval or 0, 1, entry[2])
+
+    #aircraft and plugins
+
+    def acquirePlanes(self, aircraft, callback, refcon):
+        self.planes_acquired = True
+        return 1
+
+    def releasePlanes(self):
+        self.planes_acquired = False
+
+    def setActiveAircraftCount(self, count):
+        self.active_aircraft = count
+
+    def countAircraft(self):
+        return TCAS_SLOTS, self.active_aircraft + 1, None
+
+    def getPluginInfo(self, plugin_id):
+        return ('headless', '', 'headless', '')
+
+    def debugString(self, message):
+        self.messages.append(message)
+
+    #widgets, kept as plain records so their contents can be inspected
+
+    def createWidget(self, left, top, right, bottom, visible, descriptor, is_root, container, widget_class):
+        widget_id = len(self.widgets) + 1
+        self.widgets[widget_id] = {'descriptor': descriptor, 'visible': bool(visible), 'class': widget_class,
+                                   'container': container, 'properties': {}}
+        return widget_id
+
+    def destroyWidget(self, widget_id, destroy_children):
+        self.widgets.pop(widget_id, None)
+        if destroy_children:
+            for child in [w for w, record in self.widgets.items() if record['container'] == widget_id]:
+                self.destroyWidget(child, 1)
+
+    def addWidgetCallback(self, widget_id, callback):
+        self.widget_callbacks[widget_id] = callback
+
+    def setWidgetProperty(self, widget_id, prop, value):
+        self.widgets[widget_id]['properties'][prop] = value
+
+    def getWidgetProperty(self, widget_id, prop, exists=None):
+        return self.widgets[widget_id]['properties'].get(prop, 0)
+
+    def setWidgetDescriptor(self, widget_id, descriptor):
+        self.widgets[widget_id]['descriptor'] = descriptor
+
+    def getWidgetDescriptor(self, widget_id):
+        return self.widgets[widget_id]['descriptor']
+
+    def showWidget(self, widget_id):
+        self.widgets[widget_id]['visible'] = True
+
+    def hideWidget(self, widget_id):
+        self.widgets[widget_id]['visible'] = False
+
+    def isWidgetVisible(self, widget_id):
+        return int(self.widgets[widget_id]['visible'])
+
+    #menus, one record per menu with its handler and the references of its items
+
+    def createMenu(self, name, parent, parent_item, handler, refcon):
+        menu_id = len(self.menus) + 1
+        self.menus[menu_id] = {'name': name, 'handler': handler, 'items': []}
+        return menu_id
+
+    def appendMenuItem(self, menu_id, name, item_ref):
+        self.menus[menu_id]['items'].append((name, item_ref))
+        return len(self.menus[menu_id]['items']) - 1
+
+    def destroyMenu(self, menu_id):
+        self.menus.pop(menu_id, None)
+
+    def pick_menu_item(self, menu_id, name):
+        """Select a menu item by its name, as the user does from the plugins menu."""
+        menu = self.menus[menu_id]
+        item_ref = dict(menu['items'])[name]
+        menu['handler'](menu_id, item_ref)
+
+
+def install_fake_xp():
+    """Register the stand-in as XPPython3.xp (and the widget helper module the plugin imports)."""
+    xp = FakeXP()
+    package = types.ModuleType('XPPython3')
+    package.__path__ = []
+    package.xp = xp
+    utils = types.ModuleType('XPPython3.utils')
+    utils.__path__ = []
+    helper = types.ModuleType('XPPython3.utils.widgetMsgHelper')
+    helper.WidgetMsgHelper = object
+    utils.widgetMsgHelper = helper
+    package.utils = utils
+    sys.modules.update({'XPPython3': package, 'XPPython3.xp': xp, 'XPPython3.utils': utils,
+                        'XPPython3.utils.widgetMsgHelper': helper})
+    #modules imported by an earlier simulation still hold the previous stand-in
+    for module in list(sys.modules.values()):
+        if isinstance(getattr(module, 'xp', None), FakeXP):
+            module.xp = xp
+    return xp
+
+
+class HeadlessSimulation:
+    """Loads the plugin against the stand-in xp module and flies the scripted target with a fixed frame time."""
+
+    def __init__(self, target, config_path='config.ini', frame_time=1 / 60, workdir='.'):
+        self.xp = install_fake_xp()
+        self.target = target
+        self.frame_time = frame_time
+        self.workdir = workdir
+        config_path = os.path.abspath(config_path)
+        self.xp._set_reference(target.lat, target.lon)
+        self._write_target()
+        with self.in_workdir():
+            import ACASAttack
+            self.plugin = ACASAttack.PythonInterface()
+            self.plugin.config_path = config_path
+            self.plugin.XPluginStart()
+            self.plugin.XPluginEnable()
+
+    @contextlib.contextmanager
+    def in_workdir(self):
+        previous = os.getcwd()
+        os.chdir(self.workdir)
+        try:
+            yield
+        finally:
+            os.chdir(previous)
+
+    def _write_target(self):
+        target, refs = self.target, self.xp.datarefs
+        speed_mps = target.speed_kt * KNOTS_TO_MPS
+        track_rad = math.radians(target.track)
+        x, y, z = self.xp.worldToLocal(target.lat, target.lon, target.elevation)
+        refs['sim/flightmodel/position/latitude'] = target.lat
+        refs['sim/flightmodel/position/longitude'] = target.lon
+        refs['sim/flightmodel/position/elevation'] = target.elevation
+        refs['sim/flightmodel/position/groundspeed'] = speed_mps
+        refs['sim/flightmodel/position/true_psi'] = target.track
+        refs['sim/flightmodel/position/theta'] = target.pitch
+        refs['sim/flightmodel/position/local_x'] = x
+        refs['sim/flightmodel/position/local_y'] = y
+        refs['sim/flightmodel/position/local_z'] = z
+        refs['sim/flightmodel/position/local_vx'] = speed_mps * math.sin(track_rad)
+        refs['sim/flightmodel/position/local_vy'] = target.climb_rate
+        refs['sim/flightmodel/position/local_vz'] = -speed_mps * math.cos(track_rad)
+
+    def step(self):
+        """Advance one frame: move the target, then run the flight loop callbacks that are due."""
+        self.xp.frame += 1
+        self.xp.elapsed += self.frame_time
+        self.target.step(self.frame_time)
+        self._write_target()
+        with self.in_workdir():
+            self.xp.run_flight_loops()
+
+    def launch(self):
+        """Press the Launch Attack button."""
+        with self.in_workdir():
+            self.plugin.widgetCallback(self.xp.Msg_PushButtonPressed, self.plugin.launch_button, self.plugin.launch_button, 0)
+
+    def run(self, duration, stop_when_invalid=True):
+        """Launch the attack and fly for up to duration seconds of simulated time. Returns the number of frames."""
+        self.launch()
+        frames = int(round(duration / self.frame_time))
+        for frame in range(frames):
+            self.step()
+            if stop_when_invalid and not self.plugin.attack_valid:
+                return frame + 1
+        return frames
+
+    def shift_scenery(self, lat, lon):
+        """Move the origin of the local frame, as X-Plane does when it loads new scenery, and tell the plugin."""
+        self.xp._set_reference(lat, lon)
+        self._write_target()
+        with self.in_workdir():
+            self.plugin.XPluginReceiveMessage(0, self.xp.MSG_SCENERY_LOADED, None)
+
+    def disable(self):
+        with self.in_workdir():
+            self.plugin.XPluginDisable()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run ACASAttack.py headless against a scripted target")
+    parser.add_argument('--config', default='config.ini', help="plugin ini file with the [Settings] section")
+    parser.add_argument('--target', choices=sorted(TARGET_PATHS), default='constant', help="scripted target path")
+    parser.add_argument('--lat', type=float, help="target start latitude, defaults to the attacker latitude")
+    parser.add_argument('--lon', type=float, help="target start longitude, defaults to the attacker longitude")
+    parser.add_argument('--elevation', type=float, default=3000.0, help="target start elevation in meters")
+    parser.add_argument('--speed', type=float, default=250.0, help="target ground speed in knots")
+    parser.add_argument('--track', type=float, default=90.0, help="target track in degrees")
+    parser.add_argument('--duration', type=float, default=600.0, help="simulated seconds to fly")
+    parser.add_argument('--dt', type=float, default=1 / 60, help="simulated frame time in seconds")
+    args = parser.parse_args(argv)
+
+    config = configparser.ConfigParser()
+    config.read(args.config)
+    settings = config['Settings']
+    lat = args.lat if args.lat is not None else float(settings['attacker_lat'])
+    lon = args.lon if args.lon is not None else float(settings['attacker_lon'])
+    target = TARGET_PATHS[args.target](lat, lon, args.elevation, args.speed, args.track)
+
+    sim = HeadlessSimulation(target, config_path=args.config, frame_time=args.dt)
+    frames = sim.run(args.duration)
+    plugin = sim.plugin
+    sim.disable()
+    print(f"frames: {frames}  simulated time: {frames * args.dt:.1f} s  attack valid: {plugin.attack_valid}")
+    print(f"ghost slant: {plugin.ghost.slant:.0f} m  attacker slant: {plugin.attacker.slant:.0f} m  closing speed: {plugin.ghost.closing_speed:.1f} kt")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,77 @@
+#Timing of the plugin hot path: each callback and geometry helper can be wrapped so every call is timed
+#with perf_counter_ns and kept in a rolling window of the most recent samples. Percentiles are only worked
+#out when a report is asked for. Nothing is wrapped unless instrumentation is switched on, so it costs
+#nothing when it is off.
+import array
+import time
+
+
+class RollingHistogram:
+    """The last capacity samples of one timed call, in nanoseconds."""
+
+    def __init__(self, capacity=1024):
+        self.samples = array.array('q', bytes(8 * capacity))
+        self.capacity = capacity
+        self.count = 0  # samples recorded since the start, the window holds the last capacity of them
+
+    def add(self, value):
+        self.samples[self.count % self.capacity] = value
+        self.count += 1
+
+    def percentiles(self):
+        """p50, p99 and max of the samples in the window, in milliseconds."""
+        n = min(self.count, self.capacity)
+        if n == 0:
+            return 0.0, 0.0, 0.0
+        ordered = sorted(self.samples[:n])
+        return (ordered[(n - 1) // 2] / 1e6, ordered[int(0.99 * (n - 1))] / 1e6, ordered[-1] / 1e6)
+
+
+class Profiler:
+
+    def __init__(self, capacity=1024):
+        self.capacity = capacity
+        self.histograms = {}
+
+    def histogram(self, name):
+        if name not in self.histograms:
+            self.histograms[name] = RollingHistogram(self.capacity)
+        return self.histograms[name]
+
+    """return function wrapped so each call is timed under name"""
+    def wrap(self, name, function):
+        if getattr(function, '_profiled', False):
+            return function
+        record = self.histogram(name).add
+        clock = time.perf_counter_ns
+
+        def timed(*args, **kwargs):
+            start = clock()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                record(clock() - start)
+
+        timed._profiled = True
+        timed.__wrapped__ = function
+        return timed
+
+    """time every stage of a FlightLoopScheduler under its stage name"""
+    def instrument_scheduler(self, scheduler):
+        for stage in scheduler.stages:
+            stage.function = self.wrap(stage.name, stage.function)
+
+    """p50/p99/max of one timed call as a short text, for the widget"""
+    def summary(self, name='frame'):
+        if name not in self.histograms:
+            return "no data"
+        p50, p99, longest = self.histograms[name].percentiles()
+        return f"{p50:.2f}/{p99:.2f}/{longest:.2f} ms"
+
+    def report(self):
+        """One line per timed call: name, calls, p50, p99 and max in milliseconds."""
+        lines = [f"{'call':<40}{'calls':>10}{'p50 ms':>10}{'p99 ms':>10}{'max ms':>10}"]
+        for name, histogram in sorted(self.histograms.items()):
+            p50, p99, longest = histogram.percentiles()
+            lines.append(f"{name:<40}{histogram.count:>10}{p50:>10.3f}{p99:>10.3f}{longest:>10.3f}")
+        return lines
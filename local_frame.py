@@ -0,0 +1,177 @@
+#Local Cartesian frame anchored at the attacker, in which all the per frame attack geometry is done
+#Positions are east, north and up meters from the attacker on the tangent plane of the WGS84 ellipsoid, so slant
+#ranges, headings and elevation angles are plain vector math and every quantity comes from the same model.
+#Positions are converted back to lat/lon only when they are logged or shown. The TCAS write goes through a
+#transform to the X-Plane local (OpenGL) frame that is fitted once with worldToLocal, and fitted again whenever
+#X-Plane shifts its scenery and with it the origin of the local frame.
+#The attacker trig terms are computed once per attack. Points that move a little every frame (the target) keep
+#their trig terms up to date with small angle recurrences and are resynced exactly every few frames.
+import math
+
+import numpy as np
+
+WGS84_A = 6378137.0  # equatorial radius in meters
+WGS84_F = 1 / 298.257223563
+WGS84_B = WGS84_A * (1 - WGS84_F)
+WGS84_E2 = WGS84_F * (2 - WGS84_F)
+WGS84_EP2 = WGS84_E2 / (1 - WGS84_E2)
+
+
+def geodetic_to_ecef(lat, lon, elevation):
+    """Earth centered, earth fixed coordinates in meters of one point, elevation in meters above the ellipsoid."""
+    lat, lon = math.radians(lat), math.radians(lon)
+    sin_lat = math.sin(lat)
+    n = WGS84_A / math.sqrt(1 - WGS84_E2 * sin_lat**2)
+    return ((n + elevation) * math.cos(lat) * math.cos(lon),
+            (n + elevation) * math.cos(lat) * math.sin(lon),
+            (n * (1 - WGS84_E2) + elevation) * sin_lat)
+
+
+def geodetic_to_ecef_batch(lat, lon, elevation):
+    lat, lon = np.radians(lat), np.radians(lon)
+    sin_lat, cos_lat = np.sin(lat), np.cos(lat)
+    n = WGS84_A / np.sqrt(1 - WGS84_E2 * sin_lat**2)
+    return ((n + elevation) * cos_lat * np.cos(lon),
+            (n + elevation) * cos_lat * np.sin(lon),
+            (n * (1 - WGS84_E2) + elevation) * sin_lat)
+
+
+def ecef_to_geodetic(x, y, z):
+    """Latitude, longitude and elevation of one point with Bowring's formula (sub millimeter at aircraft altitudes)."""
+    p = math.hypot(x, y)
+    theta = math.atan2(z * WGS84_A, p * WGS84_B)
+    lat = math.atan2(z + WGS84_EP2 * WGS84_B * math.sin(theta)**3, p - WGS84_E2 * WGS84_A * math.cos(theta)**3)
+    sin_lat = math.sin(lat)
+    n = WGS84_A / math.sqrt(1 - WGS84_E2 * sin_lat**2)
+    return math.degrees(lat), math.degrees(math.atan2(y, x)), p / math.cos(lat) - n
+
+
+def ecef_to_geodetic_batch(x, y, z):
+    p = np.hypot(x, y)
+    theta = np.arctan2(z * WGS84_A, p * WGS84_B)
+    lat = np.arctan2(z + WGS84_EP2 * WGS84_B * np.sin(theta)**3, p - WGS84_E2 * WGS84_A * np.cos(theta)**3)
+    n = WGS84_A / np.sqrt(1 - WGS84_E2 * np.sin(lat)**2)
+    return np.degrees(lat), np.degrees(np.arctan2(y, x)), p / np.cos(lat) - n
+
+
+def _small_angle(delta):
+    """sin and cos of a small angle in radians from their series, good to 1e-19 below 1e-3 rad"""
+    delta2 = delta * delta
+    return delta * (1 - delta2 / 6 * (1 - delta2 / 20)), 1 - delta2 / 2 * (1 - delta2 / 12)
+
+
+class IncrementalTrig:
+    """sin and cos of an angle in degrees that changes a little between updates.
+
+    Each update rotates the last sin and cos by the change of the angle, using a short series instead of sin and cos.
+    They are computed exactly on the first update, every resync_every updates and after a jump larger than max_step.
+    """
+
+    def __init__(self, resync_every=64, max_step=1e-3):
+        self.resync_every = resync_every
+        self.max_step = max_step  # radians
+        self.angle = None
+        self.sin = 0.0
+        self.cos = 1.0
+        self.updates = 0
+
+    def update(self, angle):
+        if self.angle is not None and self.updates < self.resync_every:
+            delta = math.radians(angle - self.angle)
+            if -self.max_step < delta < self.max_step:
+                sin_delta, cos_delta = _small_angle(delta)
+                self.sin, self.cos = (self.sin * cos_delta + self.cos * sin_delta,
+                                      self.cos * cos_delta - self.sin * sin_delta)
+                self.angle = angle
+                self.updates += 1
+                return self.sin, self.cos
+        radians = math.radians(angle)
+        self.sin, self.cos = math.sin(radians), math.cos(radians)
+        self.angle = angle
+        self.updates = 0
+        return self.sin, self.cos
+
+
+class LocalFrame:
+
+    def __init__(self, lat, lon, elevation):
+        self.lat = lat
+        self.lon = lon
+        self.elevation = elevation
+        self.origin = geodetic_to_ecef(lat, lon, elevation)
+        sin_lat, cos_lat = math.sin(math.radians(lat)), math.cos(math.radians(lat))
+        sin_lon, cos_lon = math.sin(math.radians(lon)), math.cos(math.radians(lon))
+        #rows are the east, north and up unit vectors in earth centered coordinates
+        self.rotation = ((-sin_lon, cos_lon, 0.0),
+                         (-sin_lat * cos_lon, -sin_lat * sin_lon, cos_lat),
+                         (cos_lat * cos_lon, cos_lat * sin_lon, sin_lat))
+        self.rotation_array = np.array(self.rotation)
+        #mean radius of curvature at the attacker, for how far the ellipsoid drops below the tangent plane
+        w = math.sqrt(1 - WGS84_E2 * sin_lat**2)
+        self.radius = math.sqrt(WGS84_A * (1 - WGS84_E2) / w**3 * WGS84_A / w)
+        #transform to the X-Plane local (OpenGL) frame, set by fit_local
+        self.local_origin = None
+        self.local_axes = None
+
+    """east, north and up meters of one point"""
+    def to_enu(self, lat, lon, elevation):
+        return self.ecef_to_enu(*geodetic_to_ecef(lat, lon, elevation))
+
+    def ecef_to_enu(self, x, y, z):
+        dx, dy, dz = x - self.origin[0], y - self.origin[1], z - self.origin[2]
+        east, north, up = self.rotation
+        return (east[0] * dx + east[1] * dy,
+                north[0] * dx + north[1] * dy + north[2] * dz,
+                up[0] * dx + up[1] * dy + up[2] * dz)
+
+    def to_enu_batch(self, lat, lon, elevation):
+        x, y, z = geodetic_to_ecef_batch(lat, lon, elevation)
+        east, north, up = self.rotation_array @ np.array([x - self.origin[0], y - self.origin[1], z - self.origin[2]])
+        return east, north, up
+
+    """latitude, longitude and elevation of one point"""
+    def to_geodetic(self, east, north, up):
+        (e0, e1, e2), (n0, n1, n2), (u0, u1, u2) = self.rotation
+        return ecef_to_geodetic(self.origin[0] + e0 * east + n0 * north + u0 * up,
+                                self.origin[1] + e1 * east + n1 * north + u1 * up,
+                                self.origin[2] + e2 * east + n2 * north + u2 * up)
+
+    def to_geodetic_batch(self, east, north, up):
+        x, y, z = self.rotation_array.T @ np.array([east, north, up], dtype=float)
+        return ecef_to_geodetic_batch(x + self.origin[0], y + self.origin[1], z + self.origin[2])
+
+    """up coordinate of points east and north of the attacker that are at the given elevation"""
+    def up_at(self, east, north, elevation):
+        return elevation - self.elevation - (east**2 + north**2) / (2 * self.radius)
+
+    """fit the transform to the X-Plane local frame, call it again after every scenery shift"""
+    def fit_local(self, world_to_local, span=10000.0):
+        #both frames are Cartesian, so the attacker and one point along each axis fix the transform
+        self.local_origin = np.array(world_to_local(self.lat, self.lon, self.elevation), dtype=float)
+        axes = []
+        for axis in np.eye(3) * span:
+            point = world_to_local(*self.to_geodetic(*axis))
+            axes.append((np.array(point, dtype=float) - self.local_origin) / span)
+        self.local_axes = np.array(axes).T
+
+    """X-Plane local x, y and z of points given in this frame"""
+    def to_local_batch(self, east, north, up):
+        x, y, z = self.local_axes @ np.array([east, north, up], dtype=float)
+        return x + self.local_origin[0], y + self.local_origin[1], z + self.local_origin[2]
+
+
+class TrackedPoint:
+    """A point that moves a little every frame, such as the target, converted to the frame with incremental trig"""
+
+    def __init__(self, frame, resync_every=64):
+        self.frame = frame
+        self.lat_trig = IncrementalTrig(resync_every)
+        self.lon_trig = IncrementalTrig(resync_every)
+
+    def to_enu(self, lat, lon, elevation):
+        sin_lat, cos_lat = self.lat_trig.update(lat)
+        sin_lon, cos_lon = self.lon_trig.update(lon)
+        n = WGS84_A / math.sqrt(1 - WGS84_E2 * sin_lat**2)
+        return self.frame.ecef_to_enu((n + elevation) * cos_lat * cos_lon,
+                                      (n + elevation) * cos_lat * sin_lon,
+                                      (n * (1 - WGS84_E2) + elevation) * sin_lat)
@@ -0,0 +1,164 @@
+#Summaries of many attack runs from their data logs, for a whole campaign at once
+#Every log (CSV or binary, see binary_log.py) is read as a stream of rows, never as a whole, and reduced to one
+#summary row: the valid window, the time to the RA, the minimum ghost slant range and the peak closing speed.
+#The logs are spread over a process pool and the summaries are written to the campaign table as they come in,
+#so the memory used does not grow with the number of runs.
+#
+#Example:
+#    python log_analytics.py runs/ --processes 8 --out campaign.csv
+import argparse
+import csv
+import glob
+import math
+import multiprocessing
+import os
+
+from binary_log import LOG_COLUMNS, read_binary_log
+
+LOG_PATTERN = 'TCAS_Data_Log*.csv'
+SUMMARY_COLUMNS = ['run', 'rows', 'duration', 'valid_window', 'time_to_ra', 'min_ghost_slant', 'peak_closing_speed']
+#the columns a summary needs, read from every row
+COLUMNS = ("Time", "Ghost Slant", "Closing Speed", "Attack Valid", "RA Triggered")
+
+
+def iter_csv_rows(path):
+    """(time, ghost slant, closing speed, attack valid, RA triggered) of every row of a CSV log, one at a time."""
+    with open(path, newline='', encoding='utf-8') as csv_file:
+        reader = csv.reader(csv_file)
+        header = next(reader, None)
+        if header != LOG_COLUMNS:
+            raise ValueError(f"{path} does not have the TCAS data log columns")
+        time, slant, closing, valid, ra = (LOG_COLUMNS.index(name) for name in COLUMNS)
+        for row in reader:
+            if len(row) != len(LOG_COLUMNS):
+                continue  # a row cut short by a crash while writing
+            yield float(row[time]), float(row[slant]), float(row[closing]), row[valid] == 'True', row[ra] == 'True'
+
+
+def iter_binary_rows(path, chunk_rows=65536):
+    """The same rows from a binary log, copied out of the memory map a chunk at a time."""
+    records = read_binary_log(path)
+    for start in range(0, len(records), chunk_rows):
+        chunk = records[start:start + chunk_rows]
+        yield from zip(*(chunk[name].tolist() for name in COLUMNS))
+
+
+def iter_rows(path):
+    return iter_binary_rows(path) if path.endswith('.bin') else iter_csv_rows(path)
+
+
+def summarize_run(path):
+    """One summary row for the log at path, times in seconds from its first row (the attack launch)."""
+    rows = 0
+    start = end = valid_until = time_to_ra = None
+    min_slant = math.inf
+    peak_closing = 0.0
+    for time, slant, closing, valid, ra in iter_rows(path):
+        if start is None:
+            start = time
+        end = time
+        rows += 1
+        min_slant = min(min_slant, slant)
+        peak_closing = max(peak_closing, closing)
+        if valid:
+            valid_until = time
+        if ra and time_to_ra is None:
+            time_to_ra = time - start
+    nan = math.nan
+    return {
+        'run': os.path.basename(path),
+        'rows': rows,
+        'duration': end - start if rows else nan,
+        'valid_window': valid_until - start if valid_until is not None else nan,
+        'time_to_ra': time_to_ra if time_to_ra is not None else nan,
+        'min_ghost_slant': min_slant if rows else nan,
+        'peak_closing_speed': peak_closing if rows else nan,
+    }
+
+
+def _summarize_or_report(path):
+    try:
+        return summarize_run(path), None
+    except (OSError, ValueError) as e:
+        return None, f"{path}: {e}"
+
+
+def find_logs(paths):
+    """Log files named on the command line, directories are searched for TCAS data logs. Yields paths lazily.
+
+    In a directory the binary copy of a run is used instead of its CSV log when there is one.
+    """
+    for path in paths:
+        if os.path.isdir(path):
+            for csv_path in sorted(glob.iglob(os.path.join(path, LOG_PATTERN))):
+                binary_path = csv_path[:-len('.csv')] + '.bin'
+                yield binary_path if os.path.exists(binary_path) else csv_path
+        else:
+            yield from sorted(glob.iglob(path)) if glob.has_magic(path) else [path]
+
+
+class CampaignTotals:
+    """Running count, mean, minimum and maximum of every summary value, without keeping the summaries."""
+
+    VALUES = SUMMARY_COLUMNS[2:]
+
+    def __init__(self):
+        self.runs = 0
+        self.runs_with_ra = 0
+        self.count = dict.fromkeys(self.VALUES, 0)
+        self.total = dict.fromkeys(self.VALUES, 0.0)
+        self.low = dict.fromkeys(self.VALUES, math.inf)
+        self.high = dict.fromkeys(self.VALUES, -math.inf)
+
+    def add(self, summary):
+        self.runs += 1
+        self.runs_with_ra += not math.isnan(summary['time_to_ra'])
+        for name in self.VALUES:
+            value = summary[name]
+            if not math.isnan(value):
+                self.count[name] += 1
+                self.total[name] += value
+                self.low[name] = min(self.low[name], value)
+                self.high[name] = max(self.high[name], value)
+
+    def report(self):
+        lines = [f"{self.runs} runs, {self.runs_with_ra} with an RA"]
+        for name in self.VALUES:
+            if self.count[name]:
+                lines.append(f"{name:<20} mean {self.total[name] / self.count[name]:12.3f}  "
+                             f"min {self.low[name]:12.3f}  max {self.high[name]:12.3f}")
+        return lines
+
+
+def analyze_campaign(paths, out_path, processes=None, chunk_size=16):
+    """Summarize every log into the campaign table at out_path. Returns the totals and the logs that failed."""
+    totals = CampaignTotals()
+    errors = []
+    with open(out_path, 'w', newline='', encoding='utf-8') as out_file, multiprocessing.Pool(processes) as pool:
+        writer = csv.DictWriter(out_file, SUMMARY_COLUMNS)
+        writer.writeheader()
+        for summary, error in pool.imap(_summarize_or_report, find_logs(paths), chunksize=chunk_size):
+            if error:
+                errors.append(error)
+                continue
+            writer.writerow(summary)
+            totals.add(summary)
+    return totals, errors
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Summarize a campaign of TCAS data logs into one table")
+    parser.add_argument('paths', nargs='+', help="log files, glob patterns or directories of logs")
+    parser.add_argument('--processes', type=int, help="worker processes, all cores by default")
+    parser.add_argument('--out', default='campaign_summary.csv')
+    args = parser.parse_args(argv)
+    totals, errors = analyze_campaign(args.paths, args.out, processes=args.processes)
+    for line in totals.report():
+        print(line)
+    for error in errors:
+        print(f"skipped {error}")
+    print(f"campaign table written to {args.out}")
+
+
+if __name__ == '__main__':
+    main()
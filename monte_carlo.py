@@ -0,0 +1,162 @@
+#Monte Carlo robustness of one attack geometry against target manoeuvres and noisy datarefs
+#A single run assumes one exact target path. Here thousands of perturbed runs of the same attack are flown at
+#once with attack_model.simulate_attacks, the pursuit law of the plugin on NumPy arrays. Every run draws its own
+#target turn rate, climb rate and acceleration, and every step the target values the ghost steers by get gaussian
+#noise on position, altitude and track. The result is the distribution of the valid window, the minimum ghost
+#slant range and the peak closing speed over the runs.
+#The runs are split into chunks, each with its own random stream spawned from one seed, so a seed gives the same
+#results whatever the number of processes.
+#
+#Example:
+#    python monte_carlo.py --attacker-lat 50.1 --attacker-lon 8.0 --target-lat 50.0 --target-lon 8.2 \
+#        --target-speed 120 --runs 5000 --turn-rate-sd 1 --climb-rate-sd 2 --position-noise 30 --seed 1
+import argparse
+import csv
+import multiprocessing
+
+import numpy as np
+from attack_model import simulate_attacks
+
+#the attack geometry that is perturbed, as for scenario_sweep.py
+ATTACK_KEYS = ['attacker_lat', 'attacker_lon', 'attacker_elevation', 'start_distance', 'ghost_speed',
+               'target_lat', 'target_lon', 'target_elevation', 'target_speed', 'target_track']
+#standard deviations of the perturbations, a manoeuvre is drawn once per run and the noise every step
+PERTURBATIONS = {
+    'turn_rate_sd': 0.0,  # degrees per second
+    'climb_rate_sd': 0.0,  # meters per second
+    'acceleration_sd': 0.0,  # knots per second
+    'position_noise': 0.0,  # meters, horizontal
+    'altitude_noise': 0.0,  # meters
+    'track_noise': 0.0,  # degrees
+}
+MANOEUVRES = ['turn_rate', 'climb_rate', 'acceleration']
+RESULTS = ['valid_duration', 'min_slant', 'peak_closing_speed']
+PERCENTILES = (5, 25, 50, 75, 95)
+
+
+def _evaluate_chunk(job):
+    start, count, seed, attack, perturbation, duration, dt = job
+    rng = np.random.default_rng(seed)
+    manoeuvres = {
+        'turn_rate': rng.normal(0.0, perturbation['turn_rate_sd'], count),
+        'climb_rate': rng.normal(0.0, perturbation['climb_rate_sd'], count),
+        'acceleration': rng.normal(0.0, perturbation['acceleration_sd'], count),
+    }
+    results = simulate_attacks(attack['attacker_lat'], attack['attacker_lon'], attack['attacker_elevation'],
+                               np.full(count, float(attack['start_distance'])), attack['ghost_speed'],
+                               attack['target_lat'], attack['target_lon'], attack['target_elevation'],
+                               attack['target_speed'], attack['target_track'], duration=duration, dt=dt,
+                               target_turn_rate=manoeuvres['turn_rate'], target_climb_rate=manoeuvres['climb_rate'],
+                               target_acceleration=manoeuvres['acceleration'],
+                               position_noise=perturbation['position_noise'],
+                               altitude_noise=perturbation['altitude_noise'],
+                               track_noise=perturbation['track_noise'], rng=rng)
+    results.update(manoeuvres)
+    return start, results
+
+
+def run_monte_carlo(attack, perturbation, runs=1000, seed=0, duration=600.0, dt=0.1, processes=1, chunk_size=1024):
+    """Fly runs perturbed copies of the attack. Returns one array per name in MANOEUVRES and RESULTS.
+
+    attack maps every name in ATTACK_KEYS to a value, perturbation the names in PERTURBATIONS (missing ones are 0).
+    processes=1 runs in this process, None uses all cores.
+    """
+    perturbation = dict(PERTURBATIONS, **perturbation)
+    unknown = set(perturbation) - set(PERTURBATIONS)
+    if unknown:
+        raise ValueError(f"Unknown perturbations: {', '.join(sorted(unknown))}")
+    starts = range(0, runs, chunk_size)
+    seeds = np.random.SeedSequence(seed).spawn(len(starts))
+    jobs = [(start, min(chunk_size, runs - start), chunk_seed, attack, perturbation, duration, dt)
+            for start, chunk_seed in zip(starts, seeds)]
+    table = {name: np.empty(runs) for name in MANOEUVRES + RESULTS}
+    if processes == 1:
+        chunks = map(_evaluate_chunk, jobs)
+        pool = None
+    else:
+        pool = multiprocessing.Pool(processes)
+        chunks = pool.imap_unordered(_evaluate_chunk, jobs)
+    try:
+        for start, results in chunks:
+            for name in table:
+                table[name][start:start + results[name].size] = results[name]
+    finally:
+        if pool:
+            pool.close()
+            pool.join()
+    return table
+
+
+def summarize(table, duration=600.0):
+    """Mean, standard deviation, extremes and percentiles of every result, and the share of runs that broke."""
+    summary = {}
+    for name in RESULTS:
+        values = table[name]
+        finite = values[np.isfinite(values)]  # a run that broke on its first step has no minimum slant range
+        if not finite.size:
+            summary[name] = {}
+            continue
+        row = {'mean': finite.mean(), 'sd': finite.std(), 'min': finite.min(), 'max': finite.max()}
+        row.update((f"p{p}", value) for p, value in zip(PERCENTILES, np.percentile(finite, PERCENTILES)))
+        summary[name] = row
+    summary['broken_share'] = float(np.mean(table['valid_duration'] < duration))
+    return summary
+
+
+def report(summary):
+    lines = [f"{summary['broken_share']:.1%} of the runs lost the attack geometry"]
+    for name in RESULTS:
+        row = summary[name]
+        if row:
+            lines.append(f"{name:<20} mean {row['mean']:10.2f}  sd {row['sd']:9.2f}  "
+                         + "  ".join(f"p{p} {row[f'p{p}']:10.2f}" for p in PERCENTILES))
+    return lines
+
+
+def write_table(table, path):
+    with open(path, 'w', newline='', encoding='utf-8') as csv_file:
+        writer = csv.writer(csv_file)
+        columns = MANOEUVRES + RESULTS
+        writer.writerow(['run'] + columns)
+        writer.writerows(zip(range(len(table[columns[0]])), *(np.round(table[name], 6).tolist() for name in columns)))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Monte Carlo robustness of an attack against target manoeuvres and dataref noise")
+    parser.add_argument('--attacker-lat', required=True, type=float)
+    parser.add_argument('--attacker-lon', required=True, type=float)
+    parser.add_argument('--attacker-elevation', default=100.0, type=float, help="meters")
+    parser.add_argument('--start-distance', default=10.0, type=float, help="km")
+    parser.add_argument('--ghost-speed', default=250.0, type=float, help="knots")
+    parser.add_argument('--target-lat', required=True, type=float)
+    parser.add_argument('--target-lon', required=True, type=float)
+    parser.add_argument('--target-elevation', default=3000.0, type=float, help="meters")
+    parser.add_argument('--target-speed', default=250.0, type=float, help="knots")
+    parser.add_argument('--target-track', default=90.0, type=float, help="degrees")
+    parser.add_argument('--turn-rate-sd', default=0.0, type=float, help="degrees per second")
+    parser.add_argument('--climb-rate-sd', default=0.0, type=float, help="meters per second")
+    parser.add_argument('--acceleration-sd', default=0.0, type=float, help="knots per second")
+    parser.add_argument('--position-noise', default=0.0, type=float, help="meters")
+    parser.add_argument('--altitude-noise', default=0.0, type=float, help="meters")
+    parser.add_argument('--track-noise', default=0.0, type=float, help="degrees")
+    parser.add_argument('--runs', default=1000, type=int)
+    parser.add_argument('--seed', default=0, type=int)
+    parser.add_argument('--duration', default=600.0, type=float, help="longest run to simulate in seconds")
+    parser.add_argument('--dt', default=0.1, type=float, help="simulation step in seconds")
+    parser.add_argument('--processes', type=int, help="worker processes, all cores by default")
+    parser.add_argument('--out', help="also write every run to this CSV file")
+    args = parser.parse_args(argv)
+
+    attack = {name: getattr(args, name) for name in ATTACK_KEYS}
+    perturbation = {name: getattr(args, name) for name in PERTURBATIONS}
+    table = run_monte_carlo(attack, perturbation, runs=args.runs, seed=args.seed, duration=args.duration,
+                            dt=args.dt, processes=args.processes)
+    for line in report(summarize(table, args.duration)):
+        print(line)
+    if args.out:
+        write_table(table, args.out)
+        print(f"{args.runs} runs written to {args.out}")
+
+
+if __name__ == '__main__':
+    main()
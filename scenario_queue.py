@@ -0,0 +1,101 @@
+#Scenario file for running many attacks back to back without touching config.ini in between
+#Every section is one scenario, its keys replace the [Settings] values of config.ini for that run. The file is
+#read and checked once when the plugin loads, so a mistake shows up before the first attack and not halfway.
+#
+#Example scenarios.ini, named in config.ini with scenario_file = scenarios.ini:
+#    [Close start]
+#    start_distance = 5
+#    ghost_speed = 250
+#    repeat = 3
+#
+#    [Fast ghost]
+#    ghost_speed = 400
+#    max_duration = 300
+#    pause = 10
+import collections
+import configparser
+
+#numeric settings a scenario may change, with the range of values that makes sense for them
+LIMITS = {
+    'attacker_lat': (-90.0, 90.0),
+    'attacker_lon': (-180.0, 180.0),
+    'attacker_elevation': (-500.0, 20000.0),  # meters
+    'start_distance': (0.1, 500.0),  # km
+    'ghost_speed': (1.0, 2000.0),  # knots
+    'ghost_step': (0.001, 1.0),  # seconds
+    'table_horizon': (1.0, 3600.0),  # seconds
+    'table_drift': (0.0, 100000.0),  # meters
+    'fade_time': (0.0, 600.0),  # seconds
+}
+#settings read with getint and getboolean when the scenario is launched, checked the same way when it is loaded
+INTEGER_KEYS = ('ra_level',)
+BOOLEAN_KEYS = ('ghost_table',)
+TEXT_KEYS = ('ra_dataref',) + INTEGER_KEYS + BOOLEAN_KEYS
+#keys that control the queue itself and are not plugin settings
+QUEUE_KEYS = ('repeat', 'max_duration', 'pause')
+DEFAULT_PAUSE = 5.0  # seconds between the end of one attack and the launch of the next
+
+Scenario = collections.namedtuple('Scenario', [
+    'name',
+    'settings',  # dict of [Settings] keys and values for the run
+    'max_duration',  # seconds after which the attack is ended even if it is still valid, None for no limit
+    'pause',  # seconds to wait after the run before the next one is launched
+])
+
+
+def _number(section, key, value, low=None, high=None):
+    try:
+        number = float(value)
+    except ValueError:
+        raise ValueError(f"[{section}] {key} = {value!r} is not a number") from None
+    if low is not None and not low <= number <= high:
+        raise ValueError(f"[{section}] {key} = {number} is outside {low}..{high}")
+    return number
+
+
+def _check_types(name, settings):
+    #the plugin reads the settings of a scenario back from a ConfigParser section, so they are checked through one
+    parser = configparser.ConfigParser()
+    parser.read_dict({'Settings': settings})
+    section = parser['Settings']
+    for key in INTEGER_KEYS + BOOLEAN_KEYS:
+        if key not in section:
+            continue
+        try:
+            section.getint(key) if key in INTEGER_KEYS else section.getboolean(key)
+        except ValueError:
+            kind = 'an integer' if key in INTEGER_KEYS else 'true or false'
+            raise ValueError(f"[{name}] {key} = {section[key]!r} is not {kind}") from None
+
+
+def check_settings(name, settings):
+    """Check the numeric ranges and the integer and boolean values of a settings mapping, raises ValueError."""
+    for key, (low, high) in LIMITS.items():
+        if key in settings:
+            _number(name, key, settings[key], low, high)
+    _check_types(name, settings)
+
+
+def load_scenarios(path, defaults):
+    """Read and check the scenario file. defaults are the [Settings] of config.ini. Returns a list of Scenarios."""
+    parser = configparser.ConfigParser()
+    if not parser.read(path):
+        raise ValueError(f"Scenario file {path} could not be read")
+    scenarios = []
+    for name in parser.sections():
+        section = parser[name]
+        unknown = set(section) - set(LIMITS) - set(TEXT_KEYS) - set(QUEUE_KEYS)
+        if unknown:
+            raise ValueError(f"[{name}] has unknown keys: {', '.join(sorted(unknown))}")
+        settings = dict(defaults)
+        settings.update((key, section[key]) for key in section if key not in QUEUE_KEYS)
+        check_settings(name, settings)
+        max_duration = _number(name, 'max_duration', section['max_duration'], 1.0, 86400.0) if 'max_duration' in section else None
+        pause = _number(name, 'pause', section.get('pause', str(DEFAULT_PAUSE)), 0.0, 3600.0)
+        repeat = int(_number(name, 'repeat', section.get('repeat', '1'), 1, 10000))
+        for run in range(repeat):
+            run_name = name if repeat == 1 else f"{name} #{run + 1}"
+            scenarios.append(Scenario(run_name, settings, max_duration, pause))
+    if not scenarios:
+        raise ValueError(f"Scenario file {path} has no scenarios")
+    return scenarios
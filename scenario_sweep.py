@@ -0,0 +1,100 @@
+#Sweep of the attack envelope over attacker position, start distance and ghost speed
+#Every combination of the parameter grids is flown with attack_model.simulate_attacks. The combinations are
+#split into chunks that are evaluated in parallel in a process pool, and one row per combination is written
+#to a CSV table with the valid duration, the minimum ghost slant range and the peak closing speed.
+#
+#A grid is either a comma separated list (250,300,350) or a range start:stop:count (5:30:26).
+#Example:
+#    python scenario_sweep.py --attacker-lat 49.9:50.3:41 --attacker-lon 7.8:8.2:41 --start-distance 5:30:26 \
+#        --ghost-speed 200,250,300 --target-lat 50.0 --target-lon 8.2 --out sweep.csv
+import argparse
+import csv
+import multiprocessing
+import os
+
+import numpy as np
+from attack_model import simulate_attacks
+
+PARAMETERS = ['attacker_lat', 'attacker_lon', 'attacker_elevation', 'start_distance', 'ghost_speed']
+RESULTS = ['valid_duration', 'min_slant', 'peak_closing_speed']
+
+
+def parse_grid(text):
+    """Turn '1,2,3' or 'start:stop:count' into an array of values."""
+    if ':' in text:
+        start, stop, count = text.split(':')
+        return np.linspace(float(start), float(stop), int(count))
+    return np.array([float(value) for value in text.split(',')])
+
+
+def build_grid(grids):
+    """Every combination of the parameter grids, as one flat array per parameter."""
+    mesh = np.meshgrid(*(np.atleast_1d(grids[name]) for name in PARAMETERS), indexing='ij')
+    return {name: values.ravel() for name, values in zip(PARAMETERS, mesh)}
+
+
+def _evaluate_chunk(job):
+    start, configs, target, duration, dt = job
+    results = simulate_attacks(configs['attacker_lat'], configs['attacker_lon'], configs['attacker_elevation'],
+                               configs['start_distance'], configs['ghost_speed'],
+                               target['lat'], target['lon'], target['elevation'], target['speed'], target['track'],
+                               duration=duration, dt=dt)
+    return start, results
+
+
+def run_sweep(grids, target, duration=600.0, dt=0.1, processes=None, chunk_size=2048):
+    """Evaluate every combination of the grids against one target on all cores.
+
+    grids maps each name in PARAMETERS to its values, target is a dict with lat, lon, elevation, speed (kt)
+    and track. Returns the flat parameter arrays and the matching result arrays in one dict.
+    """
+    configs = build_grid(grids)
+    count = configs[PARAMETERS[0]].size
+    table = dict(configs)
+    for name in RESULTS:
+        table[name] = np.empty(count)
+    jobs = [(start, {name: values[start:start + chunk_size] for name, values in configs.items()}, target, duration, dt)
+            for start in range(0, count, chunk_size)]
+    with multiprocessing.Pool(processes or os.cpu_count()) as pool:
+        for start, results in pool.imap_unordered(_evaluate_chunk, jobs):
+            for name in RESULTS:
+                table[name][start:start + results[name].size] = results[name]
+    return table
+
+
+def write_table(table, path):
+    with open(path, 'w', newline='', encoding='utf-8') as csv_file:
+        writer = csv.writer(csv_file)
+        columns = PARAMETERS + RESULTS
+        writer.writerow(columns)
+        writer.writerows(zip(*(np.round(table[name], 6).tolist() for name in columns)))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Sweep the attack envelope over a parameter grid")
+    parser.add_argument('--attacker-lat', required=True, type=parse_grid)
+    parser.add_argument('--attacker-lon', required=True, type=parse_grid)
+    parser.add_argument('--attacker-elevation', default=parse_grid('100'), type=parse_grid, help="meters")
+    parser.add_argument('--start-distance', required=True, type=parse_grid, help="km")
+    parser.add_argument('--ghost-speed', required=True, type=parse_grid, help="knots")
+    parser.add_argument('--target-lat', required=True, type=float)
+    parser.add_argument('--target-lon', required=True, type=float)
+    parser.add_argument('--target-elevation', default=3000.0, type=float, help="meters")
+    parser.add_argument('--target-speed', default=250.0, type=float, help="knots")
+    parser.add_argument('--target-track', default=90.0, type=float, help="degrees")
+    parser.add_argument('--duration', default=600.0, type=float, help="longest run to simulate in seconds")
+    parser.add_argument('--dt', default=0.1, type=float, help="simulation step in seconds")
+    parser.add_argument('--processes', type=int, help="worker processes, all cores by default")
+    parser.add_argument('--out', default='sweep_results.csv')
+    args = parser.parse_args(argv)
+
+    grids = {name: getattr(args, name) for name in PARAMETERS}
+    target = {'lat': args.target_lat, 'lon': args.target_lon, 'elevation': args.target_elevation,
+              'speed': args.target_speed, 'track': args.target_track}
+    table = run_sweep(grids, target, duration=args.duration, dt=args.dt, processes=args.processes)
+    write_table(table, args.out)
+    print(f"{table['valid_duration'].size} configurations written to {args.out}")
+
+
+if __name__ == '__main__':
+    main()
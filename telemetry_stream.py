@@ -0,0 +1,120 @@
+#Live telemetry of every frame over UDP to another process on this machine, for dashboards and controllers
+#The publisher packs the same fields as the log (binary_log.LOG_COLUMNS) into one preallocated buffer and sends it
+#with a non-blocking socket: a frame costs one pack_into and one sendto, and a packet that cannot be sent at once
+#is dropped and counted instead of stalling the simulator. Each packet is a sequence number followed by a log
+#record, so the receiver can see lost packets.
+#
+#The receiver reads whatever packets are waiting into its own preallocated buffer and returns them as a NumPy
+#record array on top of that buffer, one field per log column:
+#    receiver = TelemetryReceiver()
+#    while True:
+#        batch = receiver.receive(timeout=0.1)
+#        print(batch['Ghost Slant'])
+import argparse
+import errno
+import select
+import socket
+import struct
+
+import numpy as np
+
+from binary_log import RECORD_DTYPE, RECORD_STRUCT
+
+DEFAULT_HOST = '127.0.0.1'
+DEFAULT_PORT = 49555
+PACKET_STRUCT = struct.Struct('<Q' + RECORD_STRUCT.format[1:])
+PACKET_DTYPE = np.dtype([('sequence', '<u8')] + [(name, RECORD_DTYPE.fields[name][0]) for name in RECORD_DTYPE.names])
+#a socket error that only means the packet could not be sent now
+_DROPPED = (errno.EAGAIN, errno.EWOULDBLOCK, errno.ENOBUFS, errno.ECONNREFUSED)
+
+
+class TelemetryPublisher:
+
+    def __init__(self, host=DEFAULT_HOST, port=DEFAULT_PORT):
+        self.address = (host, port)
+        self._socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self._socket.setblocking(False)
+        self._buffer = bytearray(PACKET_STRUCT.size)
+        self.sequence = 0
+        self.dropped = 0  # packets the socket could not take
+
+    """send one record (a tuple in LOG_COLUMNS order), never waits"""
+    def publish(self, record):
+        PACKET_STRUCT.pack_into(self._buffer, 0, self.sequence, *record)
+        self.sequence += 1
+        try:
+            self._socket.sendto(self._buffer, self.address)
+        except OSError as e:
+            if e.errno not in _DROPPED:
+                raise
+            self.dropped += 1
+
+    def close(self):
+        self._socket.close()
+
+
+class TelemetryReceiver:
+
+    def __init__(self, host=DEFAULT_HOST, port=DEFAULT_PORT, max_packets=4096):
+        self._socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self._socket.bind((host, port))
+        self._socket.setblocking(False)
+        self._buffer = bytearray(PACKET_STRUCT.size * max_packets)
+        self._view = memoryview(self._buffer)
+        self.max_packets = max_packets
+        self.next_sequence = None
+        self.lost = 0  # packets missing from the sequence
+
+    def receive(self, timeout=0.0):
+        """Every packet waiting (up to max_packets), after waiting up to timeout seconds for the first one.
+
+        The returned record array is a view of the receive buffer and is overwritten by the next call,
+        copy it to keep it.
+        """
+        size = PACKET_STRUCT.size
+        count = 0
+        if timeout and not select.select([self._socket], [], [], timeout)[0]:
+            return np.frombuffer(self._buffer, dtype=PACKET_DTYPE, count=0)
+        while count < self.max_packets:
+            try:
+                received = self._socket.recv_into(self._view[count * size:(count + 1) * size], size)
+            except BlockingIOError:
+                break
+            if received == size:  # anything else is not one of our packets
+                count += 1
+        batch = np.frombuffer(self._buffer, dtype=PACKET_DTYPE, count=count)
+        if count:
+            first = int(batch['sequence'][0])
+            if self.next_sequence is not None and first > self.next_sequence:
+                self.lost += first - self.next_sequence
+            gaps = np.diff(batch['sequence'].astype(np.int64)) - 1
+            self.lost += int(gaps[gaps > 0].sum())
+            self.next_sequence = int(batch['sequence'][-1]) + 1
+        return batch
+
+    def close(self):
+        self._socket.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Print the live telemetry of the ACAS plugin")
+    parser.add_argument('--host', default=DEFAULT_HOST)
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT)
+    args = parser.parse_args(argv)
+    receiver = TelemetryReceiver(args.host, args.port)
+    try:
+        while True:
+            batch = receiver.receive(timeout=1.0)
+            if len(batch):
+                last = batch[-1]
+                print(f"{len(batch):5d} frames  t {last['Time']:9.2f}  ghost slant {last['Ghost Slant']:9.0f} m  "
+                      f"attacker slant {last['Attacker Slant']:9.0f} m  closing {last['Closing Speed']:6.1f} kt  "
+                      f"valid {bool(last['Attack Valid'])}  RA {bool(last['RA Triggered'])}  lost {receiver.lost}")
+    except KeyboardInterrupt:
+        pass
+    finally:
+        receiver.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,106 @@
+#CSV log writer that keeps all disk work off the simulator thread
+#The flight loop only appends a record to an in-memory queue; a background thread formats the queued
+#records, writes them in batches and flushes once enough rows are waiting or enough time has passed.
+#The same rows can also be appended to a binary log (see binary_log.py).
+#A write that fails in the background thread (disk full, file removed) stops the thread, and the error is raised on
+#the simulator thread by the next append or by close. The queue is bounded, rows beyond it are dropped and counted.
+import collections
+import csv
+import os
+import threading
+import time
+
+import binary_log
+
+
+def unique_log_name(prefix='TCAS_Data_Log', directory='.'):
+    """Path without extension for the logs of a new run, from the date and time with a counter if that is taken."""
+    stem = os.path.join(directory, f"{prefix}_{time.strftime('%Y%m%d_%H%M%S')}")
+    name, counter = stem, 1
+    while os.path.exists(name + '.csv'):
+        counter += 1
+        name = f"{stem}_{counter}"
+    return name
+
+
+class BufferedLogWriter:
+
+    def __init__(self, path, headers, flush_rows=500, flush_interval=1.0, max_rows=100000):
+        self.path = path
+        self.flush_rows = flush_rows  # rows waiting before the writer thread is woken up early
+        self.flush_interval = flush_interval  # seconds between writes when the log rate is low
+        self.max_rows = max_rows  # rows the queue holds at most, when the writer falls that far behind
+        self.dropped = 0  # rows not queued because the queue was full
+        self.error = None  # exception that stopped the writer thread
+        self._queue = collections.deque()  # appends and pops are thread safe without a lock
+        self._wake = threading.Event()
+        self._stop = False
+        self._file = open(path, 'w', newline='', encoding='utf-8')
+        self._writer = csv.writer(self._file)
+        self._writer.writerow(headers)
+        self._binary_file = None
+        self._thread = threading.Thread(target=self._run, name=f"log writer {path}", daemon=True)
+        self._thread.start()
+
+    @property
+    def closed(self):
+        return self._stop
+
+    """also append every row to a binary log, call before the first row is queued"""
+    def add_binary_output(self, path):
+        self._binary_file = open(path, 'wb')
+        binary_log.write_header(self._binary_file)
+
+    """queue one row, this is the only work done on the simulator thread"""
+    def append(self, record):
+        self._raise_error()
+        if len(self._queue) >= self.max_rows:
+            self.dropped += 1
+            return
+        self._queue.append(record)
+        if len(self._queue) >= self.flush_rows:
+            self._wake.set()
+
+    def _drain(self):
+        rows = []
+        queue = self._queue
+        while queue:
+            rows.append(queue.popleft())
+        if rows:
+            self._writer.writerows(rows)
+            self._file.flush()
+            if self._binary_file is not None:
+                self._binary_file.write(binary_log.pack_rows(rows))
+                self._binary_file.flush()
+
+    def _run(self):
+        while not self._stop:
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            try:
+                self._drain()
+            except Exception as e:
+                self.error = e  # raised on the simulator thread by the next append or close
+                return
+
+    def _raise_error(self):
+        if self.error is not None:
+            raise OSError(f"Writing {self.path} failed: {self.error}") from self.error
+
+    """write everything still queued and close the file, safe to call more than once. Raises OSError when a write failed"""
+    def close(self):
+        if self._stop:
+            return
+        self._stop = True
+        self._wake.set()
+        self._thread.join()
+        try:
+            if self.error is None:
+                self._drain()
+        except Exception as e:
+            self.error = e
+        finally:
+            self._file.close()
+            if self._binary_file is not None:
+                self._binary_file.close()
+        self._raise_error()
@@ -0,0 +1,42 @@
+#The accuracy harness of benchmarks/accuracy.py as tests: the batch kernels against the scalar ones, the local frame
+#geometry of the flight loop against the geodesic reference, and every error against the saved baseline
+import json
+import os
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, 'benchmarks'))
+import accuracy  # noqa: E402
+import run_benchmarks  # noqa: E402
+
+
+def test_batch_kernels_agree_with_the_scalar_ones():
+    for name, difference in accuracy.batch_agreement(count=500).items():
+        assert difference < 1e-12, name
+
+
+def test_local_frame_batch_agrees_with_the_scalar_conversions():
+    agreement = accuracy.local_frame_agreement(count=500)
+    assert agreement['to_enu_batch_m'] < 1e-6
+    assert agreement['to_geodetic_batch_m'] < 1e-6
+
+
+@pytest.mark.parametrize('band', sorted(accuracy.LATITUDE_BANDS))
+def test_local_frame_against_the_geodesic_reference(band):
+    low, high = accuracy.LATITUDE_BANDS[band]
+    for antimeridian in (False, True):
+        errors = accuracy.evaluate_local_frame_band(low, high, count=20, antimeridian=antimeridian)
+        assert errors['enu_slant_m']['max'] < 1e-6
+        assert errors['enu_elevation_angle_deg']['max'] < 1e-9
+        assert errors['geodetic_roundtrip_m']['max'] < 1e-3
+        assert errors['tracked_point_m']['max'] < 1e-3
+        assert errors['local_transform_m']['max'] < 1e-2
+
+
+def test_no_error_grew_since_the_baseline():
+    with open(os.path.join(run_benchmarks.BASELINE_DIR, 'accuracy.json')) as baseline_file:
+        baseline = json.load(baseline_file)['results']
+    problems = run_benchmarks.compare('accuracy', accuracy.run(), baseline, time_tolerance=1.5, accuracy_tolerance=1e-6)
+    assert not problems, "\n".join(problems)
@@ -0,0 +1,54 @@
+#The analytic attack window is checked against the window the plugin actually flies headless
+import math
+import os
+import sys
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import headless_sim  # noqa: E402
+from attack_window import KNOTS_TO_MPS, predict_attack_window  # noqa: E402
+
+CONFIG = """[Settings]
+attacker_lat = 50.1
+attacker_lon = 8.0
+attacker_elevation = 100
+start_distance = 10
+ghost_speed = 250
+"""
+TARGET = (50.0, 8.2, 3000.0, 120.0, 90.0)  # lat, lon, elevation (m), speed (kt), track
+
+
+@pytest.mark.parametrize('ghosts', ["", "[Ghost1]\nicao = A41B14\ntailnum = D-EHNR\naltitude_offset = 3000\n"])
+def test_prediction_at_launch_matches_the_flown_window(tmp_path, ghosts):
+    config_path = tmp_path / 'config.ini'
+    config_path.write_text(CONFIG + ghosts)
+    sim = headless_sim.HeadlessSimulation(headless_sim.constant_track(*TARGET), str(config_path), workdir=str(tmp_path))
+    frames = sim.run(300)
+    sim.disable()
+    #the prediction made at launch is kept until the predict stage runs again, the attack is long over by then
+    predicted = sim.plugin.predicted_end_time - sim.plugin.launch_time
+    assert frames * sim.frame_time == pytest.approx(predicted, abs=0.5)
+
+
+def test_straight_chase():
+    #ghost behind the attacker and target flying away along the line of sight: the ghost closes at the difference of
+    #the speeds, and 0.1 degrees of longitude at the equator are 11119.5 m on the sphere of the predictor
+    degree = math.pi / 180 * 6371000
+    window = predict_attack_window(0.0, 0.0, 0.0, 0.0, 0.1, 1000.0, 100.0, 90.0, 0.0, 0.0, -0.05, 300.0)
+    closure = 200 * KNOTS_TO_MPS
+    t = float(window.time_to_invalid[0])
+    ghost_range = 0.15 * degree - closure * t
+    assert ghost_range == pytest.approx(math.hypot(0.1 * degree + 100 * KNOTS_TO_MPS * t, 1000.0), abs=0.01)
+    assert float(window.tau[0]) == pytest.approx(0.15 * degree / closure)
+    assert float(window.min_range[0]) == 0.0
+
+
+def test_altitude_offset_raises_the_slant_range():
+    args = (50.1, 8.0, 100.0, 50.0, 8.2, 3000.0, 120.0, 90.0, 0.0, 50.2, 7.9, 250.0)
+    level = predict_attack_window(*args)
+    offset = predict_attack_window(*args, ghost_altitude_offset=np.array([2000.0]))
+    assert float(offset.time_to_invalid[0]) > float(level.time_to_invalid[0])
+    assert float(offset.min_range[0]) == pytest.approx(2000.0)
+    assert float(offset.tau[0]) > float(level.tau[0])
@@ -0,0 +1,58 @@
+import csv
+import os
+import sys
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import binary_log  # noqa: E402
+from binary_log import FLAG_COLUMNS, LOG_COLUMNS  # noqa: E402
+
+
+def make_rows(count):
+    rng = np.random.default_rng(3)
+    values = rng.uniform(-1e4, 1e4, (count, len(LOG_COLUMNS) - len(FLAG_COLUMNS)))
+    return [tuple(row) + (i % 3 != 0, i % 5 == 0) for i, row in enumerate(values.tolist())]
+
+
+def write_csv(path, rows):
+    with open(path, 'w', newline='', encoding='utf-8') as csv_file:
+        writer = csv.writer(csv_file)
+        writer.writerow(LOG_COLUMNS)
+        writer.writerows(rows)
+
+
+def test_csv_binary_csv_round_trip(tmp_path):
+    rows = make_rows(50)
+    write_csv(tmp_path / 'log.csv', rows)
+    assert binary_log.csv_to_binary(tmp_path / 'log.csv', tmp_path / 'log.bin', chunk_rows=16) == 50
+    records = binary_log.read_binary_log(tmp_path / 'log.bin')
+    assert len(records) == 50
+    assert records['Ghost Slant'] == pytest.approx([row[LOG_COLUMNS.index('Ghost Slant')] for row in rows])
+    assert records['RA Triggered'].tolist() == [row[-1] for row in rows]
+    assert binary_log.binary_to_csv(tmp_path / 'log.bin', tmp_path / 'back.csv') == 50
+    with open(tmp_path / 'back.csv', newline='', encoding='utf-8') as csv_file:
+        back = list(csv.reader(csv_file))
+    assert back[0] == LOG_COLUMNS
+    assert [float(value) for value in back[1][:-2]] == pytest.approx(rows[0][:-2])
+    assert back[1][-2:] == [str(flag) for flag in rows[0][-2:]]
+
+
+def test_packed_rows_read_back(tmp_path):
+    rows = make_rows(7)
+    with open(tmp_path / 'log.bin', 'wb') as binary_file:
+        binary_log.write_header(binary_file)
+        binary_file.write(binary_log.pack_rows(rows))
+        binary_file.write(b'\0' * 5)  # a record cut short is ignored
+    records = binary_log.read_binary_log(tmp_path / 'log.bin')
+    assert [tuple(record) for record in records.tolist()] == pytest.approx(rows)
+
+
+def test_other_files_are_refused(tmp_path):
+    (tmp_path / 'other.bin').write_bytes(b'NOTALOG!' + bytes(8))
+    with pytest.raises(ValueError):
+        binary_log.read_binary_log(tmp_path / 'other.bin')
+    (tmp_path / 'other.csv').write_text("a,b\n1,2\n")
+    with pytest.raises(ValueError):
+        binary_log.csv_to_binary(tmp_path / 'other.csv', tmp_path / 'other2.bin')
@@ -0,0 +1,64 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from flight_loop_scheduler import FlightLoopScheduler  # noqa: E402
+
+
+def make_scheduler():
+    scheduler = FlightLoopScheduler()
+    calls = []
+    for name, divisor, group in (('read', 1, 'attack'), ('log', 3, 'attack'), ('end', 1, 'attack'), ('ui', 2, None)):
+        scheduler.add_stage(name, lambda elapsed, name=name: calls.append((name, round(elapsed, 6))), divisor, group)
+    return scheduler, calls
+
+
+def run_frames(scheduler, frames, elapsed=0.1):
+    for _ in range(frames):
+        assert scheduler.flight_loop(elapsed, elapsed, 0, None) == -1
+
+
+def test_divisor_runs_every_nth_frame_with_the_time_since_it_last_ran():
+    scheduler, calls = make_scheduler()
+    scheduler.start('attack')
+    run_frames(scheduler, 6)
+    assert [elapsed for name, elapsed in calls if name == 'log'] == [0.1, 0.3]
+    assert [elapsed for name, elapsed in calls if name == 'ui'] == [0.1, 0.2, 0.2]
+    assert len([name for name, _ in calls if name == 'read']) == 6
+
+
+def test_group_waits_for_start_and_stops():
+    scheduler, calls = make_scheduler()
+    run_frames(scheduler, 2)
+    assert {name for name, _ in calls} == {'ui'}
+    scheduler.start('attack')
+    assert scheduler.is_running('attack')
+    scheduler.stop('attack')
+    run_frames(scheduler, 2)
+    assert {name for name, _ in calls} == {'ui'}
+
+
+def test_finish_runs_the_rest_of_the_group_once_whatever_the_divisor():
+    scheduler, calls = make_scheduler()
+    scheduler.start('attack')
+    run_frames(scheduler, 1)
+    calls.clear()
+    scheduler.stages[0].function = lambda elapsed: (calls.append(('read', elapsed)), scheduler.finish('attack'))
+    run_frames(scheduler, 1)  # log would only run again on the third frame and ui on the next one
+    assert [name for name, _ in calls] == ['read', 'log', 'end']
+    assert not scheduler.is_running('attack')
+    run_frames(scheduler, 1)
+    assert [name for name, _ in calls] == ['read', 'log', 'end', 'ui']
+
+
+def test_set_divisor():
+    scheduler, calls = make_scheduler()
+    scheduler.set_divisor('log', 1)
+    scheduler.set_divisor('unknown', 4)  # names that are not stages are ignored
+    assert [stage.divisor for stage in scheduler.stages] == [1, 1, 1, 2]
+    with pytest.raises(ValueError):
+        scheduler.set_divisor('log', 0)
+    with pytest.raises(ValueError):
+        scheduler.add_stage('bad', print, divisor=0)
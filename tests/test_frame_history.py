@@ -0,0 +1,74 @@
+import os
+import sys
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from attack_state import AttackerState, GhostState, TargetState  # noqa: E402
+from frame_history import FrameHistory, HISTORY_COLUMNS  # noqa: E402
+
+
+class Swarm:
+    east = north = up = np.zeros(1)
+
+
+def record_frames(history, times):
+    attacker, ghost, target = AttackerState(), GhostState(), TargetState()
+    for time in times:
+        attacker.slant = 10000.0
+        ghost.slant = 20000.0 - 100.0 * time  # closing at 100 m/s
+        ghost.closing_speed = 200.0
+        target.effective_angle = target.east = target.north = target.up = target.speed = target.track = 0.0
+        history.record(time, attacker, ghost, target, Swarm, 0, True)
+
+
+@pytest.mark.parametrize('frames', [5, 10, 13, 20, 37])
+def test_last_is_the_newest_frames_across_the_wrap(frames):
+    history = FrameHistory(10)
+    record_frames(history, np.arange(frames) * 0.1)
+    rows = history.last(0.35)
+    newest = np.arange(frames)[-min(frames, 10):] * 0.1
+    expected = newest[newest >= newest[-1] - 0.35 - 1e-9]
+    assert rows[:, 0] == pytest.approx(expected)
+
+
+def test_last_longer_than_the_buffer_returns_every_frame_oldest_first():
+    history = FrameHistory(10)
+    record_frames(history, np.arange(25) * 0.1)
+    assert history.last(100.0)[:, 0] == pytest.approx(np.arange(15, 25) * 0.1)
+    assert history.rows()[:, 0] == pytest.approx(np.arange(15, 25) * 0.1)
+
+
+def test_rolling_statistics():
+    history = FrameHistory(100)
+    assert history.smoothed_closing_speed() is None
+    record_frames(history, np.arange(150) / 60)
+    assert history.smoothed_closing_speed() == pytest.approx(200.0)
+    assert history.slant_rate() == pytest.approx(-100.0)
+
+
+def test_dump_writes_the_frames_with_the_column_names(tmp_path):
+    history = FrameHistory(10)
+    record_frames(history, np.arange(12) * 0.5)
+    path = tmp_path / 'history.csv'
+    history.dump(str(path)).join()
+    lines = path.read_text().splitlines()
+    assert lines[0].split(',') == list(HISTORY_COLUMNS)
+    assert len(lines) == 11
+    assert float(lines[1].split(',')[0]) == pytest.approx(1.0)
+
+
+def test_a_history_filled_too_fast_grows_to_hold_its_seconds():
+    history = FrameHistory(10, seconds=1.9)
+    record_frames(history, np.arange(100) * 0.05)  # 20 frames a second, twice the rate it was sized for
+    assert history.capacity == 40
+    assert history.last(100.0)[:, 0] == pytest.approx(np.arange(60, 100) * 0.05)
+    assert history.rows()[:, 0] == pytest.approx(np.arange(60, 100) * 0.05)
+
+
+def test_growth_stops_at_the_maximum():
+    history = FrameHistory(10, seconds=2.0, max_capacity=25)
+    record_frames(history, np.zeros(100))  # a paused simulator records frames without time passing
+    assert history.capacity == 25
+    assert len(history.rows()) == 25
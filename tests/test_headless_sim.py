@@ -0,0 +1,46 @@
+#End to end check of the attack geometry: the plugin is flown headless against a constant track target and the
+#valid attack window is compared with its known value and with the offline model of attack_model.py
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import headless_sim  # noqa: E402
+from attack_model import simulate_attacks  # noqa: E402
+
+CONFIG = """[Settings]
+attacker_lat = 50.1
+attacker_lon = 8.0
+attacker_elevation = 100
+start_distance = 10
+ghost_speed = 250
+"""
+TARGET = (50.0, 8.2, 3000.0, 120.0, 90.0)  # lat, lon, elevation (m), speed (kt), track
+VALID_WINDOW = 75.97  # seconds from launch until the ghost is as close to the target as the attacker
+
+
+def fly(tmp_path, frame_time=1 / 60):
+    config_path = tmp_path / 'config.ini'
+    config_path.write_text(CONFIG)
+    sim = headless_sim.HeadlessSimulation(headless_sim.constant_track(*TARGET), str(config_path),
+                                          frame_time=frame_time, workdir=str(tmp_path))
+    frames = sim.run(300)
+    sim.disable()
+    return sim.plugin, frames * frame_time
+
+
+def test_constant_track_valid_window(tmp_path):
+    plugin, window = fly(tmp_path)
+    assert not plugin.attack_valid
+    assert window == pytest.approx(VALID_WINDOW, abs=0.1)
+    #the offline model flies the same pursuit on the sphere with a coarser step
+    model = simulate_attacks(50.1, 8.0, 100.0, 10.0, 250.0, *TARGET)
+    assert window == pytest.approx(float(model['valid_duration']), abs=0.5)
+    assert plugin.ghost.slant == pytest.approx(plugin.attacker.slant, abs=50.0)
+
+
+@pytest.mark.parametrize('frame_rate', [30, 144])
+def test_valid_window_does_not_depend_on_frame_rate(tmp_path, frame_rate):
+    _, window = fly(tmp_path, 1 / frame_rate)
+    assert window == pytest.approx(VALID_WINDOW, abs=1.5 / frame_rate + 0.05)
@@ -0,0 +1,54 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from scenario_queue import DEFAULT_PAUSE, check_settings, load_scenarios  # noqa: E402
+
+DEFAULTS = {'attacker_lat': '50.1', 'attacker_lon': '8.0', 'attacker_elevation': '100', 'start_distance': '10',
+            'ghost_speed': '250'}
+
+
+def load(tmp_path, text):
+    path = tmp_path / 'scenarios.ini'
+    path.write_text(text)
+    return load_scenarios(str(path), DEFAULTS)
+
+
+def test_scenarios_replace_the_defaults_and_repeat(tmp_path):
+    scenarios = load(tmp_path, "[Close]\nstart_distance = 5\nrepeat = 2\n\n[Fast]\nghost_speed = 400\n"
+                               "max_duration = 300\npause = 10\n")
+    assert [scenario.name for scenario in scenarios] == ['Close #1', 'Close #2', 'Fast']
+    assert scenarios[0].settings['start_distance'] == '5'
+    assert scenarios[0].settings['ghost_speed'] == '250'
+    assert 'repeat' not in scenarios[0].settings
+    assert (scenarios[0].max_duration, scenarios[0].pause) == (None, DEFAULT_PAUSE)
+    assert (scenarios[2].max_duration, scenarios[2].pause) == (300.0, 10.0)
+
+
+@pytest.mark.parametrize('text, message', [
+    ("[A]\nghost_sped = 250\n", "unknown keys: ghost_sped"),
+    ("[A]\nghost_speed = fast\n", "is not a number"),
+    ("[A]\nstart_distance = 1000\n", "outside"),
+    ("[A]\nghost_step = 5\n", "ghost_step = 5.0 is outside 0.001..1.0"),
+    ("[A]\nra_level = 1.5\n", "is not an integer"),
+    ("[A]\nghost_table = maybe\n", "is not true or false"),
+    ("[A]\npause = -1\n", "outside"),
+    ("[A]\nrepeat = 0\n", "outside"),
+    ("", "has no scenarios"),
+])
+def test_mistakes_are_reported_when_the_file_is_loaded(tmp_path, text, message):
+    with pytest.raises(ValueError, match=message):
+        load(tmp_path, text)
+
+
+def test_missing_file(tmp_path):
+    with pytest.raises(ValueError, match="could not be read"):
+        load_scenarios(str(tmp_path / 'missing.ini'), DEFAULTS)
+
+
+def test_check_settings():
+    check_settings('Settings', dict(DEFAULTS, ghost_step='0.05', ghost_table='true', ra_level='2'))
+    with pytest.raises(ValueError, match=r"\[Settings\] ghost_step"):
+        check_settings('Settings', dict(DEFAULTS, ghost_step='0'))
@@ -0,0 +1,46 @@
+import os
+import sys
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from binary_log import LOG_COLUMNS  # noqa: E402
+from telemetry_stream import PACKET_DTYPE, PACKET_STRUCT, TelemetryPublisher, TelemetryReceiver  # noqa: E402
+
+
+def make_record(time):
+    return tuple(time + i for i in range(len(LOG_COLUMNS) - 2)) + (True, False)
+
+
+def test_packet_layout_matches_the_record_dtype():
+    assert PACKET_STRUCT.size == PACKET_DTYPE.itemsize
+    packet = PACKET_STRUCT.pack(42, *make_record(1.5))
+    unpacked = np.frombuffer(packet, dtype=PACKET_DTYPE)[0]
+    assert unpacked['sequence'] == 42
+    assert unpacked['Time'] == 1.5
+    assert unpacked['Closing Speed'] == 1.5 + LOG_COLUMNS.index('Closing Speed')
+    assert bool(unpacked['Attack Valid']) and not bool(unpacked['RA Triggered'])
+
+
+def test_published_frames_arrive_in_order_and_gaps_are_counted():
+    receiver = TelemetryReceiver(port=0)
+    port = receiver._socket.getsockname()[1]
+    publisher = TelemetryPublisher(port=port)
+    try:
+        for frame in range(5):
+            publisher.publish(make_record(frame))
+        publisher.sequence += 3  # three packets that never left
+        publisher.publish(make_record(5))
+        batch = receiver.receive(timeout=1.0)
+        while len(batch) < 6:
+            more = receiver.receive(timeout=1.0).copy()
+            assert len(more), "packets were lost on the loopback interface"
+            batch = np.concatenate((batch.copy(), more))
+    finally:
+        publisher.close()
+        receiver.close()
+    assert batch['sequence'].tolist() == [0, 1, 2, 3, 4, 8]
+    assert batch['Time'] == pytest.approx([0, 1, 2, 3, 4, 5])
+    assert receiver.lost == 3
+    assert publisher.dropped == 0
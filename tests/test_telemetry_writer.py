@@ -0,0 +1,45 @@
+import os
+import sys
+import time
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from telemetry_writer import BufferedLogWriter  # noqa: E402
+
+
+class FullDisk:
+    def writerows(self, rows):
+        raise OSError(28, "No space left on device")
+
+
+def test_rows_are_written_on_close(tmp_path):
+    writer = BufferedLogWriter(str(tmp_path / 'log.csv'), ['a', 'b'], flush_interval=100)
+    for i in range(3):
+        writer.append((i, i * 2))
+    writer.close()
+    writer.close()
+    assert (tmp_path / 'log.csv').read_text().splitlines() == ['a,b', '0,0', '1,2', '2,4']
+
+
+def test_a_failed_write_is_raised_by_the_next_append_and_by_close(tmp_path):
+    writer = BufferedLogWriter(str(tmp_path / 'log.csv'), ['a'], flush_rows=1)
+    writer._writer = FullDisk()
+    writer.append((1,))
+    deadline = time.monotonic() + 5
+    while writer.error is None and time.monotonic() < deadline:
+        time.sleep(0.01)
+    with pytest.raises(OSError, match="No space left"):
+        writer.append((2,))
+    with pytest.raises(OSError, match="No space left"):
+        writer.close()
+    assert writer.closed
+
+
+def test_the_queue_is_bounded(tmp_path):
+    writer = BufferedLogWriter(str(tmp_path / 'log.csv'), ['a'], flush_rows=1000, flush_interval=100, max_rows=3)
+    for i in range(5):
+        writer.append((i,))
+    assert writer.dropped == 2
+    writer.close()
+    assert (tmp_path / 'log.csv').read_text().splitlines() == ['a', '0', '1', '2']
@@ -1,4 +1,5 @@
 #This contains all additional utility functions for performing all calculations for the attack geometries
+#These work on one value at a time with math, the NumPy array versions are in batch_utilities.py
 import math
 
 